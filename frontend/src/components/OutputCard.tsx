@@ -48,31 +48,38 @@ export const OutputCard: FC<OutputCardProps> = ({ outputId }) => {
   );
 
   const notFound = error && "status" in error && error?.status === 404;
+  const expired = error && "status" in error && error?.status === 410;
 
   useEffect(() => {
     if (
       pollingInterval > 0 &&
       (status === "completed" ||
         status === "cancelled" ||
+        status === "failed" ||
         status === "error" ||
-        notFound)
+        notFound ||
+        expired)
     ) {
       setPollingInterval(0);
     }
-  }, [status, notFound]);
+  }, [status, notFound, expired]);
 
   const [cancelRequest, { isLoading: isCancelLoading }] =
     useCancelOptimizationCancelOptimizationIdPostMutation();
 
   const Icon = notFound
     ? IconHelpCircle
+    : expired
+    ? IconCancel
     : error
     ? IconExclamationCircle
     : status == "completed"
     ? IconCircleCheck
     : status == "cancelled"
     ? IconCancel
-    : status == "running"
+    : status == "failed"
+    ? IconExclamationCircle
+    : status == "running" || status == "cancel_requested"
     ? IconProgress
     : IconSquareCheck;
 
@@ -81,12 +88,16 @@ export const OutputCard: FC<OutputCardProps> = ({ outputId }) => {
       ? "green"
       : status == "cancelled"
       ? "red"
-      : status == "running"
+      : status == "failed"
+      ? "orange"
+      : status == "running" || status == "cancel_requested"
       ? "blue"
       : "gray";
 
   const statusText = notFound
     ? "Not found on Server"
+    : expired
+    ? "Result expired"
     : error
     ? "Unknown Error"
     : status;
@@ -32,11 +32,24 @@ export const useReport = (): [JsonReport | null, any | null] => {
       }),
     }
   );
+  const { data: status, error: statusError } = useGetStatusStatusIdGetQuery(
+    { id: optimizationId },
+    {
+      pollingInterval: reportFilePollingInterval,
+      skipPollingIfUnfocused: true,
+    }
+  );
   useEffect(() => {
-    if (status === "completed" || status === "cancelled") {
+    if (
+      status === "completed" ||
+      status === "cancelled" ||
+      status === "failed" ||
+      // The result expired (410)
+      (statusError && "status" in statusError && statusError.status === 410)
+    ) {
       setReportFilePollingInterval(0);
     }
-  }, [status]);
+  }, [status, statusError]);
 
   useEffect(() => {
     console.log("Run useReport effect", lastReportDate, report);
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 from typing import Optional
 
 from o2.actions.base_actions.add_size_rule_base_action import AddSizeRuleAction
@@ -65,7 +66,9 @@ from o2.actions.legacy_optimos_actions.remove_resource_by_cost_action import (
 from o2.actions.legacy_optimos_actions.remove_resource_by_utilization_action import (
     RemoveResourceByUtilizationAction,
 )
+from o2.agents.parallel_action_generator import ParallelActionGenerator
 from o2.models.self_rating import RATING
+from o2.models.settings import Settings
 from o2.models.solution import Solution
 from o2.store import SolutionTry, Store
 from o2.util.indented_printer import print_l1, print_l2, print_l3
@@ -140,6 +143,32 @@ class IterationsPerSolutionReachedError(Exception):
     pass
 
 
+@dataclass
+class AgentState:
+    """The resumable state of an agent, see `Agent.get_state` & `Agent.restore_state`."""
+
+    iterations_per_solution: float
+    action_generator_tabu_ids: set[str]
+    action_generator_yields: dict[int, int]
+    """Number of actions yielded per action generator (by index in the catalog)."""
+    active_action_generators: list[int]
+    """The action generators (by index in the catalog) still in the queue, in queue order."""
+    extra: dict[str, object] = field(default_factory=dict)
+    """Agent specific state, e.g. the temperature of the simulated annealing agent."""
+
+
+@dataclass
+class ActionGeneratorState:
+    """The state of the action generators for a base solution, see `Agent.set_action_generators`."""
+
+    catalog: list[type[BaseAction]]
+    catalog_action_generators: list[RateSelfReturnType[BaseAction]]
+    action_generators: list[RateSelfReturnType[BaseAction]]
+    action_generator_tabu_ids: set[str]
+    action_generator_counter: dict[RateSelfReturnType[BaseAction], int]
+    validated_actions: dict[int, list[tuple[RATING, BaseAction]]]
+
+
 class Agent(ABC):
     """Selects the best action to take next, based on the current state of the store."""
 
@@ -162,6 +191,13 @@ class Agent(ABC):
         self.action_generators: list[RateSelfReturnType[BaseAction]] = []
         self.action_generator_tabu_ids: set[str] = set()
         self.action_generator_counter: dict[RateSelfReturnType[BaseAction], int] = defaultdict(int)
+        self.validated_actions: dict[int, list[tuple[RATING, BaseAction]]] = {}
+        """The valid actions (by catalog index), that were yielded, but not selected yet.
+
+        Only used by the parallel action generation, see `_get_valid_actions_parallel`.
+        """
+        self.action_generators_solution_id: Optional[str] = None
+        self.action_generator_cache: OrderedDict[str, ActionGeneratorState] = OrderedDict()
         self.set_action_generators(store.solution)
 
     def select_actions(self) -> Optional[list[BaseAction]]:
@@ -230,7 +266,13 @@ class Agent(ABC):
 
         NOTE: This function will modify the generators_queue, so it's important
         so think about possible side effects.
+
+        If `Settings.MAX_THREADS_ACTION_GENERATION` is > 1, the actions are
+        generated in parallel, see `_get_valid_actions_parallel`.
         """
+        if Settings.MAX_THREADS_ACTION_GENERATION > 1 and not Settings.DISABLE_PARALLEL_EVALUATION:
+            return self._get_valid_actions_parallel()
+
         actions: list[tuple[RATING, BaseAction]] = []
         low_actions: list[tuple[RATING, BaseAction]] = []
 
@@ -278,15 +320,218 @@ class Agent(ABC):
             return low_actions
         return actions
 
+    def _get_valid_actions_parallel(self) -> list[tuple[RATING, BaseAction]]:
+        """Get the valid actions, by validating the actions of the queued generators in parallel.
+
+        Every queued generator is advanced until it has up to
+        `max_number_of_actions_per_iteration` candidates, which are validated in
+        worker processes (see `ParallelActionGenerator`). The candidates are then
+        merged deterministically, by rating first, then by catalog order and the
+        order of the generator, before selecting the best ones. Valid candidates,
+        that weren't selected, are kept for the next call (instead of being
+        yielded & validated again), and generators stay queued, as long as they
+        might have actions left.
+        """
+        max_actions = self.store.settings.max_number_of_actions_per_iteration
+        index = {id(generator): i for i, generator in enumerate(self.catalog_action_generators)}
+        limits: dict[int, int] = {}
+        for generator in self.action_generators:
+            if isinstance(generator, tuple) or id(generator) not in index:
+                continue
+            limit = max_actions
+            if self.store.settings.MAX_YIELDS_PER_ACTION is not None:
+                limit = min(
+                    limit,
+                    self.store.settings.MAX_YIELDS_PER_ACTION - self.action_generator_counter[generator],
+                )
+            if limit > 0:
+                limits[index[id(generator)]] = limit
+
+        candidates = {
+            catalog_index: [
+                (rating, action)
+                for rating, action in self.validated_actions.get(catalog_index, [])
+                if not self._is_tabu_action(action)
+            ]
+            for catalog_index in limits
+        }
+        # Actions yielded by multiple generators are only validated once
+        candidate_ids = {
+            action.id for entry_candidates in candidates.values() for _, action in entry_candidates
+        }
+        exhausted: set[int] = set()
+        while True:
+            pulled: list[tuple[int, RATING, BaseAction]] = []
+            for catalog_index, limit in limits.items():
+                missing = limit - len(candidates[catalog_index])
+                if missing <= 0 or catalog_index in exhausted:
+                    continue
+                generator = self.catalog_action_generators[catalog_index]
+                pulled_actions = self._pull_actions(generator, missing, candidate_ids)
+                if len(pulled_actions) < missing:
+                    exhausted.add(catalog_index)
+                pulled.extend((catalog_index, rating, action) for rating, action in pulled_actions)
+            if not pulled:
+                break
+
+            if self.store.settings.disable_action_validity_check:
+                validity = [True] * len(pulled)
+            else:
+                validity = ParallelActionGenerator.validate(self.store, [action for _, _, action in pulled])
+            for (catalog_index, rating, action), is_valid in zip(pulled, validity):
+                if is_valid:
+                    candidates[catalog_index].append((rating, action))
+                else:
+                    self.action_generator_tabu_ids.add(action.id)
+
+        sorted_candidates = sorted(
+            (
+                (rating, catalog_index, position, action)
+                for catalog_index, entry_candidates in candidates.items()
+                for position, (rating, action) in enumerate(entry_candidates)
+            ),
+            key=lambda candidate: (-candidate[0], candidate[1], candidate[2]),
+        )
+        # Keep the low actions for later, if there are better ones
+        only_high_actions = self.store.settings.only_allow_low_last and any(
+            rating > RATING.LOW for rating, *_ in sorted_candidates
+        )
+
+        actions: list[tuple[RATING, BaseAction]] = []
+        selected_ids: set[str] = set()
+        for rating, catalog_index, _, action in sorted_candidates:
+            if len(actions) >= max_actions or (only_high_actions and rating <= RATING.LOW):
+                break
+            self.action_generator_tabu_ids.add(action.id)
+            self.action_generator_counter[self.catalog_action_generators[catalog_index]] += 1
+            actions.append((rating, action))
+            selected_ids.add(action.id)
+
+        self.validated_actions = {
+            catalog_index: [
+                (rating, action) for rating, action in entry_candidates if action.id not in selected_ids
+            ]
+            for catalog_index, entry_candidates in candidates.items()
+        }
+        self.action_generators = [
+            self.catalog_action_generators[catalog_index]
+            for catalog_index in limits
+            if catalog_index not in exhausted or self.validated_actions[catalog_index]
+        ]
+        return actions
+
+    def _pull_actions(
+        self,
+        action_generator: RateSelfReturnType[BaseAction],
+        number_of_actions: int,
+        candidate_ids: set[str],
+    ) -> list[tuple[RATING, BaseAction]]:
+        """Advance the generator, until it yielded the number of new (non tabu) actions or ran out.
+
+        The ids of the returned actions are added to candidate_ids.
+        """
+        actions: list[tuple[RATING, BaseAction]] = []
+        if number_of_actions <= 0 or isinstance(action_generator, tuple):
+            return actions
+        for rating, action in action_generator:
+            if rating == RATING.NOT_APPLICABLE or action is None:
+                break
+            if action.id in candidate_ids or self._is_tabu_action(action):
+                continue
+            candidate_ids.add(action.id)
+            actions.append((rating, action))
+            if len(actions) >= number_of_actions:
+                break
+        return actions
+
+    def _is_tabu_action(self, action: BaseAction) -> bool:
+        if action.id in self.action_generator_tabu_ids:
+            return True
+        if self.store.is_tabu(action):
+            self.action_generator_tabu_ids.add(action.id)
+            return True
+        return False
+
     def set_action_generators(self, solution: Solution) -> None:
         """Set the action generators for the given solution.
 
+        When switching to another solution, the state of the current generators
+        is cached (for the last `Settings.MAX_CACHED_ACTION_GENERATORS` solutions),
+        so returning to a solution resumes its generators where they left off,
+        instead of replaying (and re-filtering) the actions yielded before.
+        Setting the generators for the current solution again recreates them.
+
         NOTE: This function **must** be called when setting a new base solution.
         """
+        if solution.id != self.action_generators_solution_id:
+            self._cache_action_generators()
+        self.action_generators_solution_id = solution.id
+
+        cached_state = self.action_generator_cache.pop(solution.id, None)
+        if cached_state is not None and cached_state.catalog == self.catalog:
+            print_l3(f"Resuming the action generators of solution {solution.id}.")
+            self.catalog_action_generators = cached_state.catalog_action_generators
+            self.action_generators = cached_state.action_generators
+            self.action_generator_tabu_ids = cached_state.action_generator_tabu_ids
+            self.action_generator_counter = cached_state.action_generator_counter
+            self.validated_actions = cached_state.validated_actions
+            return
+
         rating_input = solution
         self.action_generator_tabu_ids = set()
         self.action_generator_counter = defaultdict(int)
+        self.validated_actions = {}
         self.action_generators = [Action.rate_self(self.store, rating_input) for Action in self.catalog]
+        self.catalog_action_generators = list(self.action_generators)
+
+    def _cache_action_generators(self) -> None:
+        """Cache the state of the current action generators, evicting the least recently used ones."""
+        if self.action_generators_solution_id is None or Settings.MAX_CACHED_ACTION_GENERATORS <= 0:
+            return
+        self.action_generator_cache[self.action_generators_solution_id] = ActionGeneratorState(
+            catalog=list(self.catalog),
+            catalog_action_generators=self.catalog_action_generators,
+            action_generators=self.action_generators,
+            action_generator_tabu_ids=self.action_generator_tabu_ids,
+            action_generator_counter=self.action_generator_counter,
+            validated_actions=self.validated_actions,
+        )
+        while len(self.action_generator_cache) > Settings.MAX_CACHED_ACTION_GENERATORS:
+            self.action_generator_cache.popitem(last=False)
+
+    def get_state(self) -> AgentState:
+        """Get the state of the agent, e.g. to write it to a checkpoint.
+
+        Generators can't be pickled, so they are referenced by their index in the catalog.
+        """
+        index = {id(generator): i for i, generator in enumerate(self.catalog_action_generators)}
+        return AgentState(
+            iterations_per_solution=self.iterations_per_solution,
+            action_generator_tabu_ids=set(self.action_generator_tabu_ids),
+            action_generator_yields={
+                index[id(generator)]: count
+                for generator, count in self.action_generator_counter.items()
+                if id(generator) in index
+            },
+            active_action_generators=[
+                index[id(generator)] for generator in self.action_generators if id(generator) in index
+            ],
+        )
+
+    def restore_state(self, state: AgentState) -> None:
+        """Restore the state of the agent (e.g. from a checkpoint).
+
+        The action generators are recreated for the (already restored) store.solution.
+        They will skip the actions yielded before, as those are in the tabu ids.
+        """
+        self.action_generator_cache.clear()
+        self.action_generators_solution_id = None
+        self.set_action_generators(self.store.solution)
+        self.iterations_per_solution = state.iterations_per_solution
+        self.action_generator_tabu_ids = set(state.action_generator_tabu_ids)
+        for i, count in state.action_generator_yields.items():
+            self.action_generator_counter[self.catalog_action_generators[i]] = count
+        self.action_generators = [self.catalog_action_generators[i] for i in state.active_action_generators]
 
     def process_many_solutions(
         self, solutions: list[Solution]
@@ -307,6 +552,17 @@ class Agent(ABC):
 
         return chosen_tries, not_chosen_tries
 
+    def receive_solutions(self, solutions: list[Solution]) -> tuple[list[SolutionTry], list[SolutionTry]]:
+        """Add solutions, that were found elsewhere (e.g. by another island), to the store.
+
+        In contrast to `process_many_solutions` the solutions are not the result
+        of this agent's actions, so no agent specific bookkeeping is done.
+        """
+        return self.store.process_many_solutions(
+            solutions,
+            self.set_new_base_solution if not self.store.settings.never_select_new_base_solution else None,
+        )
+
     def set_new_base_solution(self, proposed_solution_try: Optional[SolutionTry] = None) -> None:
         """Set a new base solution."""
         print_l2(f"Selecting new base evaluation {'(reinserting)' if proposed_solution_try else ''}...")
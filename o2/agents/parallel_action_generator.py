@@ -0,0 +1,61 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from o2.actions.base_actions.base_action import BaseAction
+from o2.models.settings import Settings
+from o2.store import Store
+from o2.util.logger import info
+
+
+class ParallelActionGenerator:
+    """Validates the actions yielded by the catalog's generators in worker processes.
+
+    The generators themselves stay in the agent (so they advance & can be
+    resumed), only the expensive `check_if_valid` (applying the action & checking
+    the constraints) is distributed. Every worker gets a snapshot of the store,
+    with just the current solution, so the tabu check against the solution tree
+    is left to the caller.
+
+    Set Settings.MAX_THREADS_ACTION_GENERATION to a value > 1 to enable this.
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def validate(store: Store, actions: list[BaseAction]) -> list[bool]:
+        """Check if the actions are valid for the store's current solution, returned in order."""
+        number_of_workers = min(Settings.MAX_THREADS_ACTION_GENERATION, len(actions))
+        if number_of_workers <= 1 or Settings.DISABLE_PARALLEL_EVALUATION:
+            return ParallelActionGenerator.validate_chunk(store, actions)
+
+        if ParallelActionGenerator._executor is None:
+            info(
+                f"Starting ProcessPoolExecutor with "
+                f"{Settings.MAX_THREADS_ACTION_GENERATION} workers for action generation"
+            )
+            ParallelActionGenerator._executor = ProcessPoolExecutor(
+                max_workers=Settings.MAX_THREADS_ACTION_GENERATION
+            )
+
+        snapshot = Store(store.solution, store.constraints, store.name)
+        snapshot.settings = store.settings
+        chunk_size = -(-len(actions) // number_of_workers)
+        futures = [
+            ParallelActionGenerator._executor.submit(
+                ParallelActionGenerator.validate_chunk, snapshot, actions[i : i + chunk_size]
+            )
+            for i in range(0, len(actions), chunk_size)
+        ]
+        return [is_valid for future in futures for is_valid in future.result()]
+
+    @staticmethod
+    def validate_chunk(store: Store, actions: list[BaseAction]) -> list[bool]:
+        """Check if the actions are valid (runs in the worker process)."""
+        return [action.check_if_valid(store, mark_no_change_as_invalid=True) for action in actions]
+
+    @staticmethod
+    def close_executor() -> None:
+        """Close the executor."""
+        if ParallelActionGenerator._executor is not None:
+            ParallelActionGenerator._executor.shutdown(wait=True)
+            ParallelActionGenerator._executor = None
@@ -3,7 +3,7 @@ import os
 # Disable GPU
 os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, cast
 
 import gymnasium as gym
 import numpy as np
@@ -15,9 +15,8 @@ from o2.actions.base_actions.base_action import BaseAction
 from o2.agents.agent import Agent, NoActionsLeftError
 from o2.agents.tabu_agent import TabuAgent
 from o2.models.solution import Solution
-from o2.pareto_front import FRONT_STATUS
 from o2.ppo_utils.ppo_env import PPOEnv
-from o2.ppo_utils.ppo_input import PPOInput
+from o2.ppo_utils.ppo_input import ActionValidityCache, PPOInput
 from o2.store import SolutionTry, Store
 from o2.util.indented_printer import print_l1
 
@@ -33,6 +32,8 @@ class PPOAgent(Agent):
         super().__init__(store)
         from sb3_contrib import MaskablePPO
 
+        self.validity_cache = ActionValidityCache()
+
         if store.settings.ppo_use_existing_model:
             self.model = MaskablePPO.load(store.settings.ppo_model_path)
         else:
@@ -57,21 +58,25 @@ class PPOAgent(Agent):
                 tb_log_name="PPO",
                 progress_bar=False,
             )
-            self.last_actions: ndarray
-            self.last_values: ndarray
-            self.log_probs: ndarray
+            self.last_actions: th.Tensor
+            self.last_values: th.Tensor
+            self.log_probs: th.Tensor
             self.last_action_mask: ndarray
+        self.last_selected_actions: list[BaseAction] = []
+        self.buffer_steps: list[tuple[int, int, float, bool]] = []
+        """The steps in the rollout buffer: (start, end, value of the next observation, done)."""
 
     @override
     def select_actions(self) -> Optional[list[BaseAction]]:
         """Select the best actions to take next.
 
-        It will pick at most cpu_count actions, so parallel evaluation is possible.
+        It will pick `ppo_actions_per_step` distinct actions, sampled from the
+        masked policy distribution, so parallel evaluation is possible.
 
         If the possible options for the current base evaluation are exhausted,
         it will choose a new base evaluation.
         """
-        action_from_store = PPOInput.get_actions_from_store(self.store)
+        action_from_store = PPOInput.get_actions_from_store(self.store, self.validity_cache)
         action_count = len([a for a in action_from_store if a is not None])
         if action_count == 0:
             # TODO: We need to reset the env here
@@ -81,22 +86,30 @@ class PPOAgent(Agent):
         action_mask = PPOInput.get_action_mask_from_actions(action_from_store)
         self.last_action_mask = action_mask
 
-        # Collect a single step
+        number_of_actions = min(self.store.settings.ppo_actions_per_step, action_count)
         with th.no_grad():
             obs_tensor = obs_as_tensor(self.model._last_obs, self.model.device)  # type: ignore
-            actions, values, log_probs = self.model.policy(obs_tensor, action_masks=action_mask)
-            self.last_actions = actions
-            self.last_values = values
-            self.log_probs = log_probs
-
-        [action_index] = actions.cpu().numpy()
-
-        if action_index is None:
-            raise ValueError("Model did not return an action index.")
-        action = action_from_store[action_index]
-        if action is None:
+            if number_of_actions == 1:
+                # Collect a single step
+                actions, values, log_probs = self.model.policy(obs_tensor, action_masks=action_mask)
+            else:
+                # Collect multiple steps from the same observation, by sampling distinct actions
+                # (without replacement) from the masked policy distribution
+                distribution = self.model.policy.get_distribution(obs_tensor, action_masks=action_mask)
+                probs = distribution.distribution.probs  # type: ignore
+                number_of_actions = min(number_of_actions, int(th.count_nonzero(probs)))
+                actions = th.multinomial(probs, number_of_actions, replacement=False).flatten()
+                log_probs = distribution.log_prob(actions)
+                values = self.model.policy.predict_values(obs_tensor).flatten().repeat(number_of_actions)
+            self.last_actions = actions.flatten()
+            self.last_values = values.flatten()
+            self.log_probs = log_probs.flatten()
+
+        selected_actions = [action_from_store[action_index] for action_index in actions.cpu().numpy()]
+        if any(action is None for action in selected_actions):
             return None
-        return [action]
+        self.last_selected_actions = cast(list[BaseAction], selected_actions)
+        return self.last_selected_actions
 
     @override
     def find_new_base_solution(self, proposed_solution_try: Optional[SolutionTry] = None) -> Solution:
@@ -112,76 +125,119 @@ class PPOAgent(Agent):
         return chosen_tries, not_chosen_tries
 
     def _result_callback(self, chosen_tries: list[SolutionTry], not_chosen_tries: list[SolutionTry]) -> None:
-        """Handle the result of the evaluation."""
-        result = chosen_tries[0] if chosen_tries else not_chosen_tries[0]
+        """Handle the result of the evaluation.
 
-        new_obs, reward, done = self.step_info_from_try(result)
-        rewards = [reward]
+        Every evaluated action is added as a transition to the rollout buffer.
+        """
+        # Match the tries to the selected actions (the evaluation doesn't keep the order)
+        transitions: list[tuple[int, SolutionTry]] = []
+        for solution_try in chosen_tries + not_chosen_tries:
+            _, solution = solution_try
+            if solution.last_action in self.last_selected_actions:
+                transitions.append((self.last_selected_actions.index(solution.last_action), solution_try))
+        transitions.sort(key=lambda transition: transition[0])
+
+        if not transitions:
+            # Single action steps don't need the matching
+            transitions = [(0, chosen_tries[0] if chosen_tries else not_chosen_tries[0])]
+
+        new_obs, _, done = self.step_info_from_try(transitions[0][1])
         done_values = np.array([1 if done else 0])
-        actions = self.last_actions.reshape(-1, 1)
-        log_probs = self.log_probs
         action_masks = self.last_action_mask
+        obs = self.model._last_obs
+        episode_starts = self.model._last_episode_starts or done_values
+        with th.no_grad():
+            next_value = float(
+                self.model.policy.predict_values(obs_as_tensor(new_obs, self.model.device)).flatten()[0]
+            )
+
+        rollout_buffer = self.model.rollout_buffer
+        step_start = rollout_buffer.pos
+        step_size = 0
+        for index, solution_try in transitions:
+            # Add collected data to the rollout buffer
+            rollout_buffer.add(
+                obs,  # type: ignore
+                np.asarray(self.last_actions[index : index + 1]).reshape(-1, 1),
+                np.array([self.get_reward(solution_try)]),
+                episode_starts,  # type: ignore
+                self.last_values[index : index + 1],
+                self.log_probs[index : index + 1],
+                action_masks=action_masks,
+            )
+            # All transitions of a step start from the same observation
+            episode_starts = np.array([0])
+            step_size += 1
+
+            # Train if the buffer is full
+            if rollout_buffer.full:
+                print_l1("Rollout buffer full, training...")
+                self.buffer_steps.append((step_start, step_start + step_size, next_value, done))
+                self.compute_returns_and_advantage()
+                self.model.train()
+                rollout_buffer.reset()
+                self.buffer_steps = []
+                step_start, step_size = 0, 0
+        if step_size > 0:
+            self.buffer_steps.append((step_start, step_start + step_size, next_value, done))
 
-        # Add collected data to the rollout buffer
-        self.model.rollout_buffer.add(
-            self.model._last_obs,
-            actions,
-            rewards,
-            self.model._last_episode_starts or done_values,
-            self.last_values,
-            log_probs,
-            action_masks=action_masks,
-        )
         self.model._last_obs = new_obs
         self.model._last_episode_starts = done_values  # type: ignore
 
-        # Train if the buffer is full
-        if self.model.rollout_buffer.full:
-            print_l1("Rollout buffer full, training...")
-            with th.no_grad():
-                last_values = self.model.policy.predict_values(obs_as_tensor(new_obs, self.model.device))
-            self.model.rollout_buffer.compute_returns_and_advantage(
-                last_values=last_values,
-                dones=done_values,  # type: ignore
-            )
-            self.model.train()
-            self.model.rollout_buffer.reset()
-
         # If the episode is done, select a new base solution
         if done_values[0]:
             tmp_agent = TabuAgent(self.store)
             while True:
                 self.store.solution = tmp_agent._select_new_base_evaluation(reinsert_current_solution=False)
-                actions = PPOInput.get_actions_from_store(self.store)
+                actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
                 action_count = len([a for a in actions if a is not None])
                 if action_count > 0:
                     break
                 else:
                     print_l1("Still no actions available for next step, selecting new base solution again.")
 
+    def compute_returns_and_advantage(self) -> None:
+        """Compute the returns & (GAE) advantages of the transitions in the rollout buffer.
+
+        Unlike `RolloutBuffer.compute_returns_and_advantage`, the transitions of a
+        step (sampled from the same observation) are not treated as consecutive
+        steps, so they don't pick up each other's rewards: Each one is bootstrapped
+        with the value of the step's next observation, and the GAE continues with
+        the mean advantage of the next step's transitions.
+        """
+        rollout_buffer = self.model.rollout_buffer
+        gamma, gae_lambda = rollout_buffer.gamma, rollout_buffer.gae_lambda
+        rewards = rollout_buffer.rewards[:, 0]
+        values = rollout_buffer.values[:, 0]
+
+        next_advantage = 0.0
+        for start, end, next_value, done in reversed(self.buffer_steps):
+            next_non_terminal = 0.0 if done else 1.0
+            deltas = rewards[start:end] + gamma * next_value * next_non_terminal - values[start:end]
+            rollout_buffer.advantages[start:end, 0] = (
+                deltas + gamma * gae_lambda * next_non_terminal * next_advantage
+            )
+            next_advantage = float(rollout_buffer.advantages[start:end, 0].mean())
+        rollout_buffer.returns = rollout_buffer.advantages + rollout_buffer.values
+
     def get_env(self) -> gym.Env:
         """Get the environment for the PPO agent."""
         return PPOEnv(self.store, max_steps=self.store.settings.ppo_steps_per_iteration)
 
     def update_state(self) -> None:
         """Update the state of the agent."""
-        self.actions = PPOInput.get_actions_from_store(self.store)
+        self.actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
         self.action_space = PPOInput.get_action_space_from_actions(self.actions)
         self.observation_space = PPOInput.get_observation_space(self.store)
         self.state = PPOInput.get_state_from_store(self.store)
 
+    def get_reward(self, solution_try: SolutionTry) -> float:
+        """Get the reward for the given SolutionTry."""
+        return PPOEnv.get_reward(solution_try)
+
     def step_info_from_try(self, solution_try: SolutionTry) -> tuple[dict, float, bool]:
         """Get the step info from the given SolutionTry."""
-        # TODO Improve scores based on how good/bad the solution is
-        status, _ = solution_try
-        if status == FRONT_STATUS.INVALID:
-            reward = -1
-        elif status == FRONT_STATUS.IN_FRONT:
-            reward = 1
-        elif status == FRONT_STATUS.IS_DOMINATED:
-            reward = 10
-        else:
-            reward = -1
+        reward = self.get_reward(solution_try)
 
         done = False
 
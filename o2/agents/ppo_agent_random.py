@@ -31,7 +31,7 @@ class PPOAgentRandom(PPOAgent):
     @override
     def update_state(self) -> None:
         """Update the state of the agent."""
-        self.actions = PPOInput.get_actions_from_store(self.store)
+        self.actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
         self.action_space = PPOInput.get_action_space_from_actions(self.actions)
         self.observation_space = spaces.Dict(
             {
@@ -9,6 +9,7 @@ from o2.agents.agent import (
     ACTION_CATALOG_BATCHING_ONLY,
     ACTION_CATALOG_LEGACY,
     Agent,
+    AgentState,
     NoNewBaseSolutionFoundError,
 )
 from o2.models.solution import Solution
@@ -82,6 +83,17 @@ class SimulatedAnnealingAgent(Agent):
             )
             print_l2(f"Which means {temp_after_all_iterations:_.2f} after all {max_iterations} iterations.")
 
+    @override
+    def get_state(self) -> AgentState:
+        state = super().get_state()
+        state.extra["temperature"] = self.temperature
+        return state
+
+    @override
+    def restore_state(self, state: AgentState) -> None:
+        super().restore_state(state)
+        self.temperature = state.extra["temperature"]  # type: ignore
+
     @override
     def find_new_base_solution(self, proposed_solution_try: Optional[SolutionTry] = None) -> Solution:
         print_l2(f"Old temperature: {self.temperature:_.2f}")
@@ -0,0 +1,227 @@
+import os
+import pickle
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from o2.agents.agent import AgentState
+from o2.models.constraints import ConstraintsType
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.models.solution_tree import SolutionTree
+from o2.pareto_front import ParetoFront
+from o2.store import Store
+from o2.util.logger import info, log_io
+from o2.util.solution_dumper import SolutionDumper
+
+if TYPE_CHECKING:
+    from o2.optimizer import Optimizer
+
+
+@dataclass
+class CheckpointHeader:
+    """The first record of a checkpoint file, with everything that doesn't change during a run."""
+
+    store_name: str
+    constraints: ConstraintsType
+    base_solution: Solution
+    solution_dumper_folder: Optional[str]
+    """The run folder of the SolutionDumper, if solutions were archived."""
+
+
+@dataclass
+class CheckpointDelta:
+    """The changes of a run since the last checkpoint."""
+
+    iteration: int
+    """The last finished iteration."""
+    settings: Settings
+    solutions: list[Solution]
+    """The solutions, that weren't part of a checkpoint before."""
+    lookup_changes: list[tuple[str, bool]]
+    """Changes of the solution tree (id, is_available), in the order they happened."""
+    fronts: dict[int, list[str]]
+    """The solution ids of the pareto fronts that changed (by index)."""
+    number_of_fronts: int
+    current_solution_id: str
+    agent_state: AgentState
+    max_non_improving_iter: int
+    max_solutions: Union[int, float]
+    random_state: tuple[Any, ...]
+
+
+@dataclass
+class Checkpoint:
+    """A checkpoint restored from a checkpoint file."""
+
+    store: Store
+    last_delta: CheckpointDelta
+    solution_dumper_folder: Optional[str]
+
+
+class Checkpointer:
+    """Writes incremental, append-only checkpoints of an optimization run.
+
+    The checkpoint file is a sequence of pickled records: A `CheckpointHeader`
+    followed by one `CheckpointDelta` per checkpoint, which only contains the new
+    solutions, the changes of the solution tree & pareto fronts and the (small)
+    agent/optimizer state. So the bytes written per checkpoint are proportional
+    to the progress since the last checkpoint, not to the size of the store.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the checkpointer (nothing is written until `write` is called)."""
+        self.path = path
+        self._header_written = False
+        self._written_solution_ids: set[str] = set()
+        self._lookup_state: dict[str, bool] = {}
+        self._fronts: list[list[str]] = []
+        self.last_iteration: Optional[int] = None
+        """The iteration of the last written (or loaded) checkpoint."""
+
+    def write(self, optimizer: "Optimizer", iteration: int) -> None:
+        """Append the changes of the optimizer's store since the last checkpoint."""
+        store = optimizer.agent.store
+        records: list[Union[CheckpointHeader, CheckpointDelta]] = []
+        if not self._header_written:
+            records.append(
+                CheckpointHeader(
+                    store_name=store.name,
+                    constraints=store.constraints,
+                    base_solution=store.base_solution,
+                    solution_dumper_folder=(
+                        SolutionDumper.instance.folder if Settings.ARCHIVE_SOLUTIONS else None
+                    ),
+                )
+            )
+            self._written_solution_ids.add(store.base_solution.id)
+
+        new_solutions: list[Solution] = []
+
+        def add_solution(solution: Solution) -> None:
+            if solution.id not in self._written_solution_ids:
+                self._written_solution_ids.add(solution.id)
+                new_solutions.append(solution)
+
+        # Only the first checkpoint (of a tree) scans the whole lookup, afterwards
+        # the tree tracks the changed ids for us.
+        tree = store.solution_tree
+        changed_ids = tree.solution_lookup if tree.changed_ids is None else tree.changed_ids
+        tree.changed_ids = {}
+
+        lookup_changes: list[tuple[str, bool]] = []
+        for solution_id in list(changed_ids):
+            solution = tree.solution_lookup[solution_id]
+            if solution is not None:
+                add_solution(solution)
+            if self._lookup_state.get(solution_id) != (solution is not None):
+                self._lookup_state[solution_id] = solution is not None
+                lookup_changes.append((solution_id, solution is not None))
+
+        fronts: dict[int, list[str]] = {}
+        for i, front in enumerate(store.pareto_fronts):
+            for solution in front.solutions:
+                add_solution(solution)
+            ids = [solution.id for solution in front.solutions]
+            if i >= len(self._fronts) or self._fronts[i] != ids:
+                fronts[i] = ids
+        self._fronts = [[solution.id for solution in front.solutions] for front in store.pareto_fronts]
+        add_solution(store.solution)
+
+        records.append(
+            CheckpointDelta(
+                iteration=iteration,
+                settings=store.settings,
+                solutions=new_solutions,
+                lookup_changes=lookup_changes,
+                fronts=fronts,
+                number_of_fronts=len(store.pareto_fronts),
+                current_solution_id=store.solution.id,
+                agent_state=optimizer.agent.get_state(),
+                max_non_improving_iter=optimizer.max_non_improving_iter,
+                max_solutions=optimizer.max_solutions,
+                random_state=random.getstate(),
+            )
+        )
+
+        with open(self.path, "ab") as f:
+            for record in records:
+                pickle.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        self._header_written = True
+        self.last_iteration = iteration
+        log_io(
+            f"Wrote checkpoint for iteration {iteration} to {self.path} "
+            f"({len(new_solutions)} new solutions, {len(lookup_changes)} tree changes, {size:_} bytes total)"
+        )
+
+    def load(self) -> Checkpoint:
+        """Load the checkpoint file, restoring the store at the last (complete) checkpoint.
+
+        Afterwards `write` will continue to append to the same file.
+        """
+        header: Optional[CheckpointHeader] = None
+        deltas: list[CheckpointDelta] = []
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    break
+                except pickle.UnpicklingError:
+                    info(f"Ignoring incomplete last record of checkpoint {self.path}")
+                    break
+                if isinstance(record, CheckpointHeader):
+                    header = record
+                else:
+                    deltas.append(record)
+        if header is None or not deltas:
+            raise ValueError(f"No complete checkpoint found in {self.path}")
+
+        solutions: dict[str, Solution] = {header.base_solution.id: header.base_solution}
+        lookup: dict[str, bool] = {}
+        fronts: list[list[str]] = []
+        for delta in deltas:
+            for solution in delta.solutions:
+                solutions[solution.id] = solution
+            for solution_id, is_available in delta.lookup_changes:
+                lookup[solution_id] = is_available
+            fronts = fronts[: delta.number_of_fronts]
+            fronts += [[] for _ in range(delta.number_of_fronts - len(fronts))]
+            for i, ids in delta.fronts.items():
+                fronts[i] = ids
+        last_delta = deltas[-1]
+
+        store = Store(header.base_solution, header.constraints, header.store_name)
+        store.settings = last_delta.settings
+        store.pareto_fronts = []
+        for ids in fronts:
+            front = ParetoFront()
+            front.solutions = [solutions[solution_id] for solution_id in ids]
+            store.pareto_fronts.append(front)
+        store.solution_tree = SolutionTree()
+        for solution_id, is_available in lookup.items():
+            if is_available:
+                store.solution_tree.add_solution(solutions[solution_id], archive=False)
+            else:
+                store.solution_tree.solution_lookup[solution_id] = None
+        store.solution = solutions[last_delta.current_solution_id]
+
+        self._header_written = True
+        self._written_solution_ids = set(solutions)
+        self._lookup_state = lookup
+        self._fronts = fronts
+        self.last_iteration = last_delta.iteration
+        # The restored tree matches the loaded state, so only track its changes from now on
+        store.solution_tree.changed_ids = {}
+        info(
+            f"Loaded checkpoint of {header.store_name} at iteration {last_delta.iteration} "
+            f"({len(deltas)} checkpoints, {len(solutions)} solutions)"
+        )
+        return Checkpoint(
+            store=store,
+            last_delta=last_delta,
+            solution_dumper_folder=header.solution_dumper_folder,
+        )
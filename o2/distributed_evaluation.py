@@ -0,0 +1,370 @@
+import contextlib
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+from o2.evaluation_backend import EvaluationBackend
+from o2.models.evaluation import Evaluation
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.models.state import State
+from o2.util.indented_printer import print_l2
+from o2.util.logger import info
+
+if TYPE_CHECKING:
+    from o2.actions.base_actions.base_action import BaseAction
+
+
+@dataclass(frozen=True)
+class EvaluationJob:
+    """A job for a worker: Apply the action to the base state (identified by its timetable hash)."""
+
+    id: str
+    base_timetable_hash: int
+    action: "BaseAction"
+
+
+@dataclass(frozen=True)
+class EvaluationResult:
+    """The result of an `EvaluationJob`."""
+
+    job_id: str
+    state: Optional[State] = None
+    """The new state, None if the action didn't change the base state."""
+    evaluation: Optional[Evaluation] = None
+    error: Optional[str] = None
+    """The error (traceback), if the job failed."""
+
+
+class Broker(ABC):
+    """Transports the jobs, results & base states between the optimizer and the workers.
+
+    All transported objects are picklable, so an implementation for workers on
+    other nodes (e.g. on top of a message queue & key-value store) only needs to
+    move them. See `LocalBroker` for a stand-in on a single machine.
+    """
+
+    @abstractmethod
+    def put_state(self, timetable_hash: int, state: State) -> None:
+        """Make a base state available to the workers."""
+
+    @abstractmethod
+    def get_state(self, timetable_hash: int) -> Optional[State]:
+        """Get a base state by its timetable hash (None if unknown)."""
+
+    @abstractmethod
+    def delete_state(self, timetable_hash: int) -> None:
+        """Delete a base state, that won't be used for new jobs."""
+
+    @abstractmethod
+    def put_job(self, job: EvaluationJob) -> None:
+        """Queue a job for the workers."""
+
+    @abstractmethod
+    def get_job(self) -> Optional[EvaluationJob]:
+        """Wait for the next job (in the worker), returns None if the worker should stop."""
+
+    @abstractmethod
+    def put_result(self, result: EvaluationResult) -> None:
+        """Send the result of a job (from the worker)."""
+
+    @abstractmethod
+    def get_result(self, timeout: float) -> Optional[EvaluationResult]:
+        """Wait for the next result, returns None if there was none within the timeout."""
+
+    @abstractmethod
+    def stop_workers(self, number_of_workers: int) -> None:
+        """Tell the given number of workers to stop (after their current job)."""
+
+
+class LocalBroker(Broker):
+    """A broker for workers on the local machine, based on a `multiprocessing.Manager`.
+
+    The manager process holds the queues & base states, so the broker can be passed
+    to worker processes (or threads). Call `close` to shutdown the manager.
+    """
+
+    def __init__(self) -> None:
+        self._manager = multiprocessing.Manager()
+        self._states = self._manager.dict()
+        self._jobs = self._manager.Queue()
+        self._results = self._manager.Queue()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle the broker without the manager (the proxies are enough for the workers)."""
+        state = self.__dict__.copy()
+        state["_manager"] = None
+        return state
+
+    def put_state(self, timetable_hash: int, state: State) -> None:
+        """Make a base state available to the workers."""
+        self._states[timetable_hash] = state
+
+    def get_state(self, timetable_hash: int) -> Optional[State]:
+        """Get a base state by its timetable hash."""
+        return self._states.get(timetable_hash)
+
+    def delete_state(self, timetable_hash: int) -> None:
+        """Delete a base state."""
+        self._states.pop(timetable_hash, None)
+
+    def put_job(self, job: EvaluationJob) -> None:
+        """Queue a job for the workers."""
+        self._jobs.put(job)
+
+    def get_job(self) -> Optional[EvaluationJob]:
+        """Wait for the next job."""
+        return self._jobs.get()
+
+    def put_result(self, result: EvaluationResult) -> None:
+        """Send the result of a job."""
+        self._results.put(result)
+
+    def get_result(self, timeout: float) -> Optional[EvaluationResult]:
+        """Wait for the next result."""
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop_workers(self, number_of_workers: int) -> None:
+        """Queue a stop signal for each of the workers."""
+        for _ in range(number_of_workers):
+            self._jobs.put(None)
+
+    def close(self) -> None:
+        """Shutdown the manager process."""
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+class EvaluationWorker:
+    """Processes the jobs of a broker, e.g. on another node.
+
+    The base states are fetched from the broker once & cached, the evaluations
+    are cached by the hash of the new timetable, so the same timetable (e.g.
+    reached by different actions) is only simulated once.
+
+    NOTE: The worker uses the (global) Settings of its own process,
+    e.g. NUMBER_OF_SIMULATION_FOR_MEDIAN, so they should match the optimizer's.
+    """
+
+    MAX_CACHED_STATES = 32
+    """The number of base states to keep in the worker."""
+
+    def __init__(self, broker: Broker) -> None:
+        self.broker = broker
+        self._states: OrderedDict[int, State] = OrderedDict()
+        self._evaluations: OrderedDict[int, Evaluation] = OrderedDict()
+
+    def run(self) -> None:
+        """Process jobs until the broker tells the worker to stop."""
+        while (job := self.broker.get_job()) is not None:
+            try:
+                result = self.evaluate(job)
+            except Exception:
+                result = EvaluationResult(job.id, error=traceback.format_exc())
+            self.broker.put_result(result)
+
+    def evaluate(self, job: EvaluationJob) -> EvaluationResult:
+        """Apply the action of the job to its base state & evaluate the new state."""
+        base_state = self._get_base_state(job.base_timetable_hash)
+        new_state = job.action.apply(base_state, enable_prints=False)
+        if new_state == base_state:
+            return EvaluationResult(job.id)
+
+        timetable_hash = hash(new_state.timetable)
+        evaluation = self._evaluations.get(timetable_hash)
+        if evaluation is None:
+            evaluation = new_state.evaluate()
+            self._evaluations[timetable_hash] = evaluation
+            if len(self._evaluations) > Settings.DISTRIBUTED_WORKER_CACHE_SIZE:
+                self._evaluations.popitem(last=False)
+        else:
+            self._evaluations.move_to_end(timetable_hash)
+        return EvaluationResult(job.id, new_state, evaluation)
+
+    def _get_base_state(self, timetable_hash: int) -> State:
+        state = self._states.get(timetable_hash)
+        if state is not None:
+            self._states.move_to_end(timetable_hash)
+            return state
+        state = self.broker.get_state(timetable_hash)
+        if state is None:
+            raise ValueError(f"Unknown base state {timetable_hash}")
+        self._states[timetable_hash] = state
+        if len(self._states) > EvaluationWorker.MAX_CACHED_STATES:
+            self._states.popitem(last=False)
+        return state
+
+
+@dataclass
+class _PendingJob:
+    job: EvaluationJob
+    parent: Solution
+    future: "Future[Solution]"
+    attempts: int
+    deadline: float
+
+
+class DistributedEvaluationBackend(EvaluationBackend):
+    """Dispatches the evaluations as jobs to `EvaluationWorker`s via a `Broker`.
+
+    Jobs, that failed or didn't return within `Settings.DISTRIBUTED_EVALUATION_TIMEOUT`,
+    are resubmitted up to `Settings.DISTRIBUTED_EVALUATION_MAX_RETRIES` times.
+    (A late result of a resubmitted job is still accepted.)
+
+    E.g. to evaluate in 4 local worker processes:
+    ```
+    backend = DistributedEvaluationBackend(LocalBroker())
+    backend.start_local_workers(4)
+    optimizer.evaluation_backend = backend
+    ```
+    """
+
+    MAX_PUBLISHED_STATES = 32
+    """The number of base states to keep in the broker."""
+
+    def __init__(self, broker: Broker) -> None:
+        self.broker = broker
+        self._pending: dict[str, _PendingJob] = {}
+        self._published_states: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._local_workers: list[multiprocessing.Process] = []
+
+    def start_local_workers(self, number_of_workers: int) -> None:
+        """Start worker processes on this machine (which are stopped on `close`)."""
+        info(f"Starting {number_of_workers} local evaluation workers")
+        for i in range(number_of_workers):
+            process = multiprocessing.Process(
+                target=EvaluationWorker(self.broker).run,
+                name=f"optimos-evaluation-worker-{len(self._local_workers) + i}",
+                daemon=True,
+            )
+            process.start()
+            self._local_workers.append(process)
+
+    def submit(self, parent: Solution, action: "BaseAction") -> "Future[Solution]":
+        """Queue the evaluation as a job for the workers."""
+        base_timetable_hash = hash(parent.state.timetable)
+        job = EvaluationJob(uuid.uuid4().hex, base_timetable_hash, action)
+        future: Future[Solution] = Future()
+        with self._lock:
+            self._publish_state(base_timetable_hash, parent.state)
+            self._pending[job.id] = _PendingJob(
+                job, parent, future, 1, time.time() + Settings.DISTRIBUTED_EVALUATION_TIMEOUT
+            )
+        self.broker.put_job(job)
+        self._ensure_collector()
+        return future
+
+    def close(self) -> None:
+        """Stop collecting results, fail the pending jobs & stop the local workers."""
+        self._closed.set()
+        if self._collector is not None:
+            self._collector.join()
+            self._collector = None
+        with self._lock:
+            for pending in self._pending.values():
+                _set_exception(pending.future, RuntimeError("Evaluation backend was closed"))
+            self._pending.clear()
+        if self._local_workers:
+            self.broker.stop_workers(len(self._local_workers))
+            for process in self._local_workers:
+                process.join()
+            self._local_workers = []
+
+    def _publish_state(self, timetable_hash: int, state: State) -> None:
+        if timetable_hash in self._published_states:
+            self._published_states.move_to_end(timetable_hash)
+            return
+        self.broker.put_state(timetable_hash, state)
+        self._published_states[timetable_hash] = None
+        if len(self._published_states) > DistributedEvaluationBackend.MAX_PUBLISHED_STATES:
+            old_hash, _ = self._published_states.popitem(last=False)
+            self.broker.delete_state(old_hash)
+
+    def _ensure_collector(self) -> None:
+        if self._collector is None:
+            self._closed.clear()
+            self._collector = threading.Thread(
+                target=self._collect_results, name="optimos-evaluation-collector", daemon=True
+            )
+            self._collector.start()
+
+    def _collect_results(self) -> None:
+        while not self._closed.is_set():
+            result = self.broker.get_result(timeout=0.1)
+            with self._lock:
+                if result is not None:
+                    self._process_result(result)
+                self._retry_timed_out_jobs()
+
+    def _process_result(self, result: EvaluationResult) -> None:
+        pending = self._pending.get(result.job_id)
+        if pending is None:
+            # The job was already resolved (e.g. a late result of a retried job)
+            return
+        if result.error is not None:
+            print_l2(f"Evaluation job {result.job_id} failed (attempt {pending.attempts}): {result.error}")
+            self._retry_or_fail(pending, RuntimeError(result.error))
+            return
+
+        del self._pending[result.job_id]
+        action = pending.job.action
+        if result.state is None or result.evaluation is None:
+            _set_result(pending.future, Solution.empty_from_parent(pending.parent, action))
+        else:
+            _set_result(
+                pending.future,
+                Solution(
+                    evaluation=result.evaluation,
+                    state=result.state,
+                    actions=pending.parent.actions + [action],
+                ),
+            )
+
+    def _retry_timed_out_jobs(self) -> None:
+        now = time.time()
+        for pending in list(self._pending.values()):
+            if pending.future.cancelled():
+                del self._pending[pending.job.id]
+            elif pending.deadline < now:
+                print_l2(f"Evaluation job {pending.job.id} timed out (attempt {pending.attempts})")
+                self._retry_or_fail(
+                    pending,
+                    TimeoutError(f"Evaluation timed out after {pending.attempts} attempt(s)"),
+                )
+
+    def _retry_or_fail(self, pending: _PendingJob, error: Exception) -> None:
+        if pending.attempts > Settings.DISTRIBUTED_EVALUATION_MAX_RETRIES or pending.future.cancelled():
+            del self._pending[pending.job.id]
+            _set_exception(pending.future, error)
+            return
+        pending.attempts += 1
+        pending.deadline = time.time() + Settings.DISTRIBUTED_EVALUATION_TIMEOUT
+        # The base state might have been evicted from the broker in the meantime
+        self._publish_state(pending.job.base_timetable_hash, pending.parent.state)
+        self.broker.put_job(pending.job)
+
+
+def _set_result(future: "Future[Solution]", solution: Solution) -> None:
+    # The future might have been cancelled in the meantime
+    with contextlib.suppress(InvalidStateError):
+        future.set_result(solution)
+
+
+def _set_exception(future: "Future[Solution]", error: Exception) -> None:
+    with contextlib.suppress(InvalidStateError):
+        future.set_exception(error)
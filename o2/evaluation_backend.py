@@ -0,0 +1,119 @@
+import signal
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from types import FrameType
+from typing import TYPE_CHECKING, Optional
+
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.util.logger import info
+
+if TYPE_CHECKING:
+    from o2.actions.base_actions.base_action import BaseAction
+
+
+class EvaluationTimeoutError(TimeoutError):
+    """The evaluation of an action took longer than `Settings.ACTION_EVALUATION_TIMEOUT`."""
+
+
+@dataclass
+class EvaluationStats:
+    """Statistics about the evaluated candidates (actions) of an optimization run."""
+
+    evaluated: int = 0
+    """The number of candidates, that were submitted for evaluation."""
+    timed_out: int = 0
+    """The number of candidates, that exceeded the time limit of a single evaluation."""
+    cancelled: int = 0
+    """The number of stragglers, that were cancelled after the quorum returned."""
+
+    @property
+    def straggler_rate(self) -> float:
+        """The share of candidates, that timed out or were cancelled."""
+        if self.evaluated == 0:
+            return 0
+        return (self.timed_out + self.cancelled) / self.evaluated
+
+
+def evaluate_with_time_limit(parent: Solution, action: "BaseAction", time_limit: Optional[float]) -> Solution:
+    """Create the solution via `Solution.from_parent`, but abort after time_limit seconds.
+
+    Raises an `EvaluationTimeoutError` if the time limit was exceeded.
+    NOTE: The limit is implemented with SIGALRM, so it's only enforced in the main
+    thread of a process on Unix (e.g. in the workers of a ProcessPoolExecutor).
+    """
+    if (
+        time_limit is None
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        return Solution.from_parent(parent, action)
+
+    timed_out = False
+
+    def on_timeout(signum: int, frame: Optional[FrameType]) -> None:
+        nonlocal timed_out
+        timed_out = True
+        raise EvaluationTimeoutError(f"Evaluation took longer than {time_limit}s")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        solution = Solution.from_parent(parent, action)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+    # The simulation errors are usually caught (-> empty evaluation), so check explicitly
+    if timed_out:
+        raise EvaluationTimeoutError(f"Evaluation took longer than {time_limit}s")
+    return solution
+
+
+class EvaluationBackend(ABC):
+    """Evaluates actions on a (base) solution, e.g. in-process, in local processes or on remote workers.
+
+    The optimizer submits all actions of an iteration, and then waits for the futures.
+    """
+
+    @abstractmethod
+    def submit(self, parent: Solution, action: "BaseAction") -> "Future[Solution]":
+        """Apply the action to the parent solution & evaluate the new state (see `Solution.from_parent`)."""
+
+    def close(self) -> None:  # noqa: B027
+        """Free the resources of the backend (e.g. worker processes)."""
+
+
+class LocalEvaluationBackend(EvaluationBackend):
+    """Evaluates the actions directly in the current process, one after another.
+
+    Exceptions (except timeouts) are raised directly by `submit`, instead of being stored in the future.
+    """
+
+    def submit(self, parent: Solution, action: "BaseAction") -> "Future[Solution]":
+        """Evaluate the action & return a completed future."""
+        future: Future[Solution] = Future()
+        try:
+            future.set_result(evaluate_with_time_limit(parent, action, Settings.ACTION_EVALUATION_TIMEOUT))
+        except EvaluationTimeoutError as e:
+            future.set_exception(e)
+        return future
+
+
+class ProcessPoolEvaluationBackend(EvaluationBackend):
+    """Evaluates the actions in a `ProcessPoolExecutor` on the local machine."""
+
+    def __init__(self, max_workers: int) -> None:
+        info(f"Starting ProcessPoolExecutor with {max_workers} workers for action evaluation")
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(self, parent: Solution, action: "BaseAction") -> "Future[Solution]":
+        """Submit the evaluation to the executor."""
+        return self.executor.submit(
+            evaluate_with_time_limit, parent, action, Settings.ACTION_EVALUATION_TIMEOUT
+        )
+
+    def close(self) -> None:
+        """Shutdown the executor."""
+        self.executor.shutdown()
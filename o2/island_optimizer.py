@@ -0,0 +1,229 @@
+import multiprocessing
+import queue
+import random
+from dataclasses import dataclass, field
+from multiprocessing.queues import Queue
+
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.optimizer import Optimizer
+from o2.pareto_front import ParetoFront
+from o2.store import Store
+from o2.util.indented_printer import print_l0, print_l1, print_l2
+from o2.util.logger import STATS_LOG_LEVEL, info
+from o2.util.solution_dumper import SolutionDumper
+
+
+@dataclass
+class Migration:
+    """A batch of pareto front solutions sent by an island to the coordinator."""
+
+    island: int
+    solutions: list[Solution] = field(default_factory=list)
+    finished: bool = False
+    """Is this the last migration of the island (e.g. the island is done)?"""
+
+
+class IslandChannel:
+    """The island's end of the migration channel, used by the `Optimizer` of the island.
+
+    Every `Settings.island_migration_interval` iterations the island sends its
+    new pareto front solutions to the coordinator & adds the solutions, that
+    other islands found in the meantime, to its own store.
+
+    Every island archives its solutions in its own run folder, so the sent
+    solutions always carry their evaluation & state (see `_unarchive`).
+    """
+
+    def __init__(self, island: int, inbox: "Queue[list[Solution]]", outbox: "Queue[Migration]") -> None:
+        self.island = island
+        self.inbox = inbox
+        self.outbox = outbox
+        self._known_ids: set[str] = set()
+        """The ids of the solutions, that were already sent or received."""
+
+    def exchange(self, optimizer: Optimizer) -> None:
+        """Send the new front solutions & receive the solutions of the other islands."""
+        store = optimizer.agent.store
+        emigrants = self._get_new_front_solutions(store)[-store.settings.island_max_migrants :]
+        if emigrants:
+            self._known_ids.update(solution.id for solution in emigrants)
+            self.outbox.put(Migration(self.island, self._unarchive(emigrants)))
+
+        immigrants: list[Solution] = []
+        while True:
+            try:
+                immigrants.extend(self.inbox.get_nowait())
+            except queue.Empty:
+                break
+        immigrants = [
+            solution
+            for solution in immigrants
+            if solution.id not in self._known_ids and solution.id not in store.solution_tree.solution_lookup
+        ]
+        if not immigrants:
+            return
+        self._known_ids.update(solution.id for solution in immigrants)
+        chosen_tries, _ = optimizer.agent.receive_solutions(immigrants)
+        print_l1(
+            f"Island {self.island}: Received {len(immigrants)} solutions, "
+            f"{len(chosen_tries)} in/better than the current front."
+        )
+
+    def finish(self, optimizer: Optimizer) -> None:
+        """Send all remaining front solutions & tell the coordinator, that the island is done."""
+        store = optimizer.agent.store
+        emigrants = self._unarchive(self._get_new_front_solutions(store))
+        self.outbox.put(Migration(self.island, emigrants, finished=True))
+
+    @staticmethod
+    def _unarchive(solutions: list[Solution]) -> list[Solution]:
+        """Load the evaluation & state of archived solutions, as only this island can read its archive."""
+        for solution in solutions:
+            solution.evaluation  # noqa: B018
+            solution.state  # noqa: B018
+        return solutions
+
+    def _get_new_front_solutions(self, store: Store) -> list[Solution]:
+        return [
+            solution
+            for solution in store.current_pareto_front.solutions
+            if solution.id not in self._known_ids and solution.is_valid and not solution.is_base_solution
+        ]
+
+
+def _run_island(
+    channel: IslandChannel,
+    store: Store,
+    max_threads_action_evaluation: int,
+) -> None:
+    """Run the optimizer of an island (in its own process).
+
+    Every island has its own SolutionDumper (and therefore its own run folder),
+    so the islands never share file handles or archives with each other or the coordinator.
+    """
+    # The islands share the parent's random state (if forked), so they would explore the same way
+    random.seed()
+    Settings.MAX_THREADS_ACTION_EVALUATION = max_threads_action_evaluation
+    dumps_solutions = Settings.ARCHIVE_SOLUTIONS or Settings.DUMP_DISCARDED_SOLUTIONS
+    if dumps_solutions:
+        SolutionDumper().update_store_name(store.name)
+    try:
+        optimizer = Optimizer(store)
+        optimizer.island_channel = channel
+        try:
+            optimizer.solve()
+        finally:
+            channel.finish(optimizer)
+    finally:
+        if dumps_solutions:
+            SolutionDumper.instance.close()
+
+
+class IslandOptimizer:
+    """Runs multiple optimizers ("islands") in parallel processes, which share their pareto fronts.
+
+    Every island has its own store (and thereby `SolutionTree`) & settings, so e.g.
+    a Tabu Search and Simulated Annealing agents with different temperatures can
+    explore the solution space at the same time, instead of waiting for each other
+    at the end of every iteration. Periodically, each island sends its new front
+    solutions to the coordinator (see `Settings.island_migration_interval`), which
+    merges them into the global pareto front & forwards them to the other islands.
+
+    The global pareto front is the current pareto front of the given store.
+    NOTE: The `Settings.MAX_THREADS_ACTION_EVALUATION` are split between the islands.
+
+    E.g. to run a Tabu Search & a Simulated Annealing island:
+    ```
+    tabu_settings = copy(store.settings)
+    tabu_settings.agent = AgentType.TABU_SEARCH
+    sa_settings = copy(store.settings)
+    sa_settings.agent = AgentType.SIMULATED_ANNEALING
+    sa_settings.sa_initial_temperature = 1000
+    IslandOptimizer(store, [tabu_settings, sa_settings]).solve()
+    ```
+    """
+
+    def __init__(self, store: Store, island_settings: list[Settings]) -> None:
+        """Initialize the island optimizer, with the settings of each island."""
+        if not island_settings:
+            raise ValueError("At least one island is required.")
+        self.store = store
+        self.island_settings = island_settings
+
+    @property
+    def pareto_front(self) -> ParetoFront:
+        """Return the global pareto front (of all islands)."""
+        return self.store.current_pareto_front
+
+    def solve(self) -> ParetoFront:
+        """Run the islands until all of them are finished, and return the global pareto front."""
+        number_of_islands = len(self.island_settings)
+        max_threads = max(1, Settings.MAX_THREADS_ACTION_EVALUATION // number_of_islands)
+        info(f"Starting {number_of_islands} islands with {max_threads} evaluation workers each")
+
+        outbox: Queue[Migration] = multiprocessing.Queue()
+        inboxes: list[Queue[list[Solution]]] = [multiprocessing.Queue() for _ in range(number_of_islands)]
+        processes: list[multiprocessing.Process] = []
+        for island, settings in enumerate(self.island_settings):
+            island_store = Store(
+                self.store.base_solution, self.store.constraints, f"{self.store.name} ({island})"
+            )
+            island_store.settings = settings
+            process = multiprocessing.Process(
+                target=_run_island,
+                args=(IslandChannel(island, inboxes[island], outbox), island_store, max_threads),
+                name=f"optimos-island-{island}",
+            )
+            process.start()
+            processes.append(process)
+
+        running = set(range(number_of_islands))
+        while running:
+            try:
+                migration = outbox.get(timeout=1)
+            except queue.Empty:
+                for island in list(running):
+                    exitcode = processes[island].exitcode
+                    if exitcode is not None and exitcode != 0:
+                        print_l1(f"Island {island} failed with exit code {exitcode}")
+                        running.discard(island)
+                continue
+
+            if migration.finished:
+                running.discard(migration.island)
+            new_front_solutions = self._merge(migration.solutions)
+            if new_front_solutions:
+                for island in running - {migration.island}:
+                    inboxes[island].put(new_front_solutions)
+
+        for process in processes:
+            process.join()
+        # Solutions sent to islands, that finished in the meantime, are never received
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+
+        self._print_result()
+        return self.pareto_front
+
+    def _merge(self, solutions: list[Solution]) -> list[Solution]:
+        """Merge the solutions into the global pareto front, and return the ones in the front.
+
+        The migrants carry their evaluation & state, so no archive of an island is read (or deleted).
+        """
+        solutions = [
+            solution for solution in solutions if solution.id not in self.store.solution_tree.solution_lookup
+        ]
+        chosen_tries, _ = self.store.process_many_solutions(solutions)
+        front_ids = {solution.id for solution in self.pareto_front.solutions}
+        return [solution for _, solution in chosen_tries if solution.id in front_ids]
+
+    def _print_result(self) -> None:
+        print_l0("Final result (all islands):")
+        print_l1(f"Pareto front size: \t{self.pareto_front.size}", log_level=STATS_LOG_LEVEL)
+        for solution in self.pareto_front.solutions:
+            print_l2(
+                f"{solution.id}: {Settings.get_pareto_x_label()}: {solution.pareto_x:_.2f}; "
+                f"{Settings.get_pareto_y_label()}: {solution.pareto_y:_.2f}",
+                log_level=STATS_LOG_LEVEL,
+            )
@@ -1,22 +1,23 @@
 import math
-from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from functools import cached_property, reduce
-from typing import TYPE_CHECKING, Callable, cast
+from typing import TYPE_CHECKING, Callable, TypeVar
 
+import numpy as np
 import pandas as pd
-from prosimos.execution_info import TaskEvent, Trace
+from prosimos.execution_info import Trace
 from prosimos.simulation_stats_calculator import (
     KPIMap,
     ResourceKPI,
 )
 
-from o2.models.days import DAY
+from o2.models.days import DAY, DAYS
+from o2.models.event_table import NO_WEEKDAY, EventTable
+from o2.models.kpi_table import KPITable
 from o2.models.settings import CostType, Settings
 from o2.simulation_runner import RunSimulationResult
 from o2.util.waiting_time_helper import (
-    BatchInfo,
-    BatchInfoKey,
     SimpleBatchInfo,
     get_batches_from_event_log,
 )
@@ -27,6 +28,8 @@ if TYPE_CHECKING:
 
 HourlyRates = dict[str, int]
 
+T = TypeVar("T")
+
 
 @dataclass(frozen=True)
 class Evaluation:
@@ -47,14 +50,6 @@ class Evaluation:
     avg_waiting_time_by_case: float
     """Get the average waiting time of the simulation."""
 
-    avg_batching_waiting_time_by_case: float
-    """Get the average batching waiting time per case."""
-
-    avg_batching_waiting_time_per_task: dict[str, float]
-    """Get the average batching waiting time per task."""
-    total_batching_waiting_time_per_task: dict[str, float]
-    """Get the total batching waiting time per task (all cases)."""
-
     total_duration: float
     """Get the total duration (processing + idle) of the simulation."""
 
@@ -64,12 +59,6 @@ class Evaluation:
     sum_of_cycle_times: float
     """Get the sum of all task cycle times of the simulation."""
 
-    total_batching_waiting_time: float
-    """Get the total batching waiting time of the simulation (all cases)."""
-
-    total_batching_waiting_time_per_resource: dict[str, float]
-    """Get the total batching waiting time of the simulation per resource."""
-
     total_cycle_time: float
     """Get the total cycle time of the simulation."""
 
@@ -79,59 +68,355 @@ class Evaluation:
     total_waiting_time: float
     """Get the total waiting time of the simulation."""
 
-    task_execution_count_by_resource: dict[str, dict[str, int]]
-    """Get the number of times each task was executed by a given resource.
+    is_empty: bool
+    """Is this evaluation based on an empty simulation run?"""
+
+    avg_idle_wt_per_task_instance: float
+    """Get the average idle waiting time per task instance."""
+
+    avg_batch_processing_time_per_task_instance: float
+    """Get the average batch processing time per task instance.
 
-    E.g. task_execution_count_by_resource["resource_id"]["task_id"]
+    Pseudo-Code:
+    sum(batch.processing_time for batch in batches) / sum(batch.size for batch in batches)
     """
 
-    is_empty: bool
-    """Is this evaluation based on an empty simulation run?"""
+    event_table: EventTable = field(default_factory=EventTable.empty, repr=False, compare=False)
+    """Compact, columnar version of the event log.
 
-    task_execution_count_with_wt_or_it: dict[str, int]
-    """Get the count each task was executed with a waiting or idle time."""
+    All the (more expensive) statistics below are computed lazily from it on first access,
+    so solutions that are never used as a base solution only pay for the pareto objectives.
+    """
 
-    task_execution_counts: dict[str, int]
-    """Get the count each task was executed"""
+    @cached_property
+    def avg_batching_waiting_time_by_case(self) -> float:
+        """Get the average batching waiting time per case."""
+        if len(self.event_table.batches) == 0:
+            return 0
+        return float(self._get_batch_frame()["batch_waiting_time_seconds"].mean())
 
-    task_enablement_weekdays: dict[str, dict[DAY, dict[int, int]]]
-    """Get the weekdays & hours on which a task was enabled."""
+    @cached_property
+    def avg_batching_waiting_time_per_task(self) -> dict[str, float]:
+        """Get the average batching waiting time per task."""
+        return (
+            self._get_batch_frame()
+            .groupby("activity")["batch_waiting_time_seconds"]
+            .mean()
+            .fillna(0)
+            .to_dict()
+        )
 
-    task_started_weekdays: dict[str, dict[DAY, dict[int, int]]]
-    """Get the weekdays & hours on which a task was started."""
+    @cached_property
+    def total_batching_waiting_time_per_task(self) -> dict[str, float]:
+        """Get the total batching waiting time per task (all cases)."""
+        return (
+            self._get_batch_frame()
+            .groupby("activity")["batch_waiting_time_seconds"]
+            .sum()
+            .fillna(0)
+            .to_dict()
+        )
 
-    resource_allocation_ratio_task: dict[str, float]
-    """Get the allocation ratio of each task."""
+    @cached_property
+    def total_batching_waiting_time(self) -> float:
+        """Get the total batching waiting time of the simulation (all cases)."""
+        if len(self.event_table.batches) == 0:
+            return 0
+        return self._get_batch_frame()["batch_waiting_time_seconds"].sum()
 
-    total_fixed_cost_by_task: dict[str, float]
-    """Get the total fixed cost of each task."""
-    avg_fixed_cost_per_case: float
-    """Get the average fixed cost per case."""
+    @cached_property
+    def total_batching_waiting_time_per_resource(self) -> dict[str, float]:
+        """Get the total batching waiting time of the simulation per resource."""
+        return (
+            self._get_batch_frame()
+            .groupby("resource")["batch_waiting_time_seconds"]
+            .sum()
+            .fillna(0)
+            .to_dict()
+        )
 
-    batches_by_activity_with_idle: dict[str, list[SimpleBatchInfo]]
-    """Get the batches grouped by activity, only including those with idle time."""
+    @cached_property
+    def task_execution_count_by_resource(self) -> dict[str, dict[str, int]]:
+        """Get the number of times each task was executed by a given resource.
 
-    avg_batch_size_for_batch_enabled_tasks: float
-    """Get the average batch size over all batches."""
+        E.g. task_execution_count_by_resource["resource_id"]["task_id"]
+        """
+        table = self.event_table
+        occurrences: dict[str, dict[str, int]] = {}
+        keys, counts = table.count_by(table.resource, table.task)
+        for (resource, task), count in zip(keys.tolist(), counts.tolist()):
+            occurrences.setdefault(table.resource_ids[resource], {})[table.task_ids[task]] = count
+        return occurrences
 
-    avg_batch_size_per_task: dict[str, float]
-    """Get the average batch size per task."""
+    @cached_property
+    def task_execution_count_with_wt_or_it(self) -> dict[str, int]:
+        """Get the count each task was executed with a waiting or idle time."""
+        table = self.event_table
+        mask = table.has_waiting_time | table.has_idle_time
+        tasks = table.task[mask]
+        weights = table.has_waiting_time[mask].astype(np.int64) + table.has_idle_time[mask]
+        totals = np.bincount(tasks, weights=weights, minlength=len(table.task_ids))
+        _, first_index = np.unique(tasks, return_index=True)
+        return {table.task_ids[task]: int(totals[task]) for task in tasks[np.sort(first_index)].tolist()}
 
-    avg_idle_wt_per_task_instance: float
-    """Get the average idle waiting time per task instance."""
+    @cached_property
+    def task_execution_counts(self) -> dict[str, int]:
+        """Get the count each task was executed."""
+        table = self.event_table
+        keys, counts = table.count_by(table.task)
+        return {table.task_ids[task]: count for (task,), count in zip(keys.tolist(), counts.tolist())}
 
-    avg_batch_processing_time_per_task_instance: float
-    """Get the average batch processing time per task instance.
+    @cached_property
+    def task_enablement_weekdays(self) -> dict[str, dict[DAY, dict[int, int]]]:
+        """Get the weekdays & hours on which a task was enabled."""
+        table = self.event_table
+        return self._get_task_weekdays(table.enabled_weekday, table.enabled_hour)
 
-    Pseudo-Code:
-    sum(batch.processing_time for batch in batches) / sum(batch.size for batch in batches)
-    """
+    @cached_property
+    def task_started_weekdays(self) -> dict[str, dict[DAY, dict[int, int]]]:
+        """Get the weekdays & hours on which a task was started."""
+        table = self.event_table
+        return self._get_task_weekdays(table.started_weekday, table.started_hour)
+
+    @cached_property
+    def resource_allocation_ratio_task(self) -> dict[str, float]:
+        """Get the allocation ratio of each task.
+
+        The allocation ratio is calculated =
+        (number of unique resources that executed the task) / (total number of resources)
+        """
+        table = self.event_table
+        resources_total = len(np.unique(table.resource))
+        keys, _ = table.count_by(table.task, table.resource)
+        resources_per_task: dict[str, int] = {}
+        for task, _ in keys.tolist():
+            task_id = table.task_ids[task]
+            resources_per_task[task_id] = resources_per_task.get(task_id, 0) + 1
+        return {task_id: resources / resources_total for task_id, resources in resources_per_task.items()}
+
+    @cached_property
+    def total_fixed_cost_by_task(self) -> dict[str, float]:
+        """Get the total fixed cost of each task."""
+        return self._get_batch_frame().groupby("activity")["fixed_cost"].sum().fillna(0).to_dict()
+
+    @cached_property
+    def avg_fixed_cost_per_case(self) -> float:
+        """Get the average fixed cost per case."""
+        if len(self.event_table.batches) == 0:
+            return 0
+        return float(self._get_batch_frame().groupby("case")["fixed_cost"].sum().mean())
+
+    @cached_property
+    def batches_by_activity_with_idle(self) -> dict[str, list[SimpleBatchInfo]]:
+        """Get the batches grouped by activity, only including those with idle time."""
+        table = self.event_table
+        batches = table.batches
+        result: dict[str, list[SimpleBatchInfo]] = {}
+        indices = np.flatnonzero((batches.size > 1) & (batches.idle_time != 0))
+        for index in indices.tolist():
+            activity = table.task_ids[batches.activity[index]]
+            result.setdefault(activity, []).append(
+                {
+                    "accumulation_begin": table.to_datetime(batches.accumulation_begin[index]),
+                    "start": table.to_datetime(batches.start[index]),
+                    "ideal_proc": float(batches.ideal_proc[index]),
+                    "idle_time": float(batches.idle_time[index]),
+                }
+            )
+        return result
+
+    @cached_property
+    def avg_batch_size_for_batch_enabled_tasks(self) -> float:
+        """Get the average batch size over all batches."""
+        sizes = self.event_table.batches.size
+        sizes = sizes[sizes > 1]
+        if len(sizes) == 0:
+            return 0
+        return int(sizes.sum()) / len(sizes)
+
+    @cached_property
+    def avg_batch_size_per_task(self) -> dict[str, float]:
+        """Get the average batch size per task."""
+        table = self.event_table
+        batches = table.batches
+        mask = batches.size > 1
+        activities = batches.activity[mask]
+        sizes = batches.size[mask]
+        totals = np.bincount(activities, weights=sizes, minlength=len(table.task_ids))
+        counts = np.bincount(activities, minlength=len(table.task_ids))
+        _, first_index = np.unique(activities, return_index=True)
+        return {
+            table.task_ids[activity]: float(totals[activity] / counts[activity])
+            for activity in activities[np.sort(first_index)].tolist()
+        }
+
+    @cached_property
+    def resource_started_weekdays(self) -> dict[str, dict[DAY, dict[int, int]]]:
+        """Get the weekdays & hours on which a resource started any task."""
+        table = self.event_table
+        weekdays: dict[str, dict[str, dict[DAY, dict[int, int]]]] = {}
+        task_keys, _ = table.count_by(table.resource, table.task)
+        for resource, task in task_keys.tolist():
+            weekdays.setdefault(table.resource_ids[resource], {})[table.task_ids[task]] = {}
+        keys, counts = table.count_by(
+            table.resource,
+            table.task,
+            table.started_weekday,
+            table.started_hour,
+            mask=table.started_weekday != NO_WEEKDAY,
+        )
+        for (resource, task, weekday, hour), count in zip(keys.tolist(), counts.tolist()):
+            task_weekdays = weekdays[table.resource_ids[resource]][table.task_ids[task]]
+            task_weekdays.setdefault(DAY.from_weekday(weekday), {})[hour] = count
+
+        # NOTE: If a resource started multiple tasks on the same weekday,
+        # the hours of the last task are taken.
+        return {
+            resource_id: {
+                DAY(weekday): {hour: count for hour, count in task_start_times.items()}
+                for _, resource_start_times in task_start_times_by_day.items()
+                for weekday, task_start_times in resource_start_times.items()
+            }
+            for resource_id, task_start_times_by_day in weekdays.items()
+        }
+
+    @cached_property
+    def tasks_by_number_of_duplicate_enablement_dates(self) -> dict[str, int]:
+        """Get the tasks sorted by the number of duplicate enablement dates.
+
+        Meaning the more often the same task is enabled at the same time, the higher the rank.
+        The granularity is one hour.
+        NOTE: tasks with only one enablement at a given time are not considered.
+        """
+        table = self.event_table
+        duplicates = {table.task_ids[task]: 0 for task in np.unique(table.task).tolist()}
+        keys, counts = table.count_by(
+            table.task,
+            table.started_weekday,
+            table.started_hour,
+            mask=table.started_weekday != NO_WEEKDAY,
+        )
+        for (task, _, _), count in zip(keys.tolist(), counts.tolist()):
+            if count > 1:
+                duplicates[table.task_ids[task]] += count
+        return duplicates
+
+    @cached_property
+    def task_kpi_table(self) -> KPITable:
+        """Get the KPIs per task as a (task × KPI) table, e.g. for the PPO observations."""
+        return KPITable.from_dicts(
+            {
+                "waiting_time": {task_id: kpi.waiting_time.total for task_id, kpi in self.task_kpis.items()},
+                "idle_time": {task_id: kpi.idle_time.total for task_id, kpi in self.task_kpis.items()},
+                "batching_waiting_time": self.total_batching_waiting_time_per_task,
+                "execution_count": self.task_execution_counts,
+                "execution_count_with_wt_or_it": self.task_execution_count_with_wt_or_it,
+                "avg_batch_size": self.avg_batch_size_per_task,
+            },
+            defaults={"avg_batch_size": 1},
+        )
+
+    @cached_property
+    def task_enablement_table(self) -> KPITable:
+        """Get the number of hours per weekday each task was enabled in, as a (task × weekday) table."""
+        return KPITable.from_dicts(
+            {
+                day: {
+                    task_id: len(hours.get(day, {}))
+                    for task_id, hours in self.task_enablement_weekdays.items()
+                }
+                for day in DAYS
+            }
+        )
+
+    @cached_property
+    def resource_kpi_table(self) -> KPITable:
+        """Get the KPIs per resource as a (resource × KPI) table, e.g. for the PPO observations."""
+        return KPITable.from_dicts(
+            {
+                "batching_waiting_time": self.total_batching_waiting_time_per_resource,
+                "available_time": {
+                    resource_id: kpi.available_time for resource_id, kpi in self.resource_kpis.items()
+                },
+                "utilization": {
+                    resource_id: kpi.utilization for resource_id, kpi in self.resource_kpis.items()
+                },
+            }
+        )
+
+    # The rankings below are computed once per evaluation (with stable argsorts,
+    # so ties keep the order of the underlying dicts), the getters return copies.
+
+    @cached_property
+    def _task_names_sorted_by_waiting_time_desc(self) -> list[str]:
+        return _sort_ids_by_value(
+            {task_id: kpi.waiting_time.avg for task_id, kpi in self.task_kpis.items()}, descending=True
+        )
+
+    @cached_property
+    def _task_names_sorted_by_idle_time_desc(self) -> list[str]:
+        return _sort_ids_by_value(
+            {task_id: kpi.idle_time.avg for task_id, kpi in self.task_kpis.items()}, descending=True
+        )
+
+    @cached_property
+    def _most_frequent_enablement_weekdays_by_task(self) -> dict[str, list[DAY]]:
+        return {
+            task_id: _sort_ids_by_value(
+                {day: sum(hours.values()) for day, hours in weekdays.items()}, descending=True
+            )
+            for task_id, weekdays in self.task_enablement_weekdays.items()
+        }
 
-    resource_started_weekdays: dict[str, dict[DAY, dict[int, int]]]
-    """Get the weekdays & hours on which a resource started any task."""
+    @cached_property
+    def _least_utilized_resources(self) -> list[str]:
+        return _sort_ids_by_value(self.resource_utilizations, descending=False)
+
+    @cached_property
+    def _tasks_sorted_by_occurrences_of_wt_and_it(self) -> list[str]:
+        return _sort_ids_by_value(self.task_execution_count_with_wt_or_it, descending=True)
+
+    @cached_property
+    def _resources_sorted_by_task_execution_count(self) -> dict[str, list[str]]:
+        counts_by_task: dict[str, dict[str, int]] = {}
+        for resource_id, counts in self.task_execution_count_by_resource.items():
+            for task_id, count in counts.items():
+                counts_by_task.setdefault(task_id, {})[resource_id] = count
+        return {
+            task_id: _sort_ids_by_value(counts, descending=True) for task_id, counts in counts_by_task.items()
+        }
+
+    def _get_batch_frame(self) -> pd.DataFrame:
+        """Get the batches as a pandas DataFrame (for the grouped batch statistics).
 
-    tasks_by_number_of_duplicate_enablement_dates: dict[str, int]
-    """Get the tasks sorted by the number of duplicate enablement dates."""
+        NOTE: This is not cached on purpose, so the frame is not pickled when archiving.
+        """
+        table = self.event_table
+        batches = table.batches
+        return pd.DataFrame(
+            {
+                "activity": [table.task_ids[activity] for activity in batches.activity.tolist()],
+                "case": batches.case,
+                "resource": [table.resource_ids[resource] for resource in batches.resource.tolist()],
+                "batch_size": batches.size,
+                "batch_waiting_time_seconds": batches.wt_batching,
+                "fixed_cost": batches.fixed_cost,
+                "processing_time": batches.ideal_proc,
+            }
+        )
+
+    def _get_task_weekdays(
+        self, weekday: np.ndarray, hour: np.ndarray
+    ) -> dict[str, dict[DAY, dict[int, int]]]:
+        """Get the weekdays & hours of the given event columns, grouped by task."""
+        table = self.event_table
+        weekdays: dict[str, dict[DAY, dict[int, int]]] = {
+            table.task_ids[task]: {} for task in np.unique(table.task).tolist()
+        }
+        keys, counts = table.count_by(table.task, weekday, hour, mask=weekday != NO_WEEKDAY)
+        for (task, day, hour_of_day), count in zip(keys.tolist(), counts.tolist()):
+            weekdays[table.task_ids[task]].setdefault(DAY.from_weekday(day), {})[hour_of_day] = count
+        return weekdays
 
     @cached_property
     def total_processing_cost_for_tasks(self) -> float:
@@ -275,31 +560,18 @@ class Evaluation:
 
     def get_task_names_sorted_by_waiting_time_desc(self) -> list[str]:
         """Get a list of task names sorted by the average waiting time in desc order."""
-        task_waiting_time = [
-            (task_name, task_kpi.waiting_time.avg) for task_name, task_kpi in self.task_kpis.items()
-        ]
-        return [task_name for task_name, _ in sorted(task_waiting_time, key=lambda x: x[1], reverse=True)]
+        return list(self._task_names_sorted_by_waiting_time_desc)
 
     def get_task_names_sorted_by_idle_time_desc(self) -> list[str]:
         """Get a list of task names sorted by the average idle time in desc order."""
-        task_idle_time = [
-            (task_name, task_kpi.idle_time.avg) for task_name, task_kpi in self.task_kpis.items()
-        ]
-        return [task_name for task_name, _ in sorted(task_idle_time, key=lambda x: x[1], reverse=True)]
+        return list(self._task_names_sorted_by_idle_time_desc)
 
     def get_most_frequent_enablement_weekdays(self, task_name: str) -> list[DAY]:
         """Get a list of weekdays, on which the task was enabled.
 
         The list is sorted by the most common weekday first.
         """
-        return [
-            day
-            for day, _ in sorted(
-                self.task_enablement_weekdays[task_name].items(),
-                key=lambda x: sum(x[1].values()),
-                reverse=True,
-            )
-        ]
+        return list(self._most_frequent_enablement_weekdays_by_task[task_name])
 
     def get_most_frequent_resources(self, task_name: str) -> list[str]:
         """Get a list of resources that executed the task the most."""
@@ -307,12 +579,7 @@ class Evaluation:
 
     def get_least_utilized_resources(self) -> list[str]:
         """Get a list of resources that have the least utilization."""
-        return [
-            resource_name
-            for resource_name, _ in sorted(
-                self.resource_utilizations.items(), key=lambda x: x[1], reverse=False
-            )
-        ]
+        return list(self._least_utilized_resources)
 
     def get_tasks_sorted_by_occurrences_of_wt_and_it(self) -> list[str]:
         """Get a list of task names sorted by wt & it instances.
@@ -320,8 +587,7 @@ class Evaluation:
         In clear words: Orders descending the tasks by the number of times
         they were executed(number of events) and had either a waiting or idle time.
         """
-        occurrences = self.task_execution_count_with_wt_or_it
-        return [task_name for task_name, _ in sorted(occurrences.items(), key=lambda x: x[1], reverse=True)]
+        return list(self._tasks_sorted_by_occurrences_of_wt_and_it)
 
     def get_task_execution_count_by_resource(self, resource_id: str) -> dict[str, int]:
         """Get the number of times each task was executed by a given resource."""
@@ -350,16 +616,7 @@ class Evaluation:
 
         The list is sorted by the most common resource first.
         """
-        resource_counts = Counter(
-            {
-                resource_id: count[task_id]
-                for resource_id, count in self.task_execution_count_by_resource.items()
-                if task_id in count
-            }
-        )
-
-        # Return the resource_ids sorted by most common first
-        return [resource_id for resource_id, _ in resource_counts.most_common()]
+        return list(self._resources_sorted_by_task_execution_count.get(task_id, []))
 
     def get_total_processing_time_per_task(self) -> dict[str, float]:
         """Get the total processing time per task (excl. idle times)."""
@@ -408,250 +665,6 @@ class Evaluation:
         """Return a string representation of the evaluation."""
         return f"{Settings.get_pareto_x_label()}: {self.pareto_x:.1f}, {Settings.get_pareto_y_label()}: {self.pareto_y:.1f}"  # noqa: E501
 
-    @staticmethod
-    def get_task_enablement_weekdays(
-        cases: list[Trace],
-    ) -> dict[str, dict[DAY, dict[int, int]]]:
-        """Get the weekdays & time of day on which a task was enabled."""
-        weekdays: dict[str, dict[DAY, dict[int, int]]] = {}
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in event_list:
-                if event.task_id not in weekdays:
-                    weekdays[event.task_id] = {}
-                if event.enabled_datetime is None:
-                    continue
-                day = DAY.from_date(event.enabled_datetime)
-                hour = event.enabled_datetime.hour
-                if day not in weekdays[event.task_id]:
-                    weekdays[event.task_id][day] = {}
-                if hour not in weekdays[event.task_id][day]:
-                    weekdays[event.task_id][day][hour] = 0
-                weekdays[event.task_id][day][hour] += 1
-        return weekdays
-
-    @staticmethod
-    def get_task_started_at_weekdays(
-        cases: list[Trace],
-    ) -> dict[str, dict[DAY, dict[int, int]]]:
-        """Get the weekdays & time of day on which a task was started."""
-        weekdays: dict[str, dict[DAY, dict[int, int]]] = {}
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in event_list:
-                if event.task_id not in weekdays:
-                    weekdays[event.task_id] = {}
-                if event.started_datetime is None:
-                    continue
-                day = DAY.from_date(event.started_datetime)
-                hour = event.started_datetime.hour
-                if day not in weekdays[event.task_id]:
-                    weekdays[event.task_id][day] = {}
-                if hour not in weekdays[event.task_id][day]:
-                    weekdays[event.task_id][day][hour] = 0
-                weekdays[event.task_id][day][hour] += 1
-        return weekdays
-
-    @staticmethod
-    def _get_events_for_task(cases: list[Trace], task_name: str) -> list[TaskEvent]:
-        """Get all events for a task."""
-        return [event for case in cases for event in case.event_list if event.task_id == task_name]
-
-    @staticmethod
-    def get_resource_started_weekdays(
-        cases: list[Trace],
-    ) -> dict[str, dict[DAY, dict[int, int]]]:
-        """Get the weekdays & time of day on which a resource started a(/any) task."""
-        return {
-            resource_id: {
-                DAY(weekday): {hour: count for hour, count in task_start_times.items()}
-                for _, resource_start_times in task_start_times_by_day.items()
-                for weekday, task_start_times in resource_start_times.items()
-            }
-            for resource_id, task_start_times_by_day in Evaluation.get_resource_task_started_weekdays(
-                cases
-            ).items()
-        }
-
-    @staticmethod
-    def get_task_execution_counts(cases: list[Trace]) -> dict[str, int]:
-        """Get the count each task was executed."""
-        occurrences: dict[str, int] = {}
-        for case in cases:
-            for event in cast(list[TaskEvent], case.event_list):
-                occurrences[event.task_id] = occurrences.get(event.task_id, 0) + 1
-        return occurrences
-
-    @staticmethod
-    def get_task_execution_count_with_wt_or_it(cases: list[Trace]) -> dict[str, int]:
-        """Get the count each task was executed with a waiting or idle time."""
-        occurrences: dict[str, int] = {}
-        for case in cases:
-            for event in cast(list[TaskEvent], case.event_list):
-                if event.waiting_time is not None and event.waiting_time > 0:
-                    occurrences[event.task_id] = occurrences.get(event.task_id, 0) + 1
-                if event.idle_time is not None and event.idle_time > 0:
-                    occurrences[event.task_id] = occurrences.get(event.task_id, 0) + 1
-        return occurrences
-
-    @staticmethod
-    def get_task_execution_count_by_resources(
-        cases: list[Trace],
-    ) -> dict[str, dict[str, int]]:
-        """Get the number of times each task was executed by a given resource."""
-        occurrences: dict[str, dict[str, int]] = {}
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in cast(list[TaskEvent], event_list):
-                occurrences[event.resource_id] = occurrences.get(event.resource_id, {})
-                occurrences[event.resource_id][event.task_id] = (
-                    occurrences[event.resource_id].get(event.task_id, 0) + 1
-                )
-        return occurrences
-
-    @staticmethod
-    def get_resource_task_started_weekdays(
-        cases: list[Trace],
-    ) -> dict[str, dict[str, dict[DAY, dict[int, int]]]]:
-        """Get the weekdays & time of day on which a task was started by a resource."""
-        weekdays: dict[str, dict[str, dict[DAY, dict[int, int]]]] = {}
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in event_list:
-                if event.resource_id not in weekdays:
-                    weekdays[event.resource_id] = {}
-                if event.task_id not in weekdays[event.resource_id]:
-                    weekdays[event.resource_id][event.task_id] = {}
-                if event.started_datetime is None:
-                    continue
-                day = DAY.from_date(event.started_datetime)
-                hour = event.started_datetime.hour
-                if day not in weekdays[event.resource_id][event.task_id]:
-                    weekdays[event.resource_id][event.task_id][day] = {}
-                if hour not in weekdays[event.resource_id][event.task_id][day]:
-                    weekdays[event.resource_id][event.task_id][day][hour] = 0
-                weekdays[event.resource_id][event.task_id][day][hour] += 1
-        return weekdays
-
-    @staticmethod
-    def get_resource_allocation_ratio(
-        cases: list[Trace],
-    ) -> dict[str, float]:
-        """Get the allocation ratio of each task.
-
-        The allocation ratio is calculated =
-        (number of unique resources that executed the task) / (total number of resources)
-        """
-        resources_total = set()
-        resources_per_task: dict[str, set[str]] = {}
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in event_list:
-                resources_per_task[event.task_id] = resources_per_task.get(event.task_id, set())
-                resources_per_task[event.task_id].add(event.resource_id)
-                resources_total.add(event.resource_id)
-
-        return {
-            task_id: len(resources) / len(resources_total)
-            for task_id, resources in resources_per_task.items()
-        }
-
-    @staticmethod
-    def get_tasks_by_number_of_duplicate_enablement_dates(
-        cases: list[Trace],
-    ) -> dict[str, int]:
-        """Get the tasks sorted by the number of duplicate enablement dates.
-
-        Meaning the more often the same task is enabled at the same time, the higher the rank.
-        The granularity is one hour.
-        NOTE: tasks with only one enablement at a given time are not considered.
-        """
-        tasks_with_enablement_dates: dict[str, dict[DAY, dict[int, int]]] = dict()
-        for case in cases:
-            event_list: list[TaskEvent] = case.event_list
-            for event in event_list:
-                if event.task_id not in tasks_with_enablement_dates:
-                    tasks_with_enablement_dates[event.task_id] = {}
-                if event.started_datetime is None:
-                    continue
-                day = DAY.from_date(event.started_datetime)
-                hour = event.started_datetime.hour
-                if day not in tasks_with_enablement_dates[event.task_id]:
-                    tasks_with_enablement_dates[event.task_id][day] = {}
-                if hour not in tasks_with_enablement_dates[event.task_id][day]:
-                    tasks_with_enablement_dates[event.task_id][day][hour] = 0
-                tasks_with_enablement_dates[event.task_id][day][hour] += 1
-
-        return {
-            task_id: sum(
-                sum(count for count in day_counts.values() if count > 1)
-                for day_counts in tasks_with_enablement_dates[task_id].values()
-            )
-            for task_id in tasks_with_enablement_dates
-        }
-
-    @staticmethod
-    def get_batches_by_activity_with_idle(
-        batches: dict[BatchInfoKey, BatchInfo],
-    ) -> dict[str, list[SimpleBatchInfo]]:
-        """Get batches grouped by activity, only including those with idle time.
-
-        Returns a dict where:
-        - key: activity name
-        - value: list of dicts containing only the essential batch info:
-            {
-                'accumulation_begin': datetime,
-                'start': datetime,
-                'ideal_proc': float,
-                'idle_time': float
-            }
-        """
-        result: dict[str, list[SimpleBatchInfo]] = {}
-        for batch in batches.values():
-            if batch["idle_time"] == 0:
-                continue
-
-            activity = batch["activity"]
-            if activity not in result:
-                result[activity] = []
-
-            result[activity].append(
-                {
-                    "accumulation_begin": batch["accumulation_begin"],
-                    "start": batch["start"],
-                    "ideal_proc": batch["ideal_proc"],
-                    "idle_time": batch["idle_time"],
-                }
-            )
-
-        return result
-
-    @staticmethod
-    def get_average_batch_size_per_task(
-        batches: dict[BatchInfoKey, BatchInfo],
-    ) -> dict[str, float]:
-        """Get the average batch size per task."""
-        batches_by_task = {}
-        for batch in batches.values():
-            task_id = batch["activity"]
-            if task_id not in batches_by_task:
-                batches_by_task[task_id] = []
-            batches_by_task[task_id].append(batch)
-
-        return {
-            task_id: sum(batch["size"] for batch in batches) / len(batches)
-            for task_id, batches in batches_by_task.items()
-        }
-
-    @staticmethod
-    def get_avg_batch_size_for_batch_enabled_tasks(
-        batches: dict[BatchInfoKey, BatchInfo],
-    ) -> float:
-        """Get the average batch size over all batches."""
-        if not batches:
-            return 0
-        return sum(batch["size"] for batch in batches.values()) / len(batches)
-
     @staticmethod
     def empty() -> "Evaluation":
         """Create an empty evaluation."""
@@ -663,29 +676,11 @@ class Evaluation:
             is_empty=True,
             task_kpis={},
             resource_kpis={},
-            task_execution_count_with_wt_or_it={},
-            task_execution_count_by_resource={},
-            task_execution_counts={},
-            task_enablement_weekdays={},
-            task_started_weekdays={},
-            avg_batching_waiting_time_per_task={},
-            total_batching_waiting_time_per_task={},
-            total_batching_waiting_time_per_resource={},
-            avg_batching_waiting_time_by_case=0,
-            total_batching_waiting_time=0,
             avg_waiting_time_by_case=0,
             total_waiting_time=0,
             total_processing_time=0,
             sum_of_durations=0,
             sum_of_cycle_times=0,
-            total_fixed_cost_by_task={},
-            avg_fixed_cost_per_case=0,
-            resource_allocation_ratio_task={},
-            batches_by_activity_with_idle={},
-            avg_batch_size_per_task={},
-            avg_batch_size_for_batch_enabled_tasks=0,
-            resource_started_weekdays={},
-            tasks_by_number_of_duplicate_enablement_dates={},
             avg_idle_wt_per_task_instance=0,
             avg_batch_processing_time_per_task_instance=0,
         )
@@ -697,7 +692,11 @@ class Evaluation:
         batching_rules_exist: bool,
         result: RunSimulationResult,
     ) -> "Evaluation":
-        """Create an evaluation from a simulation result."""
+        """Create an evaluation from a simulation result.
+
+        Only the values needed for the pareto objectives are computed here,
+        everything else is derived lazily from the (compact) event table.
+        """
         global_kpis, task_kpis, resource_kpis, log_info = result
         cases: list[Trace] = [] if log_info is None else log_info.trace_list
 
@@ -706,28 +705,7 @@ class Evaluation:
             return Evaluation.empty()
 
         batches = get_batches_from_event_log(log_info, fixed_cost_fns, batching_rules_exist)
-
-        batches_greater_than_one = {
-            batch_key: batch for batch_key, batch in batches.items() if batch["size"] > 1
-        }
-
-        batch_pd = pd.DataFrame(
-            {
-                "batch_id": batch["batch_id"],
-                "activity": batch["activity"],
-                "case": batch["case"],
-                "resource": batch["resource"],
-                "batch_size": batch["size"],
-                "batch_waiting_time_seconds": batch["wt_batching"],
-                "fixed_cost": batch["fixed_cost"],
-                "processing_time": batch["ideal_proc"],
-            }
-            for batch in batches.values()
-        )
-
-        total_fixed_cost_by_task = batch_pd.groupby("activity")["fixed_cost"].sum().fillna(0).to_dict()
-
-        avg_fixed_cost_per_case = float(batch_pd.groupby("case")["fixed_cost"].sum().mean())
+        event_table = EventTable.from_log_info(log_info, batches)
 
         first_enablement = min(
             [event.enabled_datetime for trace in log_info.trace_list for event in trace.event_list],
@@ -751,6 +729,13 @@ class Evaluation:
         # This means that we take sum of processing times per unique batch
         # and divide by the number of task_instances
         # Which in this case can be achieved by taking the sum of batch sizes
+        batch_pd = pd.DataFrame(
+            {
+                "batch_id": [batch["batch_id"] for batch in batches.values()],
+                "batch_size": event_table.batches.size,
+                "processing_time": event_table.batches.ideal_proc,
+            }
+        )
         task_instance_count = batch_pd.groupby("batch_id")["batch_size"].first().sum()
 
         if task_instance_count > 0:
@@ -778,13 +763,6 @@ class Evaluation:
             [kpi.idle_cycle_time.total for kpi in task_kpis.values() if kpi.idle_cycle_time.total is not None]
         )
 
-        # print("\n".join([
-        #    f"{event.started_datetime.isoformat()} -> {event.completed_datetime.isoformat()} "
-        #    f"(enabled: {event.enabled_datetime.isoformat()}) "
-        #    f"(I:{event.idle_time / 3600}, P:{event.processing_time/3600}, "
-        #    f"WT:{event.waiting_time/3600}, C:{event.cycle_time / 3600})"
-        #    for trace in log_info.trace_list for event in trace.event_list
-        # ]))
         return Evaluation(
             hourly_rates=hourly_rates,
             total_duration=total_duration,
@@ -800,39 +778,18 @@ class Evaluation:
             is_empty=not cases,
             task_kpis=task_kpis,
             resource_kpis=resource_kpis,
-            task_execution_count_with_wt_or_it=Evaluation.get_task_execution_count_with_wt_or_it(cases),
-            task_execution_count_by_resource=Evaluation.get_task_execution_count_by_resources(cases),
-            task_execution_counts=Evaluation.get_task_execution_counts(cases),
-            task_enablement_weekdays=Evaluation.get_task_enablement_weekdays(cases),
-            task_started_weekdays=Evaluation.get_task_started_at_weekdays(cases),
-            resource_allocation_ratio_task=Evaluation.get_resource_allocation_ratio(cases),
-            avg_batching_waiting_time_per_task=(
-                batch_pd.groupby("activity")["batch_waiting_time_seconds"].mean().fillna(0).to_dict()
-            ),
-            total_batching_waiting_time_per_task=(
-                batch_pd.groupby("activity")["batch_waiting_time_seconds"].sum().fillna(0).to_dict()
-            ),
-            total_batching_waiting_time_per_resource=(
-                batch_pd.groupby("resource")["batch_waiting_time_seconds"].sum().fillna(0).to_dict()
-            ),
-            avg_batching_waiting_time_by_case=float(batch_pd["batch_waiting_time_seconds"].mean()),
-            total_batching_waiting_time=(batch_pd["batch_waiting_time_seconds"].sum()),
-            total_fixed_cost_by_task=total_fixed_cost_by_task,
-            avg_fixed_cost_per_case=avg_fixed_cost_per_case,
-            batches_by_activity_with_idle=Evaluation.get_batches_by_activity_with_idle(
-                batches_greater_than_one
-            ),
-            avg_batch_size_per_task=Evaluation.get_average_batch_size_per_task(batches_greater_than_one),
-            avg_batch_size_for_batch_enabled_tasks=Evaluation.get_avg_batch_size_for_batch_enabled_tasks(
-                batches_greater_than_one
-            ),
-            resource_started_weekdays=Evaluation.get_resource_started_weekdays(cases),
-            tasks_by_number_of_duplicate_enablement_dates=Evaluation.get_tasks_by_number_of_duplicate_enablement_dates(
-                cases
-            ),
+            event_table=event_table,
         )
 
     @property
     def achieved_cycle_time(self) -> float:
         """Return the achieved cycle time."""
         return self.total_cycle_time
+
+
+def _sort_ids_by_value(values: Mapping[T, float], descending: bool) -> list[T]:
+    """Sort the ids by their value (stable, so ties keep the order of the mapping)."""
+    ids = list(values)
+    array = np.fromiter(values.values(), dtype=np.float64, count=len(ids))
+    order = np.argsort(-array if descending else array, kind="stable")
+    return [ids[i] for i in order.tolist()]
@@ -0,0 +1,213 @@
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from typing import Optional
+
+import numpy as np
+from prosimos.simulation_stats_calculator import LogInfo
+
+from o2.util.waiting_time_helper import BatchInfo, BatchInfoKey
+
+NO_WEEKDAY = -1
+"""Marker for events, that have no enablement / start datetime."""
+
+
+@dataclass(frozen=True)
+class BatchTable:
+    """A compact, columnar representation of the batches of a simulation run.
+
+    Every column has one entry per batch (in the order of `get_batches_from_event_log`),
+    activities & resources are stored as indices into the `EventTable` id lists.
+    """
+
+    activity: np.ndarray
+    resource: np.ndarray
+    case: np.ndarray
+    size: np.ndarray
+    wt_batching: np.ndarray
+    fixed_cost: np.ndarray
+    ideal_proc: np.ndarray
+    idle_time: np.ndarray
+    accumulation_begin: np.ndarray
+    """Timestamp (seconds since epoch) of the first enablement in the batch.
+
+    NOTE: Only set for batches (size > 1) with idle time, NaN otherwise.
+    """
+    start: np.ndarray
+    """Timestamp (seconds since epoch) of the batch execution start.
+
+    NOTE: Only set for batches (size > 1) with idle time, NaN otherwise.
+    """
+
+    def __len__(self) -> int:
+        """Return the number of batches."""
+        return len(self.activity)
+
+    @staticmethod
+    def empty() -> "BatchTable":
+        """Create an empty batch table."""
+        return BatchTable(
+            activity=np.empty(0, dtype=np.int32),
+            resource=np.empty(0, dtype=np.int32),
+            case=np.empty(0, dtype=np.int64),
+            size=np.empty(0, dtype=np.int64),
+            wt_batching=np.empty(0, dtype=np.float64),
+            fixed_cost=np.empty(0, dtype=np.float64),
+            ideal_proc=np.empty(0, dtype=np.float64),
+            idle_time=np.empty(0, dtype=np.float64),
+            accumulation_begin=np.empty(0, dtype=np.float64),
+            start=np.empty(0, dtype=np.float64),
+        )
+
+
+@dataclass(frozen=True)
+class EventTable:
+    """A compact, columnar representation of a simulation event log.
+
+    It only keeps the columns needed to derive the statistics of an `Evaluation`,
+    so that those can be computed lazily (on first access) instead of keeping
+    (or eagerly aggregating) the full prosimos event log.
+
+    Task & resource ids are stored as indices into `task_ids` / `resource_ids`.
+    The indices are assigned in order of first occurrence, so sorting by index
+    preserves the order in which tasks/resources appeared in the event log.
+    """
+
+    task_ids: list[str]
+    resource_ids: list[Optional[str]]
+
+    task: np.ndarray
+    resource: np.ndarray
+    enabled_weekday: np.ndarray
+    """Weekday (0 = Monday) of the enablement, or NO_WEEKDAY."""
+    enabled_hour: np.ndarray
+    started_weekday: np.ndarray
+    """Weekday (0 = Monday) of the start, or NO_WEEKDAY."""
+    started_hour: np.ndarray
+    has_waiting_time: np.ndarray
+    has_idle_time: np.ndarray
+
+    batches: BatchTable
+    timezone: Optional[tzinfo] = None
+    """The timezone of the event log datetimes, used to restore batch datetimes."""
+
+    def __len__(self) -> int:
+        """Return the number of events."""
+        return len(self.task)
+
+    def count_by(
+        self, *columns: np.ndarray, mask: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Count the occurrences of each unique combination of the given columns.
+
+        Returns the unique rows and their counts, ordered by first occurrence
+        in the event log (same ordering a dict based aggregation would produce).
+        """
+        selected = [column if mask is None else column[mask] for column in columns]
+        if len(selected[0]) == 0:
+            return np.empty((0, len(columns)), dtype=np.int64), np.empty(0, dtype=np.int64)
+        stacked = np.stack(selected, axis=1).astype(np.int64)
+        unique_rows, first_index, counts = np.unique(stacked, axis=0, return_index=True, return_counts=True)
+        order = np.argsort(first_index, kind="stable")
+        return unique_rows[order], counts[order]
+
+    def to_datetime(self, timestamp: float) -> datetime:
+        """Convert a timestamp column value back to a datetime."""
+        return datetime.fromtimestamp(timestamp, self.timezone)
+
+    @staticmethod
+    def empty() -> "EventTable":
+        """Create an empty event table."""
+        return EventTable(
+            task_ids=[],
+            resource_ids=[],
+            task=np.empty(0, dtype=np.int32),
+            resource=np.empty(0, dtype=np.int32),
+            enabled_weekday=np.empty(0, dtype=np.int8),
+            enabled_hour=np.empty(0, dtype=np.int8),
+            started_weekday=np.empty(0, dtype=np.int8),
+            started_hour=np.empty(0, dtype=np.int8),
+            has_waiting_time=np.empty(0, dtype=np.bool_),
+            has_idle_time=np.empty(0, dtype=np.bool_),
+            batches=BatchTable.empty(),
+        )
+
+    @staticmethod
+    def from_log_info(log_info: LogInfo, batches: dict[BatchInfoKey, BatchInfo]) -> "EventTable":
+        """Create an event table from a prosimos event log and its batches.
+
+        This is a single pass over all events, only extracting primitive values.
+        """
+        task_index: dict[str, int] = {}
+        resource_index: dict[Optional[str], int] = {}
+
+        task, resource = [], []
+        enabled_weekday, enabled_hour = [], []
+        started_weekday, started_hour = [], []
+        has_waiting_time, has_idle_time = [], []
+        timezone: Optional[tzinfo] = None
+
+        for trace in log_info.trace_list:
+            for event in trace.event_list:
+                task.append(task_index.setdefault(event.task_id, len(task_index)))
+                resource.append(resource_index.setdefault(event.resource_id, len(resource_index)))
+                if event.enabled_datetime is None:
+                    enabled_weekday.append(NO_WEEKDAY)
+                    enabled_hour.append(0)
+                else:
+                    enabled_weekday.append(event.enabled_datetime.weekday())
+                    enabled_hour.append(event.enabled_datetime.hour)
+                if event.started_datetime is None:
+                    started_weekday.append(NO_WEEKDAY)
+                    started_hour.append(0)
+                else:
+                    timezone = timezone or event.started_datetime.tzinfo
+                    started_weekday.append(event.started_datetime.weekday())
+                    started_hour.append(event.started_datetime.hour)
+                has_waiting_time.append(event.waiting_time is not None and event.waiting_time > 0)
+                has_idle_time.append(event.idle_time is not None and event.idle_time > 0)
+
+        batch_list = list(batches.values())
+        # The datetimes are only needed for batches with idle time (see
+        # Evaluation.batches_by_activity_with_idle), so we skip the conversion for the others.
+        with_idle_time = [b["size"] > 1 and b["idle_time"] != 0 for b in batch_list]
+        batch_table = BatchTable(
+            activity=np.array(
+                [task_index.setdefault(b["activity"], len(task_index)) for b in batch_list], dtype=np.int32
+            ),
+            resource=np.array(
+                [resource_index.setdefault(b["resource"], len(resource_index)) for b in batch_list],
+                dtype=np.int32,
+            ),
+            case=np.array([b["case"] for b in batch_list], dtype=np.int64),
+            size=np.array([b["size"] for b in batch_list], dtype=np.int64),
+            wt_batching=np.array([b["wt_batching"] for b in batch_list], dtype=np.float64),
+            fixed_cost=np.array([b["fixed_cost"] for b in batch_list], dtype=np.float64),
+            ideal_proc=np.array([b["ideal_proc"] for b in batch_list], dtype=np.float64),
+            idle_time=np.array([b["idle_time"] for b in batch_list], dtype=np.float64),
+            accumulation_begin=np.array(
+                [
+                    b["accumulation_begin"].timestamp() if idle else np.nan
+                    for b, idle in zip(batch_list, with_idle_time)
+                ],
+                dtype=np.float64,
+            ),
+            start=np.array(
+                [b["start"].timestamp() if idle else np.nan for b, idle in zip(batch_list, with_idle_time)],
+                dtype=np.float64,
+            ),
+        )
+
+        return EventTable(
+            task_ids=list(task_index),
+            resource_ids=list(resource_index),
+            task=np.array(task, dtype=np.int32),
+            resource=np.array(resource, dtype=np.int32),
+            enabled_weekday=np.array(enabled_weekday, dtype=np.int8),
+            enabled_hour=np.array(enabled_hour, dtype=np.int8),
+            started_weekday=np.array(started_weekday, dtype=np.int8),
+            started_hour=np.array(started_hour, dtype=np.int8),
+            has_waiting_time=np.array(has_waiting_time, dtype=np.bool_),
+            has_idle_time=np.array(has_idle_time, dtype=np.bool_),
+            batches=batch_table,
+            timezone=timezone,
+        )
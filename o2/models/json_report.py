@@ -1,6 +1,8 @@
 import datetime
+import json
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 from dataclass_wizard import JSONWizard
 from pydantic import BaseModel
@@ -62,6 +64,43 @@ class JSONReport(BaseModel):
             created_at=datetime.datetime.now().isoformat(),
         )
 
+    @staticmethod
+    def from_deltas(deltas: Iterable[Union[str, bytes]]) -> "JSONReport":
+        """Assemble the report from the (JSON encoded) deltas of an `IncrementalJSONReport`.
+
+        The deltas are merged as plain JSON, so only the solutions, that are
+        part of the current pareto fronts, are validated.
+        """
+        header: Optional[dict[str, Any]] = None
+        solutions: dict[str, Any] = {}
+        fronts: list[list[str]] = []
+        created_at = None
+        is_final = False
+        for delta in deltas:
+            data = json.loads(delta)
+            if data["header"] is not None:
+                header = data["header"]
+            solutions.update(data["solutions"])
+            fronts = fronts[: data["number_of_fronts"]]
+            fronts += [[] for _ in range(data["number_of_fronts"] - len(fronts))]
+            for i, ids in data["pareto_fronts"].items():
+                fronts[int(i)] = ids
+            created_at = data["created_at"]
+            is_final = data["is_final"]
+        if header is None:
+            raise ValueError("The deltas don't contain a report header")
+
+        return JSONReport.model_validate(
+            {
+                **header,
+                "pareto_fronts": [
+                    {"solutions": [solutions[solution_id] for solution_id in ids]} for ids in fronts
+                ],
+                "is_final": is_final,
+                "created_at": created_at,
+            }
+        )
+
     class Config:
         """pydantic config for JSONReport."""
 
@@ -70,6 +109,100 @@ class JSONReport(BaseModel):
         allow_inf_nan = True
 
 
+class JSONReportHeader(BaseModel):
+    """The fields of a `JSONReport`, that don't change during an optimization."""
+
+    name: str
+    constraints: ConstraintsType
+    bpmn_definition: str
+    task_names: dict[str, str]
+    base_solution: "_JSONSolution"
+    approach: Optional[str] = None
+    cost_type: CostType
+
+    class Config:
+        """pydantic config for JSONReportHeader."""
+
+        frozen = True
+        ser_json_inf_nan = "strings"
+        allow_inf_nan = True
+
+
+class JSONReportDelta(BaseModel):
+    """The changes of a report since the previous delta (see `IncrementalJSONReport`)."""
+
+    created_at: str
+    header: Optional[JSONReportHeader]
+    """The header of the report (only set in the first delta)."""
+    solutions: dict[str, "_JSONSolution"]
+    """The solutions (by id), that weren't part of a previous delta."""
+    pareto_fronts: dict[int, list[str]]
+    """The solution ids of the pareto fronts that changed (by index)."""
+    number_of_fronts: int
+    is_final: bool
+
+    class Config:
+        """pydantic config for JSONReportDelta."""
+
+        frozen = True
+        ser_json_inf_nan = "strings"
+        allow_inf_nan = True
+
+
+class IncrementalJSONReport:
+    """Creates a report of an optimization as a sequence of deltas.
+
+    `JSONReport.from_store` converts every solution of every pareto front,
+    on every call. Instead each delta only contains the solutions, that are
+    new to the report, and the pareto fronts, that changed, so the work per
+    iteration is proportional to the progress of the optimization, not to
+    the size of the report. The full report can be assembled from the deltas
+    with `JSONReport.from_deltas`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the report (the first delta will contain the header)."""
+        self._header_created = False
+        self._solution_ids: set[str] = set()
+        self._fronts: list[list[str]] = []
+
+    def get_delta(self, store: Store, is_final: bool = False) -> JSONReportDelta:
+        """Get the changes of the store since the last delta."""
+        header = None
+        if not self._header_created:
+            header = JSONReportHeader(
+                name=store.name,
+                constraints=store.constraints,
+                bpmn_definition=store.base_state.bpmn_definition,
+                task_names=store.base_state.get_task_names(),
+                base_solution=_JSONSolution.from_state_evaluation(store.base_solution, store),
+                approach=str(store.settings.legacy_approach),
+                cost_type=store.settings.COST_TYPE,
+            )
+            self._header_created = True
+
+        solutions: dict[str, _JSONSolution] = {}
+        fronts: dict[int, list[str]] = {}
+        for i, pareto_front in enumerate(store.pareto_fronts):
+            for solution in pareto_front.solutions:
+                if solution.id not in self._solution_ids:
+                    self._solution_ids.add(solution.id)
+                    solutions[solution.id] = _JSONSolution.from_state_evaluation(solution, store)
+            ids = [solution.id for solution in pareto_front.solutions]
+            if i >= len(self._fronts) or self._fronts[i] != ids:
+                fronts[i] = ids
+        self._fronts = [[solution.id for solution in front.solutions] for front in store.pareto_fronts]
+
+        return JSONReportDelta(
+            created_at=datetime.datetime.now().isoformat(),
+            header=header,
+            solutions=solutions,
+            pareto_fronts=fronts,
+            number_of_fronts=len(store.pareto_fronts),
+            is_final=is_final,
+        )
+
+
 @dataclass(frozen=True)
 class _JSONParetoFront(JSONWizard):
     solutions: list["_JSONSolution"]
@@ -0,0 +1,55 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class KPITable:
+    """A compact (id × KPI) array of the KPIs of an `Evaluation`, e.g. per task or per resource.
+
+    The rows are indexed by `index`, the columns are named by `columns`.
+    The last row holds the default values, which are used for ids without KPIs
+    (e.g. tasks, that were never executed), so lookups stay vectorized.
+    """
+
+    index: dict[str, int]
+    columns: tuple[str, ...]
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        """Return the number of ids (without the default row)."""
+        return len(self.index)
+
+    def get_rows(self, ids: list[str]) -> np.ndarray:
+        """Get the rows for the given ids (in that order), as a (len(ids) × KPI) array."""
+        rows = np.fromiter((self.index.get(id, -1) for id in ids), dtype=np.intp, count=len(ids))
+        return self.values[rows]
+
+    def get_columns(self, ids: list[str]) -> dict[str, np.ndarray]:
+        """Get the KPI columns for the given ids (in that order)."""
+        rows = self.get_rows(ids)
+        return {column: rows[:, i] for i, column in enumerate(self.columns)}
+
+    @staticmethod
+    def from_dicts(
+        columns: Mapping[str, Mapping[str, float]],
+        defaults: Optional[Mapping[str, float]] = None,
+    ) -> "KPITable":
+        """Create a table from one dict (id -> value) per KPI.
+
+        The ids are the union of all dict keys, KPIs missing for an id are set
+        to their default (0 if not given).
+        """
+        defaults = defaults or {}
+        index: dict[str, int] = {}
+        for values in columns.values():
+            for id in values:
+                index.setdefault(id, len(index))
+
+        table = np.empty((len(index) + 1, len(columns)), dtype=np.float64)
+        for i, (column, values) in enumerate(columns.items()):
+            default = defaults.get(column, 0)
+            table[:, i] = [values.get(id, default) for id in index] + [default]
+        return KPITable(index=index, columns=tuple(columns), values=table)
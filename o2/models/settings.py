@@ -114,6 +114,19 @@ class ActionVariationSelection(Enum):
             return self
 
 
+class FsyncPolicy(Enum):
+    """When to fsync the files written by the background writer of the SolutionDumper."""
+
+    NEVER = "never"
+    """Never fsync, leave it to the OS when to write to disk (fastest)."""
+
+    BATCH = "batch"
+    """Fsync every written file & once per batch for appended files."""
+
+    ALWAYS = "always"
+    """Fsync after every single write (slowest, but safest)."""
+
+
 @dataclass()
 class Settings:
     """Settings for the Optimos v2 application.
@@ -253,6 +266,14 @@ class Settings:
     ppo_steps_per_iteration = 50
     """The number of steps per iteration for the PPO agent."""
 
+    ppo_actions_per_step = 1
+    """The number of distinct actions the PPO agent samples per step.
+
+    The actions are sampled (without replacement) from the masked policy
+    distribution and evaluated in parallel, each evaluated action is added as a
+    transition to the rollout buffer. Should be at most MAX_THREADS_ACTION_EVALUATION.
+    """
+
     log_to_tensor_board = False
     """Should the evaluation be logged to TensorBoard?"""
 
@@ -262,6 +283,25 @@ class Settings:
     Useful for debugging, but should be disabled for production.
     """
 
+    checkpoint_path: Optional[str] = None
+    """The file to append the checkpoints of the optimization to (disabled if None).
+
+    Only the changes since the last checkpoint are appended, see `o2.checkpoint.Checkpointer`.
+    An interrupted run can be continued with `Optimizer.resume(checkpoint_path)`.
+    """
+
+    checkpoint_interval = 10
+    """Write a checkpoint every n iterations (if checkpoint_path is set)."""
+
+    island_migration_interval = 10
+    """Exchange pareto front solutions with the other islands every n iterations.
+
+    Only used if the optimizer runs as an island, see `o2.island_optimizer.IslandOptimizer`.
+    """
+
+    island_max_migrants = 5
+    """The maximum number of (new) front solutions an island sends per migration."""
+
     disable_action_validity_check = False
     """Disables the logic to check if actions produces sensible results, before actually evaluating them.
 
@@ -313,6 +353,47 @@ class Settings:
     """The maximum number of threads to use for parallel evaluation
     of actions."""
 
+    ACTION_EVALUATION_TIMEOUT: ClassVar[Optional[float]] = None
+    """The time limit (in seconds) for the evaluation of a single action (disabled if None).
+
+    Actions exceeding it (e.g. because of a timetable with extremely long queues) are
+    marked as invalid, instead of blocking the whole iteration.
+    """
+
+    STRAGGLER_QUORUM: ClassVar[Optional[float]] = None
+    """The share of an iteration's actions, after which the remaining ones are considered stragglers.
+
+    E.g. with 0.75, as soon as 75% of the actions are evaluated, the remaining ones get
+    STRAGGLER_GRACE_FACTOR times the time elapsed so far to finish, afterwards they are
+    cancelled & dropped for this iteration (they are not marked as invalid, so they
+    may be tried again). Disabled if None.
+    NOTE: Running evaluations in a ProcessPoolExecutor can't be cancelled, so set
+    ACTION_EVALUATION_TIMEOUT as well, to free their workers.
+    """
+
+    STRAGGLER_GRACE_FACTOR: ClassVar[float] = 1.0
+    """See STRAGGLER_QUORUM."""
+
+    MAX_THREADS_ACTION_GENERATION: ClassVar[int] = 1
+    """The maximum number of processes to use for generating (and validating) actions.
+
+    If > 1, the agent expands the entries of the action catalog in parallel, and
+    merges the candidates by their rating, before selecting the actions to evaluate.
+    Otherwise the actions are pulled round-robin from the generators (default).
+    """
+
+    DISTRIBUTED_EVALUATION_TIMEOUT: ClassVar[float] = 600.0
+    """The time (in seconds) a distributed evaluation job may take, before it's resubmitted.
+
+    See `o2.distributed_evaluation.DistributedEvaluationBackend`.
+    """
+
+    DISTRIBUTED_EVALUATION_MAX_RETRIES: ClassVar[int] = 2
+    """How often a failed/timed out distributed evaluation job is resubmitted, before giving up."""
+
+    DISTRIBUTED_WORKER_CACHE_SIZE: ClassVar[int] = 1000
+    """The number of evaluations a distributed evaluation worker caches (by timetable hash)."""
+
     MAX_THREADS_MEDIAN_CALCULATION: ClassVar[int] = 1
     """The maximum number of threads to use for parallel median calculation.
 
@@ -324,10 +405,20 @@ class Settings:
     """The maximum number of yields per action.
 
     This will be enforced even over multiple iterations (as long as the base_solution
-    is not changed). Usually it doesn't make sense to set this, as the number of solutions can be controlled
+    is not changed, or the agent returns to it with cached action generators). Usually it
+    doesn't make sense to set this, as the number of solutions can be controlled
     by the max_number_of_actions_per_iteration.
     """
 
+    MAX_CACHED_ACTION_GENERATORS: ClassVar[int] = 32
+    """The number of base solutions, for which the agent keeps the state of the action generators.
+
+    When the agent returns to one of those solutions (e.g. when it's reinserted),
+    the generators resume where they left off, instead of being recreated.
+    The least recently used solutions are evicted first. Set to 0 to always
+    recreate the generators.
+    """
+
     ADD_SIZE_RULE_TO_NEW_RULES: ClassVar[bool] = True
     """Should a size rule be added to new rules?
 
@@ -394,6 +485,39 @@ class Settings:
     to the file system via pickle and loaded on demand.
     """
 
+    ARCHIVE_SOLUTIONS_TO_SQLITE: ClassVar[bool] = False
+    """Should the solutions be archived to a single sqlite file instead of pickle files?
+
+    Only used if `ARCHIVE_SOLUTIONS` is enabled. Instead of one pickle file per
+    evaluation & state (and the solutions pickle stream), everything is written
+    to `solutions.sqlite` in the run folder, which also has an R*-tree index on the
+    pareto points. See `o2.util.solution_archive.SolutionArchive`.
+    """
+
+    ASYNC_SOLUTION_DUMPS: ClassVar[bool] = True
+    """Should archived evaluations, states & solutions be written in a background thread?
+
+    This way the optimizer doesn't stall on disk I/O. Archived objects that are
+    not yet written can still be loaded. Doesn't apply to the sqlite archive.
+    """
+
+    SOLUTION_DUMP_QUEUE_SIZE: ClassVar[int] = 1000
+    """The max number of pending background writes, before the optimizer blocks."""
+
+    SOLUTION_DUMP_FSYNC_POLICY: ClassVar[FsyncPolicy] = FsyncPolicy.NEVER
+    """When to fsync the background writes (see `FsyncPolicy`)."""
+
+    ARCHIVE_SOLUTION_KPIS: ClassVar[bool] = True
+    """Should the scalar KPIs of archived solutions also be written to a columnar store?
+
+    Only used if `ARCHIVE_SOLUTIONS` is enabled. The KPIs (e.g. pareto x/y, cycle time)
+    can then be read memory-mapped, without unpickling the archived evaluation.
+    See `o2.util.kpi_store.KpiStore`.
+
+    The timetable hashes of the archived states are stored as well, so duplicate
+    detection doesn't need to load the states (see `o2.util.fingerprint_store`).
+    """
+
     DELETE_LOADED_SOLUTION_ARCHIVES: ClassVar[bool] = True
     """If an archived solution is loaded, should it be deleted?
 
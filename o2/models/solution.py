@@ -100,12 +100,29 @@ class Solution:
     @functools.cached_property
     def pareto_x(self) -> float:
         """Return the pareto x of the solution."""
-        return self.evaluation.pareto_x
+        return self.get_kpi("pareto_x")
 
     @functools.cached_property
     def pareto_y(self) -> float:
         """Return the pareto y of the solution."""
-        return self.evaluation.pareto_y
+        return self.get_kpi("pareto_y")
+
+    def get_kpi(self, kpi: str) -> float:
+        """Return a scalar KPI (see `o2.util.kpi_store.KPI_COLUMNS`) of the evaluation.
+
+        If the evaluation is archived, the KPI is read from the kpi store, so
+        that the full evaluation doesn't need to be loaded.
+        """
+        if (
+            self._evaluation is None
+            and self.__dict__.get("evaluation") is None
+            and Settings.ARCHIVE_SOLUTIONS
+            and Settings.ARCHIVE_SOLUTION_KPIS
+        ):
+            value = SolutionDumper.instance.load_kpi(self, kpi)
+            if value is not None:
+                return value
+        return float(getattr(self.evaluation, kpi))
 
     def distance_to(self, other: "Solution") -> float:
         """Calculate the euclidean distance between two evaluations."""
@@ -160,7 +177,23 @@ class Solution:
         return self.id == value.id
 
     def _cache_timetable_hash(self) -> None:
-        """Cache the state hash."""
+        """Cache the state hash.
+
+        If the state is archived, the hash is taken from the fingerprint store
+        (if available), so that the state doesn't need to be loaded.
+        NOTE: The id of base solutions is based on this hash, so they always use the state.
+        """
+        if (
+            self.actions
+            and self._state is None
+            and self.__dict__.get("state") is None
+            and Settings.ARCHIVE_SOLUTIONS
+            and Settings.ARCHIVE_SOLUTION_KPIS
+        ):
+            fingerprint = SolutionDumper.instance.load_timetable_fingerprint(self)
+            if fingerprint is not None:
+                self.__dict__["_timetable_hash"] = fingerprint
+                return
         self.__dict__["_timetable_hash"] = hash(self.state.timetable)
 
     def __hash__(self) -> int:
@@ -35,10 +35,16 @@ class SolutionTree:
     ) -> None:
         self.rtree = rtree.index.Index()
         self.solution_lookup: OrderedDict[str, Optional[Solution]] = OrderedDict()
+        self.changed_ids: Optional[dict[str, None]] = None
+        """If not None, the ids of added / removed solutions are collected here (in order).
+
+        Used by the `Checkpointer` to find the changes since the last checkpoint.
+        """
 
     def add_solution(self, solution: "Solution", archive: bool = True) -> None:
         """Add a solution to the tree."""
         self.solution_lookup[solution.id] = solution
+        self._mark_changed(solution.id)
         self.rtree.insert(int(solution.id, 16), solution.point)
         if archive and not solution.is_base_solution and Settings.ARCHIVE_SOLUTIONS:
             solution.archive()
@@ -46,6 +52,7 @@ class SolutionTree:
     def add_solution_as_discarded(self, solution: "Solution") -> None:
         """Add a solution to the tree as discarded."""
         self.solution_lookup[solution.id] = None
+        self._mark_changed(solution.id)
         if Settings.DUMP_DISCARDED_SOLUTIONS:
             SolutionDumper.instance.dump_solution(solution)
 
@@ -196,6 +203,11 @@ class SolutionTree:
         """Remove a solution from the tree."""
         self.rtree.delete(int(solution.id, 16), solution.point)
         self.solution_lookup[solution.id] = None
+        self._mark_changed(solution.id)
 
         if Settings.DUMP_DISCARDED_SOLUTIONS:
             SolutionDumper.instance.dump_solution(solution)
+
+    def _mark_changed(self, solution_id: str) -> None:
+        if self.changed_ids is not None:
+            self.changed_ids[solution_id] = None
@@ -1,7 +1,10 @@
 import concurrent.futures
+import math
+import random
 import time
 import traceback
 from collections.abc import Generator
+from typing import TYPE_CHECKING, Optional
 
 from o2.actions.base_actions.base_action import BaseAction
 from o2.agents.agent import (
@@ -9,8 +12,16 @@ from o2.agents.agent import (
     NoActionsLeftError,
     NoNewBaseSolutionFoundError,
 )
+from o2.agents.parallel_action_generator import ParallelActionGenerator
 from o2.agents.simulated_annealing_agent import SimulatedAnnealingAgent
 from o2.agents.tabu_agent import TabuAgent
+from o2.checkpoint import Checkpointer
+from o2.evaluation_backend import (
+    EvaluationBackend,
+    EvaluationStats,
+    LocalEvaluationBackend,
+    ProcessPoolEvaluationBackend,
+)
 from o2.models.settings import AgentType, Settings
 from o2.models.solution import Solution
 from o2.pareto_front import FRONT_STATUS
@@ -20,6 +31,9 @@ from o2.util.indented_printer import print_l0, print_l1, print_l2, print_l3, pri
 from o2.util.logger import STATS_LOG_LEVEL
 from o2.util.solution_dumper import SolutionDumper
 
+if TYPE_CHECKING:
+    from o2.island_optimizer import IslandChannel
+
 
 class Optimizer:
     """The Optimizer class is the main class that runs the optimization process."""
@@ -32,16 +46,51 @@ class Optimizer:
         self.max_solutions = store.settings.max_solutions or float("inf")
         self.max_parallel = store.settings.MAX_THREADS_ACTION_EVALUATION
         self.running_avg_time = 0
-        if not Settings.DISABLE_PARALLEL_EVALUATION and Settings.MAX_THREADS_ACTION_EVALUATION > 1:
-            self.executor = concurrent.futures.ProcessPoolExecutor(
-                max_workers=Settings.MAX_THREADS_ACTION_EVALUATION
-            )
+        self.start_iteration = 0
+        self.checkpointer = (
+            Checkpointer(self.settings.checkpoint_path) if self.settings.checkpoint_path else None
+        )
+        self.island_channel: Optional[IslandChannel] = None
+        """Set if the optimizer runs as an island, see `o2.island_optimizer.IslandOptimizer`."""
+        self.evaluation_backend: EvaluationBackend = (
+            ProcessPoolEvaluationBackend(Settings.MAX_THREADS_ACTION_EVALUATION)
+            if not Settings.DISABLE_PARALLEL_EVALUATION and Settings.MAX_THREADS_ACTION_EVALUATION > 1
+            else LocalEvaluationBackend()
+        )
+        """The backend to evaluate the actions with.
+
+        Can be replaced, e.g. by a `o2.distributed_evaluation.DistributedEvaluationBackend`.
+        """
+        self.evaluation_stats = EvaluationStats()
         self.agent: Agent = self._init_agent(store)
         if self.settings.log_to_tensor_board:
             from o2.util.tensorboard_helper import TensorBoardHelper
 
             TensorBoardHelper(self.agent, store.name)
 
+    @staticmethod
+    def resume(checkpoint_path: str) -> "Optimizer":
+        """Resume an interrupted optimization from its checkpoint file.
+
+        The returned optimizer continues after the last checkpointed iteration,
+        and keeps appending its checkpoints to the same file.
+        NOTE: The internal state of the PPO model is not part of the checkpoint.
+        """
+        checkpointer = Checkpointer(checkpoint_path)
+        checkpoint = checkpointer.load()
+        if Settings.ARCHIVE_SOLUTIONS and checkpoint.solution_dumper_folder is not None:
+            SolutionDumper(folder=checkpoint.solution_dumper_folder).update_store_name(checkpoint.store.name)
+
+        optimizer = Optimizer(checkpoint.store)
+        delta = checkpoint.last_delta
+        optimizer.agent.restore_state(delta.agent_state)
+        optimizer.start_iteration = delta.iteration + 1
+        optimizer.max_non_improving_iter = delta.max_non_improving_iter
+        optimizer.max_solutions = delta.max_solutions
+        optimizer.checkpointer = checkpointer
+        random.setstate(delta.random_state)
+        return optimizer
+
     def _init_agent(self, store: Store) -> Agent:
         """Initialize the agent for the optimization task."""
         if self.settings.agent == AgentType.TABU_SEARCH:
@@ -83,10 +132,9 @@ class Optimizer:
                 # Just iterate through the generator to run it
                 TensorBoardHelper.instance.tensor_board_iteration_callback(store.solution)
 
-        if not Settings.DISABLE_PARALLEL_EVALUATION and Settings.MAX_THREADS_ACTION_EVALUATION > 1:
-            self.executor.shutdown()
-
+        self.evaluation_backend.close()
         SimulationRunner.close_executor()
+        ParallelActionGenerator.close_executor()
 
         # Final write to tensorboard
         if self.settings.log_to_tensor_board:
@@ -105,7 +153,8 @@ class Optimizer:
         method, but if you want to process the Solution as they come,
         you can use this method.
         """
-        for it in range(self.max_iter):
+        it = self.start_iteration - 1
+        for it in range(self.start_iteration, self.max_iter):
             start_time = time.time()
             if Settings.DUMP_DISCARDED_SOLUTIONS or Settings.ARCHIVE_SOLUTIONS:
                 SolutionDumper.instance.iteration = it
@@ -208,6 +257,18 @@ class Optimizer:
                     raise
                 continue
             self._print_time_estimate(it, start_time)
+            if self.checkpointer is not None and (it + 1) % self.settings.checkpoint_interval == 0:
+                self.checkpointer.write(self, it)
+            if self.island_channel is not None and (it + 1) % self.settings.island_migration_interval == 0:
+                self.island_channel.exchange(self)
+
+        # The last iteration might already be checkpointed (if it's a multiple of the interval)
+        if (
+            self.checkpointer is not None
+            and it >= self.start_iteration
+            and self.checkpointer.last_iteration != it
+        ):
+            self.checkpointer.write(self, it)
 
     def _print_result(self):
         store = self.agent.store
@@ -220,6 +281,12 @@ class Optimizer:
             f"Base evaluation: \t{store.base_evaluation}",
             log_level=STATS_LOG_LEVEL,
         )
+        stats = self.evaluation_stats
+        print_l1(
+            f"Evaluated actions: \t{stats.evaluated} ({stats.timed_out} timed out, "
+            f"{stats.cancelled} cancelled stragglers, {stats.straggler_rate:.1%})",
+            log_level=STATS_LOG_LEVEL,
+        )
         print_l1("Modifications:")
         for action in store.base_solution.actions:
             print_l2(repr(action))
@@ -236,6 +303,30 @@ class Optimizer:
             f"est. {est_hours:.0f}h {est_minutes:.0f}m {est_seconds:.0f}s left)"
         )
 
+    def _wait_for_evaluations(
+        self, futures: list[concurrent.futures.Future[Solution]], start_time: float
+    ) -> None:
+        """Wait for the evaluations, but only give the stragglers a grace period after the quorum.
+
+        See Settings.STRAGGLER_QUORUM & Settings.STRAGGLER_GRACE_FACTOR.
+        """
+        if Settings.STRAGGLER_QUORUM is None:
+            concurrent.futures.wait(futures)
+            return
+
+        quorum = math.ceil(Settings.STRAGGLER_QUORUM * len(futures))
+        not_done = {future for future in futures if not future.done()}
+        deadline: Optional[float] = None
+        while not_done:
+            if deadline is None and len(futures) - len(not_done) >= quorum:
+                deadline = time.time() + Settings.STRAGGLER_GRACE_FACTOR * (time.time() - start_time)
+            timeout = None if deadline is None else max(0, deadline - time.time())
+            done, not_done = concurrent.futures.wait(
+                not_done, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                break
+
     def _execute_actions_parallel(self, actions_to_perform: list[BaseAction]) -> list[Solution]:
         """Execute the given actions in parallel and return the results.
 
@@ -243,25 +334,37 @@ class Optimizer:
         thereby allowing the store to process them in that order.
         The results have not modified the state of the store.
 
+        Actions, that timed out, are returned as empty (invalid) solutions, so the
+        store marks them as invalid. Cancelled stragglers are just dropped for this
+        iteration (without a tree entry), so they may be tried again later.
         """
         store = self.agent.store
         solution_tries: list[SolutionTry] = []
 
-        if not Settings.DISABLE_PARALLEL_EVALUATION and Settings.MAX_THREADS_ACTION_EVALUATION > 1:
-            futures: list[concurrent.futures.Future[Solution]] = []
-            for action in actions_to_perform:
-                futures.append(self.executor.submit(Solution.from_parent, store.solution, action))
-
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    new_solution = future.result()
-                    solution_tries.append(self.agent.try_solution(new_solution))
-                except Exception as e:
-                    print_l1(f"Error evaluating actions : {e}")
-        else:
-            for action in actions_to_perform:
-                solution_try = self.agent.try_solution(Solution.from_parent(store.solution, action))
-                solution_tries.append(solution_try)
+        start_time = time.time()
+        futures = [self.evaluation_backend.submit(store.solution, action) for action in actions_to_perform]
+        self._wait_for_evaluations(futures, start_time)
+
+        for future, action in zip(futures, actions_to_perform):
+            if not future.done():
+                # A straggler, it was only slower than the grace period, so we don't
+                # mark it as invalid, but just drop it for this iteration
+                future.cancel()
+                self.evaluation_stats.cancelled += 1
+                print_l2(f"Cancelled straggler: {repr(action)}")
+                continue
+            try:
+                new_solution = future.result()
+                solution_tries.append(self.agent.try_solution(new_solution))
+            except TimeoutError as e:
+                self.evaluation_stats.timed_out += 1
+                print_l2(f"Evaluation timed out ({e}): {repr(action)}")
+                solution_tries.append(
+                    self.agent.try_solution(Solution.empty_from_parent(store.solution, action))
+                )
+            except Exception as e:
+                print_l1(f"Error evaluating actions : {e}")
+        self.evaluation_stats.evaluated += len(actions_to_perform)
 
         # Sort tries with dominating ones first
         solution_tries.sort(
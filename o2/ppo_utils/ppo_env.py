@@ -1,10 +1,18 @@
-from typing import Optional
+import random
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 from gymnasium import Env, Space
 
-from o2.ppo_utils.ppo_input import PPOInput
-from o2.store import Store
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.pareto_front import FRONT_STATUS
+from o2.ppo_utils.ppo_input import ActionValidityCache, PPOInput
+from o2.store import SolutionTry, Store
+
+if TYPE_CHECKING:
+    from stable_baselines3.common.vec_env import VecEnv
 
 StateType = dict[str, Space]
 
@@ -21,8 +29,9 @@ class PPOEnv(Env[StateType, np.int64]):
 
         self.store = initial_store
         self.max_steps = max_steps
+        self.validity_cache = ActionValidityCache()
 
-        self.actions = PPOInput.get_actions_from_store(self.store)
+        self.actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
         self.action_space = PPOInput.get_action_space_from_actions(self.actions)
         self.observation_space = PPOInput.get_observation_space(self.store)
         self.state = PPOInput.get_state_from_store(self.store)
@@ -38,12 +47,19 @@ class PPOEnv(Env[StateType, np.int64]):
         """Reset the environment to its initial state.
 
         Increments the iteration counter and reinitializes the store and state.
+        If a seed is given, the global random generators (used by the action
+        generation & simulation) are seeded as well, to make rollouts reproducible.
         """
         super().reset(seed=seed)
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
         self.stepCount = 0
         self.iteration += 1
-        self.store = Store(self.store.base_solution, self.store.constraints)
-        self.actions = PPOInput.get_actions_from_store(self.store)
+        settings = self.store.settings
+        self.store = Store(self.store.base_solution, self.store.constraints, self.store.name)
+        self.store.settings = settings
+        self.actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
         self.state = PPOInput.get_state_from_store(self.store)
         self.action_space = PPOInput.get_action_space_from_actions(self.actions)
         self.observation_space = PPOInput.get_observation_space(self.store)
@@ -52,17 +68,35 @@ class PPOEnv(Env[StateType, np.int64]):
     def step(self, action: np.int64) -> tuple[StateType, float, bool, bool, dict]:
         """Take an action in the environment.
 
-        Not implemented in this environment as we use custom PPO implementation.
+        Evaluates the action on the current solution & adds the result to the store.
+        If the new solution is valid, the episode continues from it, so the next
+        observation & actions are based on the new solution.
+        The episode terminates, if there are no actions left, and is truncated
+        after `max_steps` steps.
         """
-        # As we are reimplementing PPO in parts, the step function is actually not needed.
-        # So we raise an exception to avoid using it.
-        raise Exception("PPOEnv does not support step")
+        self.stepCount += 1
+        selected_action = self.actions[int(action)]
+        if selected_action is None:
+            # Only possible if the action mask is ignored
+            reward = PPOEnv.get_reward((FRONT_STATUS.INVALID, self.store.solution))
+        else:
+            solution = Solution.from_parent(self.store.solution, selected_action)
+            chosen_tries, not_chosen_tries = self.store.process_many_solutions([solution])
+            reward = PPOEnv.get_reward((chosen_tries + not_chosen_tries)[0])
+            if solution.is_valid:
+                # The store only moves to solutions in the front, but the episode
+                # should follow every valid step
+                self.store.solution = solution
+
+        self.actions = PPOInput.get_actions_from_store(self.store, self.validity_cache)
+        self.state = PPOInput.get_state_from_store(self.store)
+        terminated = all(action is None for action in self.actions)
+        truncated = self.stepCount >= self.max_steps
+        return self.state, reward, terminated, truncated, {}
 
     def action_masks(self) -> np.ndarray:
         """Get the action mask for the current set of actions."""
-        # As we are reimplementing PPO in parts, the action_masks function is actually not needed.
-        # So we raise an exception to avoid using it.
-        raise Exception("PPOEnv does not support action_masks")
+        return PPOInput.get_action_mask_from_actions(self.actions)
 
     def render(self, mode: str = "human") -> None:
         """Render the current state of the environment.
@@ -70,3 +104,50 @@ class PPOEnv(Env[StateType, np.int64]):
         Not implemented for this environment.
         """
         pass
+
+    @staticmethod
+    def get_reward(solution_try: SolutionTry) -> float:
+        """Get the reward for the given SolutionTry."""
+        # TODO Improve scores based on how good/bad the solution is
+        status, _ = solution_try
+        if status == FRONT_STATUS.INVALID:
+            return -1
+        elif status == FRONT_STATUS.IN_FRONT:
+            return 1
+        elif status == FRONT_STATUS.IS_DOMINATED:
+            return 10
+        else:
+            return -1
+
+    @staticmethod
+    def make_vec_env(
+        store: Store,
+        n_envs: int,
+        max_steps: float = float("inf"),
+        seed: Optional[int] = None,
+    ) -> "VecEnv":
+        """Create n environments, that run their rollouts in parallel.
+
+        Every environment runs in its own subprocess, with its own copy of the
+        store and a single simulation worker, so the rollouts don't compete for
+        the same cores. The environments are seeded with `seed + index`.
+        """
+        from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+        def make_env(index: int) -> Callable[[], PPOEnv]:
+            def init() -> PPOEnv:
+                if n_envs > 1:
+                    # Runs in the subprocess of the environment
+                    Settings.MAX_THREADS_MEDIAN_CALCULATION = 1
+                env = PPOEnv(store, max_steps=max_steps)
+                if seed is not None:
+                    env.reset(seed=seed + index)
+                    env.action_space.seed(seed + index)
+                return env
+
+            return init
+
+        env_fns = [make_env(index) for index in range(n_envs)]
+        if n_envs == 1:
+            return DummyVecEnv(env_fns)  # type: ignore
+        return SubprocVecEnv(env_fns)  # type: ignore
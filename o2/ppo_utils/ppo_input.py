@@ -3,7 +3,6 @@ from typing import Optional
 
 import numpy as np
 from gymnasium import spaces
-from sklearn.preprocessing import MinMaxScaler
 
 from o2.actions.base_actions.add_datetime_rule_base_action import (
     AddDateTimeRuleAction,
@@ -26,9 +25,10 @@ from o2.actions.batching_actions.remove_date_time_rule_action import (
     RemoveDateTimeRuleAction,
     RemoveDateTimeRuleActionParamsType,
 )
+from o2.models.constraints import ConstraintsType
 from o2.models.days import DAYS
 from o2.models.settings import Settings
-from o2.models.timetable import RULE_TYPE
+from o2.models.timetable import RULE_TYPE, TimetableType
 from o2.models.timetable.time_period import TimePeriod
 from o2.store import Store
 
@@ -117,73 +117,32 @@ class PPOInput:
     @staticmethod
     def _get_task_features(store: Store) -> dict[str, np.ndarray]:
         task_ids = store.current_timetable.get_task_ids()
-        kpis = store.current_evaluation.task_kpis
         evaluation = store.current_evaluation
-
-        # MinMaxScaler for continuous features
-        scaler_waiting_time = MinMaxScaler()
-        scaler_idle_time = MinMaxScaler()
+        kpis = evaluation.task_kpi_table.get_columns(task_ids)
 
         # Continuous features
-        waiting_times = np.array(
-            [kpis[task_id].waiting_time.total if task_id in kpis else 0 for task_id in task_ids]
-        )
-
-        batching_waiting_times = np.array(
-            [evaluation.total_batching_waiting_time_per_task.get(task_id, 0) for task_id in task_ids]
-        )
-
-        batching_waiting_times_percentage = np.array(
-            [
-                (batching_waiting_times[i] / waiting_times[i]) if waiting_times[i] != 0 else 0
-                for i in range(len(task_ids))
-            ]
-        )
-
-        idle_times = np.array(
-            [kpis[task_id].idle_time.total if task_id in kpis else 0 for task_id in task_ids]
+        waiting_times = kpis["waiting_time"]
+        idle_times = kpis["idle_time"]
+        batching_waiting_times_percentage = PPOInput._safe_divide(
+            kpis["batching_waiting_time"], waiting_times
         )
 
         # Scale continuous features
-        waiting_times = scaler_waiting_time.fit_transform(waiting_times.reshape(1, -1))
-        idle_times = scaler_idle_time.fit_transform(idle_times.reshape(1, -1))
+        waiting_times = PPOInput._min_max_scale(waiting_times)
+        idle_times = PPOInput._min_max_scale(idle_times)
 
         # Discrete features
-        task_execution_count_with_wt_or_it_dict = evaluation.task_execution_count_with_wt_or_it
-        task_execution_percentage_with_wt_or_it_ = np.array(
-            [
-                task_execution_count_with_wt_or_it_dict[task_id] / evaluation.task_execution_counts[task_id]
-                if task_id in task_execution_count_with_wt_or_it_dict
-                else 0
-                for task_id in task_ids
-            ]
-        )
-
-        task_enablements_per_day = np.array(
-            [
-                len(evaluation.task_enablement_weekdays[task_id][day])
-                if (
-                    task_id in evaluation.task_enablement_weekdays
-                    and day in evaluation.task_enablement_weekdays[task_id]
-                )
-                else 0
-                for task_id in task_ids
-                for day in DAYS
-            ]
+        task_execution_percentage_with_wt_or_it_ = PPOInput._safe_divide(
+            kpis["execution_count_with_wt_or_it"], kpis["execution_count"]
         )
-
+        task_enablements_per_day = evaluation.task_enablement_table.get_rows(task_ids)
         number_of_resources = np.array(
             [
-                len(store.current_timetable.get_resources_assigned_to_task(task_id))
-                if task_id in task_ids
-                else 0
-                for task_id in task_ids
+                len(distribution.resources)
+                for distribution in store.current_timetable.task_resource_distribution
             ]
         )
-
-        average_batch_size = np.array(
-            [evaluation.avg_batch_size_per_task.get(task_id, 1) for task_id in task_ids]
-        )
+        average_batch_size = kpis["avg_batch_size"]
 
         return {
             "task_waiting_times": PPOInput._clean_np_array(waiting_times),
@@ -204,50 +163,13 @@ class PPOInput:
         # TODO: This only uses base resources
         resources = store.base_timetable.get_all_resources()
         evaluation = store.current_evaluation
+        # TODO: 0 might not be the best default value for resources without KPIs
+        kpis = evaluation.resource_kpi_table.get_columns([resource.id for resource in resources])
 
-        # MinMaxScaler for continuous features
-        scaler_waiting_time = MinMaxScaler()
-        scaler_available_time = MinMaxScaler()
-        scaler_utilization = MinMaxScaler()
-        scaler_hourly_cost = MinMaxScaler()
-
-        # Continuous features
-        waiting_times_dict = evaluation.total_batching_waiting_time_per_resource
-        waiting_times = np.array(
-            [
-                waiting_times_dict[resource.id]  # noqa: SIM401
-                if resource.id in waiting_times_dict
-                # TODO: 0 might not be the best default value
-                else 0
-                for resource in resources
-            ]
-        )
-
-        available_times = np.array(
-            [
-                evaluation.resource_kpis[resource.id].available_time
-                if resource.id in evaluation.resource_kpis
-                else 0
-                for resource in resources
-            ]
-        )
-
-        utilizations = np.array(
-            [
-                evaluation.resource_kpis[resource.id].utilization
-                if resource.id in evaluation.resource_kpis
-                else 0
-                for resource in resources
-            ]
-        )
-
-        hourly_costs = np.array([resource.cost_per_hour for resource in resources])
-
-        # Scale continuous features
-        waiting_times = scaler_waiting_time.fit_transform(waiting_times.reshape(1, -1))
-        available_times = scaler_available_time.fit_transform(available_times.reshape(1, -1))
-        utilizations = scaler_utilization.fit_transform(utilizations.reshape(1, -1))
-        hourly_costs = scaler_hourly_cost.fit_transform(hourly_costs.reshape(1, -1))
+        # Continuous features (scaled)
+        waiting_times = PPOInput._min_max_scale(kpis["batching_waiting_time"])
+        available_times = PPOInput._min_max_scale(kpis["available_time"])
+        utilizations = PPOInput._min_max_scale(kpis["utilization"])
 
         # Discrete features
         number_of_tasks = np.array([len(resource.assigned_tasks) for resource in resources])
@@ -278,8 +200,14 @@ class PPOInput:
         return spaces.Discrete(len(actions))
 
     @staticmethod
-    def get_actions_from_store(store: Store) -> list[Optional[BaseAction]]:
-        """Get the action based on the index."""
+    def get_actions_from_store(
+        store: Store, validity_cache: Optional["ActionValidityCache"] = None
+    ) -> list[Optional[BaseAction]]:
+        """Get the action based on the index.
+
+        If a `validity_cache` is given, the validity of the actions is reused
+        for the tasks, that haven't changed since the last call.
+        """
         # TODO: This only uses base resources
         resources = store.base_timetable.get_all_resources()  # type: ignore # noqa: F841
         current_timetable = store.current_timetable  # type: ignore # noqa: F841
@@ -396,7 +324,11 @@ class PPOInput:
                 and store.is_tabu(action) is False
                 and (
                     Settings.disable_action_validity_check
-                    or action.check_if_valid(store, mark_no_change_as_invalid=True)
+                    or (
+                        validity_cache.check_if_valid(store, action)
+                        if validity_cache is not None
+                        else action.check_if_valid(store, mark_no_change_as_invalid=True)
+                    )
                 )
             )
             else None
@@ -413,3 +345,91 @@ class PPOInput:
     def _clean_np_array(array: np.ndarray) -> np.ndarray:
         """Clean the numpy array."""
         return np.nan_to_num(array, nan=0, posinf=0, neginf=0).reshape(1, -1)
+
+    @staticmethod
+    def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Divide element-wise, using 0 where the denominator is 0."""
+        result = np.zeros(numerator.shape, dtype=np.float64)
+        np.divide(numerator, denominator, out=result, where=denominator != 0)
+        return result
+
+    @staticmethod
+    def _min_max_scale(array: np.ndarray) -> np.ndarray:
+        """Scale the values to [0, 1] (all 0, if the values are all the same)."""
+        array = np.nan_to_num(array.astype(np.float64), nan=0, posinf=0, neginf=0)
+        if array.size == 0:
+            return array
+        value_range = array.max() - array.min()
+        if value_range == 0:
+            return np.zeros_like(array)
+        return (array - array.min()) / value_range
+
+
+class ActionValidityCache:
+    """Caches the validity of the PPO actions between steps.
+
+    An action only changes the batching rules of its own task, so as long as the
+    current timetable is valid, the validity of an action only depends on the
+    batching rules of its task and the calendars of the task's resources.
+    Whenever the current timetable changes (a step was taken, or a new base
+    solution was selected), only the entries of the tasks where those changed
+    are dropped and recomputed.
+
+    The tabu check is not cached, because it depends on the current solution.
+    """
+
+    def __init__(self) -> None:
+        self._constraints: Optional[ConstraintsType] = None
+        self._timetable: Optional[TimetableType] = None
+        self._timetable_is_valid = False
+        self._task_keys: dict[str, tuple] = {}
+        self._validity: dict[str, dict[str, bool]] = {}
+
+    def check_if_valid(self, store: Store, action: BaseAction) -> bool:
+        """Check if the action is valid, reusing the result of earlier steps if possible."""
+        self._update(store)
+        if not self._timetable_is_valid:
+            # The validity of the other tasks would be mixed in, so don't cache it
+            return action.check_if_valid(store, mark_no_change_as_invalid=True)
+
+        task_id: str = action.params["task_id"]  # type: ignore
+        if task_id not in self._task_keys:
+            self._task_keys[task_id] = self._get_task_key(store.current_timetable, task_id)
+        validity = self._validity.setdefault(task_id, {})
+        if action.id not in validity:
+            validity[action.id] = action.check_if_valid(store, mark_no_change_as_invalid=True)
+        return validity[action.id]
+
+    def _update(self, store: Store) -> None:
+        """Drop the entries, that are outdated for the current timetable of the store."""
+        if store.constraints is not self._constraints:
+            self._constraints = store.constraints
+            self._timetable = None
+            self._task_keys.clear()
+            self._validity.clear()
+
+        timetable = store.current_timetable
+        if timetable is self._timetable:
+            return
+        self._timetable = timetable
+        self._timetable_is_valid = (
+            store.current_state.is_valid()
+            and store.constraints.verify_legacy_constraints(timetable)
+            and store.constraints.verify_batching_constraints(timetable)
+        )
+        for task_id, key in list(self._task_keys.items()):
+            new_key = self._get_task_key(timetable, task_id)
+            if new_key != key:
+                self._task_keys[task_id] = new_key
+                self._validity.pop(task_id, None)
+
+    @staticmethod
+    def _get_task_key(timetable: TimetableType, task_id: str) -> tuple:
+        """Get the parts of the timetable, the validity of the task's actions depends on."""
+        return (
+            tuple(timetable.get_batching_rules_for_task(task_id)),
+            tuple(
+                timetable.get_calendar_for_resource(resource_id)
+                for resource_id in timetable.get_resources_assigned_to_task(task_id)
+            ),
+        )
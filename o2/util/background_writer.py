@@ -0,0 +1,194 @@
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from io import BufferedWriter
+from typing import Optional, Union
+
+from o2.models.settings import FsyncPolicy
+from o2.util.logger import error, log_io
+
+
+@dataclass
+class WriterMetrics:
+    """Metrics of the `BackgroundWriter`."""
+
+    queue_depth: int = 0
+    """Number of writes currently waiting in the queue."""
+    max_queue_depth: int = 0
+    """Highest number of writes that were waiting in the queue at once."""
+    writes: int = 0
+    """Number of completed writes."""
+    batches: int = 0
+    """Number of batches the writes were processed in."""
+    bytes_written: int = 0
+    """Total number of bytes written."""
+
+
+@dataclass
+class _WriteJob:
+    target: Union[str, BufferedWriter]
+    """Either a path (the file will be (over)written) or an open file to append to."""
+    data: bytes
+    """The bytes to write / append."""
+    started: bool = False
+    """Did the background thread start writing the job?"""
+    cancelled: bool = False
+    """Was the write to the path cancelled (before it started)?"""
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class BackgroundWriter:
+    """Writes data (e.g. pickled objects) to disk in a background thread.
+
+    The writes are put into a bounded queue (so the producer blocks if the disk
+    can't keep up), and are processed in batches. The data, that is written to a
+    path, is kept in a pending lookup until written, so it can still be read
+    back (`get_pending`) before it reaches the disk.
+
+    The writer only takes bytes, so the objects are pickled by the caller and
+    can be changed (e.g. by filling their cached properties) right afterwards.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        batch_size: int = 64,
+        fsync_policy: FsyncPolicy = FsyncPolicy.NEVER,
+    ) -> None:
+        """Initialize the writer (the thread is started on the first write)."""
+        self.batch_size = batch_size
+        self.fsync_policy = fsync_policy
+        self.metrics = WriterMetrics()
+
+        self._queue: queue.Queue[Optional[_WriteJob]] = queue.Queue(maxsize=max_queue_size)
+        self._pending: dict[str, _WriteJob] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._exception: Optional[BaseException] = None
+
+    def write_file(self, path: str, data: bytes) -> None:
+        """Write the bytes into a (new) file at the given path."""
+        job = _WriteJob(path, data)
+        with self._lock:
+            self._pending[path] = job
+        self._put(job)
+
+    def append(self, file: BufferedWriter, data: bytes) -> None:
+        """Append the bytes to the open file."""
+        self._put(_WriteJob(file, data))
+
+    def get_pending(self, path: str) -> Optional[bytes]:
+        """Get the data that is still waiting to be written to the path, if any."""
+        with self._lock:
+            job = self._pending.get(path)
+        return None if job is None else job.data
+
+    def cancel_pending(self, path: str) -> Optional[bytes]:
+        """Cancel the pending write to the path, and return its data.
+
+        If the write was already started, this waits until the file is written
+        and returns None (as if there was no pending write).
+        """
+        with self._lock:
+            job = self._pending.get(path)
+            if job is not None and not job.started:
+                job.cancelled = True
+                del self._pending[path]
+                return job.data
+        if job is not None:
+            job.done.wait()
+        return None
+
+    def flush(self) -> None:
+        """Block until all queued writes are on disk."""
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """Flush all writes & stop the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+        self._raise_if_failed()
+
+    def _put(self, job: _WriteJob) -> None:
+        self._raise_if_failed()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="o2-background-writer", daemon=True)
+            self._thread.start()
+        self._queue.put(job)
+        depth = self._queue.qsize()
+        self.metrics.queue_depth = depth
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    # Stop after writing the current batch
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(job)
+
+            try:
+                self._write_batch(batch)
+            except BaseException as e:
+                error(f"Background writer failed: {e}")
+                self._exception = self._exception or e
+            finally:
+                with self._lock:
+                    for job in batch:
+                        if isinstance(job.target, str) and self._pending.get(job.target) is job:
+                            del self._pending[job.target]
+                for job in batch:
+                    job.done.set()
+                    self._queue.task_done()
+                self.metrics.queue_depth = self._queue.qsize()
+            if stop:
+                return
+
+    def _write_batch(self, batch: list[_WriteJob]) -> None:
+        appended_files: dict[int, BufferedWriter] = {}
+        for job in batch:
+            if isinstance(job.target, str):
+                with self._lock:
+                    if job.cancelled:
+                        continue
+                    job.started = True
+                with open(job.target, "wb") as f:
+                    f.write(job.data)
+                    f.flush()
+                    if self.fsync_policy != FsyncPolicy.NEVER:
+                        os.fsync(f.fileno())
+            else:
+                job.target.write(job.data)
+                job.target.flush()
+                if self.fsync_policy == FsyncPolicy.ALWAYS:
+                    os.fsync(job.target.fileno())
+                appended_files[id(job.target)] = job.target
+            self.metrics.bytes_written += len(job.data)
+            self.metrics.writes += 1
+
+        if self.fsync_policy == FsyncPolicy.BATCH:
+            for file in appended_files.values():
+                os.fsync(file.fileno())
+        self.metrics.batches += 1
+        log_io(f"Background writer wrote batch of {len(batch)} ({self.metrics})")
+
+    def _raise_if_failed(self) -> None:
+        if self._exception is not None:
+            raise RuntimeError("Background writer failed") from self._exception
@@ -0,0 +1,83 @@
+import os
+from collections.abc import Iterable
+from io import BufferedWriter
+from typing import Optional
+
+from o2.util.logger import log_io
+
+
+class FingerprintStore:
+    """An append-only on-disk lookup of timetable fingerprints by solution key.
+
+    The fingerprint is the hash of a solution's timetable, which is
+    used to detect duplicate solutions (see `Settings.CHECK_FOR_TIMETABLE_EQUALITY`).
+    Computing it requires the full state, so it's stored next to the archive
+    when the state is archived (or by a one-off pass over older archives).
+
+    Each line of the file is "<key> <fingerprint>", later lines for the
+    same key supersede earlier ones. Like the `KpiStore`, the file can be read
+    while it's being written to; `refresh` picks up new lines.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """Initialize the store (the file is created on the first write)."""
+        self.filename = filename
+        self._fingerprints: dict[str, int] = {}
+        self._offset = 0
+        self._file: Optional[BufferedWriter] = None
+
+    def __len__(self) -> int:
+        """Return the number of fingerprints in the store."""
+        self.refresh()
+        return len(self._fingerprints)
+
+    def __contains__(self, key: str) -> bool:
+        """Check if the store has a fingerprint for the given key."""
+        return self.get(key) is not None
+
+    def add(self, key: str, fingerprint: int) -> None:
+        """Add the fingerprint for the given key."""
+        self.add_many([(key, fingerprint)])
+
+    def add_many(self, items: Iterable[tuple[str, int]]) -> None:
+        """Add the fingerprints for the given keys (with a single write)."""
+        lines = []
+        for key, fingerprint in items:
+            self._fingerprints[key] = fingerprint
+            lines.append(f"{key} {fingerprint}\n")
+        if not lines:
+            return
+        if self._file is None:
+            folder = os.path.dirname(self.filename)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._file = open(self.filename, "ab")  # noqa: SIM115
+            log_io(f"Opened fingerprint store: {self.filename}")
+        self._file.write("".join(lines).encode())
+        self._file.flush()
+
+    def get(self, key: str) -> Optional[int]:
+        """Get the fingerprint of the given key, or None if the key is not in the store."""
+        if key not in self._fingerprints:
+            self.refresh()
+        return self._fingerprints.get(key)
+
+    def refresh(self) -> None:
+        """Pick up fingerprints that were added since the last read (also by other processes)."""
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Ignore a trailing, incomplete line (it's currently being written)
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            key, fingerprint = line.decode().rsplit(" ", 1)
+            self._fingerprints[key] = int(fingerprint)
+        self._offset += len(complete)
+
+    def close(self) -> None:
+        """Close the open file handle (reads are still possible afterwards)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,186 @@
+import os
+from io import BufferedWriter
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from o2.util.logger import log_io
+
+if TYPE_CHECKING:
+    from o2.models.evaluation import Evaluation
+
+KPI_COLUMNS = (
+    "pareto_x",
+    "pareto_y",
+    "total_cycle_time",
+    "avg_cycle_time_by_case",
+    "total_duration",
+    "total_waiting_time",
+    "total_processing_time",
+    "is_empty",
+)
+"""The scalar KPIs of an `Evaluation`, that are kept in the `KpiStore`."""
+
+KPI_DTYPE = np.dtype(np.float64)
+
+
+class KpiStore:
+    """An append-only, columnar on-disk store for the scalar KPIs of evaluations.
+
+    Every KPI column is a flat file of float64 values (one per row), which is read
+    via memory-mapping, so single values or whole columns can be accessed without
+    unpickling the full `Evaluation`. An index file maps the solution keys to
+    their row, later rows for the same key supersede earlier ones.
+
+    The store is append-only, so it can be read by other processes (e.g. the
+    analysis scripts) while it is being written to; `refresh` picks up new rows.
+    """
+
+    def __init__(self, folder: str) -> None:
+        """Initialize the store in the given folder (the files are created on first append)."""
+        self.folder = folder
+        self.index_filename = os.path.join(folder, "index.txt")
+
+        self._index: dict[str, int] = {}
+        self._index_offset = 0
+        self._columns: dict[str, np.memmap] = {}
+        self._rows = 0
+
+        self._column_files: dict[str, BufferedWriter] = {}
+        self._index_file: Optional[BufferedWriter] = None
+        self._next_row = 0
+
+    def _column_filename(self, column: str) -> str:
+        return os.path.join(self.folder, f"{column}.f64")
+
+    def __len__(self) -> int:
+        """Return the number of (readable) rows in the store."""
+        self.refresh()
+        return self._rows
+
+    def __contains__(self, key: str) -> bool:
+        """Check if the store has a row for the given key."""
+        return self._get_row(key) is not None
+
+    def append(self, key: str, evaluation: "Evaluation") -> None:
+        """Append the KPIs of the evaluation as a new row."""
+        if self._index_file is None:
+            self._open()
+        assert self._index_file is not None
+
+        row = self._next_row
+        for column, file in self._column_files.items():
+            file.write(KPI_DTYPE.type(getattr(evaluation, column)).tobytes())
+            file.flush()
+        # The index is written last, so that readers never see a key of an incomplete row
+        self._index_file.write(f"{row} {key}\n".encode())
+        self._index_file.flush()
+
+        self._next_row += 1
+        self._index[key] = row
+
+    def get(self, key: str, column: str) -> Optional[float]:
+        """Get a single KPI of the given key, or None if the key is not in the store."""
+        row = self._get_row(key)
+        if row is None:
+            return None
+        return float(self._columns[column][row])
+
+    def get_column(self, column: str) -> np.ndarray:
+        """Get a (zero-copy, read-only) view of all rows of a KPI column."""
+        self.refresh()
+        if column not in self._columns:
+            return np.empty(0, dtype=KPI_DTYPE)
+        return self._columns[column]
+
+    def get_rows(self, keys: list[str], columns: tuple[str, ...] = KPI_COLUMNS) -> np.ndarray:
+        """Get the KPIs for the given keys as a (len(keys), len(columns)) array.
+
+        Keys missing from the store are returned as rows of NaN.
+        """
+        self.refresh()
+        rows = np.array([self._index.get(key, -1) for key in keys], dtype=np.int64)
+        rows[rows >= self._rows] = -1
+        result = np.full((len(keys), len(columns)), np.nan, dtype=KPI_DTYPE)
+        found = rows >= 0
+        for i, column in enumerate(columns):
+            if column in self._columns:
+                result[found, i] = self._columns[column][rows[found]]
+        return result
+
+    def refresh(self) -> None:
+        """Pick up rows that were appended since the last read (also by other processes)."""
+        if not os.path.exists(self.index_filename):
+            return
+        with open(self.index_filename, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # Ignore a trailing, incomplete line (it's currently being written)
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            row, key = line.decode().split(" ", 1)
+            self._index[key] = int(row)
+        self._index_offset += len(complete)
+
+        rows = self._count_rows_on_disk()
+        if rows > self._rows or not self._columns:
+            self._rows = rows
+            self._columns = (
+                {
+                    column: np.memmap(self._column_filename(column), dtype=KPI_DTYPE, mode="r", shape=(rows,))
+                    for column in KPI_COLUMNS
+                }
+                if rows > 0
+                else {}
+            )
+
+    def close(self) -> None:
+        """Close the open file handles (reads are still possible afterwards)."""
+        for file in self._column_files.values():
+            file.close()
+        self._column_files = {}
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def _get_row(self, key: str) -> Optional[int]:
+        row = self._index.get(key)
+        if row is None or row >= self._rows:
+            self.refresh()
+            row = self._index.get(key)
+        if row is None or row >= self._rows:
+            return None
+        return row
+
+    def _count_rows_on_disk(self) -> int:
+        sizes = [
+            os.path.getsize(filename) if os.path.exists(filename) else 0
+            for filename in map(self._column_filename, KPI_COLUMNS)
+        ]
+        return min(sizes) // KPI_DTYPE.itemsize
+
+    def _get_index_size(self, max_lines: int) -> int:
+        """Get the size (in bytes) of the complete lines of the index, but at most max_lines."""
+        if not os.path.exists(self.index_filename):
+            return 0
+        size = 0
+        with open(self.index_filename, "rb") as f:
+            for _, line in zip(range(max_lines), f):
+                if not line.endswith(b"\n"):
+                    break
+                size += len(line)
+        return size
+
+    def _open(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        # If a previous writer crashed mid-row, the columns might have different
+        # lengths, so we truncate them to the last complete row.
+        self._next_row = self._count_rows_on_disk()
+        for column in KPI_COLUMNS:
+            file = open(self._column_filename(column), "ab")  # noqa: SIM115
+            file.truncate(self._next_row * KPI_DTYPE.itemsize)
+            self._column_files[column] = file
+        # The index might end with a partial line (or a line of a truncated row) as well
+        self._index_file = open(self.index_filename, "ab")  # noqa: SIM115
+        self._index_file.truncate(self._get_index_size(self._next_row))
+        log_io(f"Opened kpi store in folder: {self.folder} ({self._next_row} rows)")
@@ -0,0 +1,219 @@
+import json
+import math
+import os
+import pickle
+import sqlite3
+import zlib
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Optional
+
+from o2.util.logger import log_io
+
+if TYPE_CHECKING:
+    from o2.models.evaluation import Evaluation
+    from o2.models.solution import Solution
+    from o2.models.state import State
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    store_name TEXT NOT NULL,
+    parent_id TEXT,
+    action TEXT,
+    pareto_x REAL,
+    pareto_y REAL,
+    is_valid INTEGER,
+    solution BLOB,
+    evaluation BLOB,
+    state BLOB
+);
+CREATE INDEX IF NOT EXISTS solutions_id ON solutions (id);
+CREATE VIRTUAL TABLE IF NOT EXISTS solutions_rtree USING rtree (id, min_x, max_x, min_y, max_y);
+"""
+
+
+def _compress(obj: object) -> bytes:
+    return zlib.compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _decompress(blob: bytes) -> Any:  # noqa: ANN401
+    return pickle.loads(zlib.decompress(blob))
+
+
+def _action_json(solution: "Solution") -> Optional[str]:
+    if solution.is_base_solution:
+        return None
+    action = solution.last_action
+    return json.dumps({"type": action.__class__.__name__, "params": action.params}, default=str)
+
+
+class SolutionArchive:
+    """A single-file SQLite archive for solutions, their evaluations and states.
+
+    This is an alternative to the loose pickle files of the `SolutionDumper`.
+    Every solution is one row (keyed by store name & solution id), holding the
+    parent id, the last action as JSON, the pareto point, the validity and the
+    compressed (archived) solution, evaluation and state.
+
+    The pareto points are additionally indexed in an R*-tree, so that queries for
+    solutions near the pareto front can be run directly on the archive, e.g.
+    from another process or after the run.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """Initialize the archive (the database is opened lazily)."""
+        self.filename = filename
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return the database connection, (re)connecting if necessary.
+
+        SQLite connections must not be shared with forked processes (e.g. the
+        simulation process pool), so each process gets its own connection.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            folder = os.path.dirname(self.filename)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.filename, timeout=30)
+            self._pid = os.getpid()
+            # WAL allows concurrent readers while a run is writing to the archive
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+            log_io(f"Opened solution archive: {self.filename}")
+        return self._connection
+
+    def __contains__(self, key: str) -> bool:
+        """Check if the archive contains a solution with the given key."""
+        return self.connection.execute("SELECT 1 FROM solutions WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        """Return the number of solutions in the archive."""
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def has_column(self, key: str, column: str) -> bool:
+        """Check if the solution with the given key has a (non-null) value for the column."""
+        row = self.connection.execute(
+            f"SELECT {column} IS NOT NULL FROM solutions WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None and bool(row[0])
+
+    def add_evaluation(self, key: str, store_name: str, solution: "Solution") -> None:
+        """Add (or update) the solution with its evaluation & pareto point."""
+        with self.connection as connection:
+            self._upsert(
+                connection,
+                key,
+                store_name,
+                solution,
+                pareto_x=solution.pareto_x,
+                pareto_y=solution.pareto_y,
+                is_valid=solution.is_valid,
+                evaluation=_compress(solution.evaluation),
+            )
+            (rowid,) = connection.execute("SELECT rowid FROM solutions WHERE key = ?", (key,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO solutions_rtree VALUES (?, ?, ?, ?, ?)",
+                (rowid, solution.pareto_x, solution.pareto_x, solution.pareto_y, solution.pareto_y),
+            )
+
+    def add_state(self, key: str, store_name: str, solution: "Solution") -> None:
+        """Add (or update) the solution with its state."""
+        with self.connection as connection:
+            self._upsert(connection, key, store_name, solution, state=_compress(solution.state))
+
+    def add_solution(self, key: str, store_name: str, solution: "Solution") -> None:
+        """Add (or update) the solution with the (archived) solution object itself."""
+        with self.connection as connection:
+            self._upsert(connection, key, store_name, solution, solution=_compress(solution))
+
+    def get_evaluation(self, key: str, delete: bool = False) -> "Evaluation":
+        """Get the evaluation of the solution with the given key."""
+        return self._get_blob(key, "evaluation", delete)
+
+    def get_state(self, key: str, delete: bool = False) -> "State":
+        """Get the state of the solution with the given key."""
+        return self._get_blob(key, "state", delete)
+
+    def get_solution(self, key: str) -> "Solution":
+        """Get the (archived) solution object with the given key."""
+        return self._get_blob(key, "solution", delete=False)
+
+    def iter_solutions(self, store_name: Optional[str] = None) -> Iterator["Solution"]:
+        """Iterate over all stored (archived) solution objects, optionally only of one store."""
+        query = "SELECT solution FROM solutions WHERE solution IS NOT NULL"
+        params: tuple = ()
+        if store_name is not None:
+            query += " AND store_name = ?"
+            params = (store_name,)
+        for (blob,) in self.connection.execute(query + " ORDER BY rowid", params):
+            yield _decompress(blob)
+
+    def get_ids_near_points(
+        self,
+        points: list[tuple[float, float]],
+        max_distance: float = float("inf"),
+        store_name: Optional[str] = None,
+    ) -> list[tuple[str, float]]:
+        """Get the ids of valid solutions within max_distance of any of the points.
+
+        Returns (id, distance) tuples, sorted by the distance to the nearest point.
+        The R*-tree is used to find the candidates in the bounding boxes, the
+        exact (euclidean) distance is then calculated on the stored pareto point.
+        """
+        nearest: dict[str, float] = {}
+        for x, y in points:
+            query = """
+                SELECT s.id, s.pareto_x, s.pareto_y FROM solutions_rtree r
+                JOIN solutions s ON s.rowid = r.id
+                WHERE s.is_valid AND r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ?
+            """
+            params: tuple = (x - max_distance, x + max_distance, y - max_distance, y + max_distance)
+            if store_name is not None:
+                query += " AND s.store_name = ?"
+                params += (store_name,)
+            for solution_id, pareto_x, pareto_y in self.connection.execute(query, params):
+                distance = math.dist((x, y), (pareto_x, pareto_y))
+                if distance <= max_distance and distance < nearest.get(solution_id, float("inf")):
+                    nearest[solution_id] = distance
+        return sorted(nearest.items(), key=lambda item: item[1])
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def _upsert(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        store_name: str,
+        solution: "Solution",
+        /,
+        **columns: object,
+    ) -> None:
+        # NOTE: The parent id of the base solution's children is NULL as well, as the
+        # base solution's id is based on its timetable (see `Solution.id`)
+        parent_id = solution.hash_action_list(solution.actions[:-1]) or None
+        names = ["key", "id", "store_name", "parent_id", "action", *columns]
+        values = [key, solution.id, store_name, parent_id, _action_json(solution), *columns.values()]
+        connection.execute(
+            f"INSERT INTO solutions ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT (key) DO UPDATE SET {', '.join(f'{name} = excluded.{name}' for name in columns)}",
+            values,
+        )
+
+    def _get_blob(self, key: str, column: str, delete: bool) -> Any:  # noqa: ANN401
+        row = self.connection.execute(f"SELECT {column} FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            raise KeyError(f"No {column} for solution {key} in the archive.")
+        if delete:
+            with self.connection as connection:
+                connection.execute(f"UPDATE solutions SET {column} = NULL WHERE key = ?", (key,))
+        return _decompress(row[0])
@@ -1,5 +1,6 @@
 import os
 import pickle
+from collections.abc import Iterable
 from datetime import datetime
 from io import BufferedWriter
 from typing import TYPE_CHECKING, Optional
@@ -7,7 +8,11 @@ from typing import TYPE_CHECKING, Optional
 from o2.models.evaluation import Evaluation
 from o2.models.settings import Settings
 from o2.models.state import State
+from o2.util.background_writer import BackgroundWriter
+from o2.util.fingerprint_store import FingerprintStore
+from o2.util.kpi_store import KpiStore
 from o2.util.logger import log_io
+from o2.util.solution_archive import SolutionArchive
 
 if TYPE_CHECKING:
     from o2.models.solution import Solution
@@ -19,17 +24,22 @@ class SolutionDumper:
 
     instance: "SolutionDumper"
 
-    def __init__(self, global_mode: bool = False) -> None:
+    def __init__(self, global_mode: bool = False, folder: Optional[str] = None) -> None:
         """Initialize the solution dumper.
 
         Creates a folder with the current date and time, and initializes file handles.
         Also sets the singleton instance.
 
+        If a folder is given, that (existing) run folder is reused instead, and
+        the solutions are appended to the existing files. This is used when
+        resuming a run from a checkpoint.
+
         If global_mode is True, the solution dumper will use the global folders
         for all dumps and switch to a read-only mode. This is used by the
         analysis scripts.
         """
         self.global_mode = global_mode
+        self.append_to_existing_files = folder is not None
 
         # Filenames and file handles (initialized later)
         self.current_store_name: Optional[str] = None
@@ -38,6 +48,13 @@ class SolutionDumper:
         self.store_file: Optional[BufferedWriter] = None
         self.solutions_filename: str = ""
         self.solutions_file: Optional[BufferedWriter] = None
+        self.kpi_store: Optional[KpiStore] = None
+        self.fingerprint_store: Optional[FingerprintStore] = None
+        self.archive: Optional[SolutionArchive] = None
+        self.writer = BackgroundWriter(
+            max_queue_size=Settings.SOLUTION_DUMP_QUEUE_SIZE,
+            fsync_policy=Settings.SOLUTION_DUMP_FSYNC_POLICY,
+        )
 
         self.iteration: int = 0
 
@@ -47,10 +64,15 @@ class SolutionDumper:
             SolutionDumper.instance = self
             return
 
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S-%f")
-        self.folder = os.path.join("stores", f"run_{timestamp}")
+        if folder is None:
+            timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S-%f")
+            folder = os.path.join("stores", f"run_{timestamp}")
+        self.folder = folder
         self.evaluation_folder = os.path.join(self.folder, "evaluations")
         self.state_folder = os.path.join(self.folder, "states")
+        self.kpi_store = KpiStore(os.path.join(self.folder, "kpis"))
+        self.fingerprint_store = FingerprintStore(os.path.join(self.folder, "timetable_fingerprints.txt"))
+        self.archive = SolutionArchive(os.path.join(self.folder, "solutions.sqlite"))
 
         os.makedirs(self.folder, exist_ok=True)
         os.makedirs(self.evaluation_folder, exist_ok=True)
@@ -68,6 +90,9 @@ class SolutionDumper:
         self.global_mode = True
         self.evaluation_folder = "evaluations/"
         self.state_folder = "states/"
+        self.kpi_store = KpiStore("kpis/")
+        self.fingerprint_store = FingerprintStore("timetable_fingerprints.txt")
+        self.archive = SolutionArchive("solutions.sqlite")
 
     def update_store_name(self, store_name: str) -> None:
         """Update the store name."""
@@ -83,6 +108,10 @@ class SolutionDumper:
         """Sanitize the store name for filenames."""
         return store_name.replace(" ", "_").lower()
 
+    def get_checkpoint_path(self, store_name: str) -> str:
+        """Get the path of the checkpoint file for the store in the run folder."""
+        return os.path.join(self.folder, f"checkpoint_{self._sanitize_store_name(store_name)}.pkl")
+
     def _reset_files(self, store_name: str) -> None:
         """Close existing files and open new ones based on the new store name."""
         assert not self.global_mode
@@ -98,7 +127,9 @@ class SolutionDumper:
         )
 
         self.store_file = open(self.store_filename, "wb")  # noqa: SIM115
-        self.solutions_file = open(self.solutions_filename, "wb")  # noqa: SIM115
+        self.solutions_file = open(  # noqa: SIM115
+            self.solutions_filename, "ab" if self.append_to_existing_files else "wb"
+        )
 
     def dump_store(self, store: "Store") -> None:
         """Dump the current store state to disk."""
@@ -111,6 +142,11 @@ class SolutionDumper:
         # Ensure file handles are available.
         assert self.store_file is not None
 
+        # Make sure all archived solutions of the store are on disk,
+        # so the dumped store is consistent with them.
+        self.writer.flush()
+        log_io(f"Background writer metrics: {self.writer.metrics}")
+
         # Write the iteration number to the store
         store.__dict__["_iteration"] = self.iteration
 
@@ -120,11 +156,9 @@ class SolutionDumper:
         self.store_file.flush()
 
     def dump_solution(self, solution: "Solution") -> None:
-        """Dump a solution to the solutions file."""
+        """Dump a solution to the solutions file (or the sqlite archive)."""
         assert not self.global_mode
 
-        assert self.solutions_file is not None
-
         # Make sure, that the solution is archived.
         solution.archive()
 
@@ -133,6 +167,18 @@ class SolutionDumper:
         solution.__dict__["_store_name"] = self.current_store_name
         solution.__dict__["_iteration"] = self.iteration
 
+        if Settings.ARCHIVE_SOLUTIONS_TO_SQLITE:
+            assert self.archive is not None
+            self.archive.add_solution(
+                self._get_solution_key(solution), self._get_store_name(solution), solution
+            )
+            return
+
+        assert self.solutions_file is not None
+        if Settings.ASYNC_SOLUTION_DUMPS:
+            # The solution might still change, so we pickle it right away
+            self.writer.append(self.solutions_file, pickle.dumps(solution))
+            return
         pickle.dump(solution, self.solutions_file)
         self.solutions_file.flush()
 
@@ -144,83 +190,212 @@ class SolutionDumper:
             self.evaluation_folder,
             f"evaluation_{self.sanitized_current_store_name}_{solution.id}.pkl",
         )
+        if Settings.ARCHIVE_SOLUTION_KPIS:
+            self.dump_kpis(solution)
+        if Settings.ARCHIVE_SOLUTIONS_TO_SQLITE:
+            self._dump_to_archive(solution, "evaluation")
+            return
         # As we identify the solution by its id, we don't need to dump the
         # evaluation if it already exists.
-        if os.path.exists(filename) and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
+        if self._archive_file_exists(filename) and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
             return
         log_io(f"Dumping evaluation to {filename}")
-        with open(filename, "wb") as f:
-            pickle.dump(solution.evaluation, f)
+        self._write_archive_file(filename, solution.evaluation)
 
     def load_evaluation(self, solution: "Solution") -> Evaluation:
-        """Load an evaluation from the evaluation file."""
+        """Load an evaluation from the evaluation file (or the sqlite archive)."""
+        if Settings.ARCHIVE_SOLUTIONS_TO_SQLITE:
+            assert self.archive is not None
+            evaluation = self.archive.get_evaluation(
+                self.get_evaluation_key(solution), delete=Settings.DELETE_LOADED_SOLUTION_ARCHIVES
+            )
+            self._check_loaded_evaluation(solution, evaluation)
+            log_io(f"Loaded evaluation of {solution.id} from {self.archive.filename}")
+            return evaluation
+
+        filename = f"evaluation_{self.get_evaluation_key(solution)}.pkl"
+
+        full_path = os.path.join(self.evaluation_folder, filename)
+        evaluation = self._load_archive_file(full_path)
+        assert isinstance(evaluation, Evaluation)
+        self._check_loaded_evaluation(solution, evaluation)
+
+        log_io(f"Loaded evaluation from {full_path}")
+        return evaluation
+
+    def _check_loaded_evaluation(self, solution: "Solution", evaluation: Evaluation) -> None:
+        if ("_pareto_x" in solution.__dict__ and evaluation.pareto_x != solution.pareto_x) or (
+            "_pareto_y" in solution.__dict__ and evaluation.pareto_y != solution.pareto_y
+        ):
+            raise RuntimeError(f"Evaluation for solution {solution.id} has changed.")
+
+    def dump_kpis(self, solution: "Solution") -> None:
+        """Append the scalar KPIs of the solution's evaluation to the kpi store."""
+        assert not self.global_mode
+        assert self.kpi_store is not None
+
+        key = self._get_solution_key(solution)
+        if key in self.kpi_store and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
+            return
+        self.kpi_store.append(key, solution.evaluation)
+
+    def load_kpi(self, solution: "Solution", kpi: str) -> Optional[float]:
+        """Load a single scalar KPI of the solution from the kpi store.
+
+        Returns None if the solution is not in the kpi store (e.g. it was archived
+        by an older version), in which case the full evaluation needs to be loaded.
+        """
+        if self.kpi_store is None:
+            return None
+        return self.kpi_store.get(self.get_evaluation_key(solution), kpi)
+
+    def dump_timetable_fingerprints(self, solutions: Iterable["Solution"]) -> None:
+        """Add the (already computed) timetable hashes of the solutions to the fingerprint store.
+
+        Unlike the other dumps, this is also possible in global mode, as the
+        fingerprints are only a cache of the archived states.
+        """
+        if self.fingerprint_store is None:
+            return
+        items: list[tuple[str, int]] = []
+        for solution in solutions:
+            if "_timetable_hash" not in solution.__dict__:
+                continue
+            key = self._get_solution_key(solution)
+            if key not in self.fingerprint_store or Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
+                items.append((key, solution.__dict__["_timetable_hash"]))
+        self.fingerprint_store.add_many(items)
+
+    def load_timetable_fingerprint(self, solution: "Solution") -> Optional[int]:
+        """Load the timetable hash of the solution from the fingerprint store (None if missing)."""
+        if self.fingerprint_store is None:
+            return None
+        return self.fingerprint_store.get(self._get_solution_key(solution))
+
+    def _get_store_name(self, solution: "Solution") -> str:
+        """Get the name of the store the solution belongs to."""
         # If the solution was dumped, it may not be processed in the context
         # of the current store, so we override the store name.
         store_name = solution.__dict__.get("_store_name", self.current_store_name)
 
         assert store_name is not None
-        store_name = self._sanitize_store_name(store_name)
+        return store_name
 
-        filename = f"evaluation_{store_name}_{solution.id}.pkl"
+    def _get_solution_key(self, solution: "Solution") -> str:
+        """Get the key of the solution, as used in the archive filenames, kpi store & sqlite archive."""
+        return f"{self._sanitize_store_name(self._get_store_name(solution))}_{solution.id}"
 
-        full_path = os.path.join(self.evaluation_folder, filename)
-        with open(full_path, "rb") as f:
-            evaluation = pickle.load(f)
-            if Settings.DELETE_LOADED_SOLUTION_ARCHIVES:
-                os.remove(filename)
+    def get_evaluation_key(self, solution: "Solution") -> str:
+        """Get the key of the archived evaluation of the solution.
 
-            if ("_pareto_x" in solution.__dict__ and evaluation.pareto_x != solution.pareto_x) or (
-                "_pareto_y" in solution.__dict__ and evaluation.pareto_y != solution.pareto_y
-            ):
-                raise RuntimeError(f"Evaluation for solution {solution.id} has changed.")
+        Usually this is the solution's own key, but duplicate solutions may
+        share the evaluation of another solution (see `data_analyzer.handle_duplicates`).
+        """
+        return solution.__dict__.get("_evaluation_key") or self._get_solution_key(solution)
 
-        log_io(f"Loaded evaluation from {full_path}")
-        return evaluation
+    def _dump_to_archive(self, solution: "Solution", column: str) -> None:
+        """Dump the evaluation or state of the solution to the sqlite archive."""
+        assert self.archive is not None
+
+        key = self._get_solution_key(solution)
+        if self.archive.has_column(key, column) and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
+            return
+        log_io(f"Dumping {column} of {solution.id} to {self.archive.filename}")
+        if column == "evaluation":
+            self.archive.add_evaluation(key, self._get_store_name(solution), solution)
+        else:
+            self.archive.add_state(key, self._get_store_name(solution), solution)
 
     def dump_state(self, solution: "Solution") -> None:
         """Dump the current state of the solution dumper to disk."""
         assert not self.global_mode
 
+        if Settings.ARCHIVE_SOLUTION_KPIS:
+            self.dump_timetable_fingerprints([solution])
+        if Settings.ARCHIVE_SOLUTIONS_TO_SQLITE:
+            self._dump_to_archive(solution, "state")
+            return
+
         filename = os.path.join(
             self.state_folder,
             f"state_{self.sanitized_current_store_name}_{solution.id}.pkl",
         )
-        if os.path.exists(filename) and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
+        if self._archive_file_exists(filename) and not Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES:
             return
         log_io(f"Dumping state to {filename}")
-        with open(filename, "wb") as f:
-            pickle.dump(solution.state, f)
+        self._write_archive_file(filename, solution.state)
 
     def load_state(self, solution: "Solution") -> State:
         """Load the current state of the solution dumper from disk."""
-        # If the solution was dumped, it may not be processed in the context
-        # of the current store, so we override the store name.
-        store_name = solution.__dict__.get("_store_name", self.current_store_name)
-
-        assert store_name is not None
-        store_name = self._sanitize_store_name(store_name)
-
-        filename = f"state_{store_name}_{solution.id}.pkl"
+        if Settings.ARCHIVE_SOLUTIONS_TO_SQLITE:
+            assert self.archive is not None
+            state = self.archive.get_state(
+                self._get_solution_key(solution), delete=Settings.DELETE_LOADED_SOLUTION_ARCHIVES
+            )
+            self._check_loaded_state(solution, state)
+            log_io(f"Loaded state of {solution.id} from {self.archive.filename}")
+            return state
+
+        filename = f"state_{self._get_solution_key(solution)}.pkl"
         full_path = os.path.join(self.state_folder, filename)
-        with open(full_path, "rb") as f:
-            state = pickle.load(f)
-            timetable_hash = hash(state.timetable)
-            if Settings.DELETE_LOADED_SOLUTION_ARCHIVES:
-                os.remove(filename)
-            if (
-                "_timetable_hash" in solution.__dict__
-                and timetable_hash != solution.__dict__["_timetable_hash"]
-            ):
-                raise RuntimeError(f"State for solution {solution.id} has changed.")
+        state = self._load_archive_file(full_path)
+        assert isinstance(state, State)
+        self._check_loaded_state(solution, state)
 
         log_io(f"Loaded state from {full_path}")
         return state
 
+    def _archive_file_exists(self, filename: str) -> bool:
+        """Check if the archive file exists (or is about to be written)."""
+        return self.writer.get_pending(filename) is not None or os.path.exists(filename)
+
+    def _write_archive_file(self, filename: str, obj: object) -> None:
+        """Write the evaluation / state to the archive file."""
+        # The object is pickled right away, as e.g. its cached properties might
+        # still be filled in (by the main thread) while it's waiting in the writer.
+        data = pickle.dumps(obj)
+        if Settings.ASYNC_SOLUTION_DUMPS:
+            self.writer.write_file(filename, data)
+            return
+        with open(filename, "wb") as f:
+            f.write(data)
+
+    def _load_archive_file(self, filename: str) -> object:
+        """Load an archive file (or its pending write), and delete it if DELETE_LOADED_SOLUTION_ARCHIVES."""
+        if Settings.DELETE_LOADED_SOLUTION_ARCHIVES:
+            # The file won't be written at all, if the write is still pending
+            data = self.writer.cancel_pending(filename)
+        else:
+            data = self.writer.get_pending(filename)
+        if data is not None:
+            log_io(f"Loaded pending archive file {filename}")
+            return pickle.loads(data)
+
+        with open(filename, "rb") as f:
+            obj = pickle.load(f)
+        if Settings.DELETE_LOADED_SOLUTION_ARCHIVES:
+            os.remove(filename)
+        return obj
+
+    def _check_loaded_state(self, solution: "Solution", state: State) -> None:
+        if (
+            "_timetable_hash" in solution.__dict__
+            and hash(state.timetable) != solution.__dict__["_timetable_hash"]
+        ):
+            raise RuntimeError(f"State for solution {solution.id} has changed.")
+
     def close(self) -> None:
-        """Close any open file handles."""
+        """Close any open file handles (after all background writes are done)."""
+        self.writer.close()
         if self.store_file is not None:
             self.store_file.close()
             self.store_file = None
         if self.solutions_file is not None:
             self.solutions_file.close()
             self.solutions_file = None
+        if self.kpi_store is not None:
+            self.kpi_store.close()
+        if self.fingerprint_store is not None:
+            self.fingerprint_store.close()
+        if self.archive is not None:
+            self.archive.close()
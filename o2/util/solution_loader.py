@@ -0,0 +1,202 @@
+import concurrent.futures
+import functools
+import os
+import pickle
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from o2.models.settings import Settings
+from o2.util.logger import debug, warn
+
+if TYPE_CHECKING:
+    from o2.models.evaluation import Evaluation
+    from o2.models.solution import Solution
+    from o2.models.state import State
+    from o2.store import Store
+
+
+@dataclass(eq=False)
+class SolutionRecord:
+    """The scalar fields of an archived solution, with lazy access to the full solution.
+
+    Records compare & hash like `Solution`s, and provide the fields used to
+    build pareto fronts (`pareto_x`, `pareto_y`, `is_valid`), so they can be
+    used in place of solutions, e.g. for `create_front_from_solutions`.
+    """
+
+    id: str
+    store_name: str
+    pareto_x: float
+    pareto_y: float
+    is_valid: bool
+    hash: int
+    """The `hash` of the solution (based on the id or the timetable)."""
+    file: str
+    """The solutions or store file the solution was loaded from."""
+    offset: Optional[int] = None
+    """The offset of the pickled solution in the solutions file (None for store files)."""
+
+    def __post_init__(self) -> None:
+        """Set the store name like on archived solutions (see `Solution.archive`)."""
+        self.__dict__["_store_name"] = self.store_name
+
+    @property
+    def point(self) -> tuple[float, float]:
+        """Return the pareto point of the solution."""
+        return (self.pareto_x, self.pareto_y)
+
+    def load_solution(self) -> "Solution":
+        """Load the (archived) solution from its file.
+
+        NOTE: Solutions of store files require loading the whole store (the
+        last loaded store is cached).
+        """
+        if self.offset is None:
+            solution = _find_store_solution(_load_store(self.file), self.id)
+        else:
+            with open(self.file, "rb") as f:
+                f.seek(self.offset)
+                solution = pickle.load(f)
+        solution.__dict__["_store_name"] = self.store_name
+        return solution
+
+    def load_evaluation(self) -> "Evaluation":
+        """Load the evaluation of the solution (from the solution archives)."""
+        return self.load_solution().evaluation
+
+    def load_state(self) -> "State":
+        """Load the state of the solution (from the solution archives)."""
+        return self.load_solution().state
+
+    def __eq__(self, value: object) -> bool:
+        """Check if this record is equal to the given record (like `Solution.__eq__`)."""
+        if not isinstance(value, SolutionRecord):
+            return False
+        if Settings.CHECK_FOR_TIMETABLE_EQUALITY:
+            return self.hash == value.hash
+        return self.id == value.id
+
+    def __hash__(self) -> int:
+        """Hash the record like the solution."""
+        return self.hash
+
+
+@dataclass
+class StoreSummary:
+    """The scalar fields of a pickled store."""
+
+    name: str
+    file: str
+    solution_lookup: dict[str, Optional[SolutionRecord]] = field(default_factory=dict)
+    """The solutions of the solution tree (None if the solution is not available anymore)."""
+    pareto_front_solutions: list[SolutionRecord] = field(default_factory=list)
+    """The solutions of all pareto fronts of the store."""
+    base_solution: Optional[SolutionRecord] = None
+
+
+def create_solution_record(
+    solution: "Solution", file: str, offset: Optional[int] = None, store_name: Optional[str] = None
+) -> SolutionRecord:
+    """Create the record of the solution."""
+    return SolutionRecord(
+        id=solution.id,
+        store_name=solution.__dict__.get("_store_name", store_name),
+        pareto_x=solution.pareto_x,
+        pareto_y=solution.pareto_y,
+        is_valid=solution.is_valid,
+        hash=hash(solution),
+        file=file,
+        offset=offset,
+    )
+
+
+def read_solution_records(file: str) -> list[SolutionRecord]:
+    """Read the records of all solutions in a solutions file (as written by the `SolutionDumper`)."""
+    records: list[SolutionRecord] = []
+    with open(file, "rb") as f:
+        debug(f"Loading solutions from {file}...")
+        while True:
+            offset = f.tell()
+            try:
+                solution = pickle.load(f)
+            except EOFError:
+                break
+            except Exception as e:
+                warn(f"Error loading (more) solutions from {file}: {e}")
+                break
+            records.append(create_solution_record(solution, file, offset))
+    debug(f"Loaded {len(records)} solutions from {file}")
+    return records
+
+
+def read_store_summary(file: str) -> Optional[StoreSummary]:
+    """Read the summary of a pickled store (None if the store can't be loaded)."""
+    debug(f"Loading store from {file}...")
+    try:
+        with open(file, "rb") as f:
+            store: Store = pickle.load(f)
+    except Exception as e:
+        warn(f"Error loading store from {file}: {e}")
+        return None
+
+    summary = StoreSummary(name=store.name, file=file)
+    for solution_id, solution in store.solution_tree.solution_lookup.items():
+        summary.solution_lookup[solution_id] = (
+            None if solution is None else create_solution_record(solution, file, store_name=store.name)
+        )
+    summary.pareto_front_solutions = [
+        summary.solution_lookup.get(solution.id)
+        or create_solution_record(solution, file, store_name=store.name)
+        for front in store.pareto_fronts
+        for solution in front.solutions
+    ]
+    if store.base_solution is not None:
+        summary.base_solution = create_solution_record(store.base_solution, file, store_name=store.name)
+    debug(f"Loaded store '{store.name}' from {file}")
+    return summary
+
+
+def stream_solution_records(
+    files: Iterable[str], max_workers: Optional[int] = None
+) -> Iterator[SolutionRecord]:
+    """Stream the records of the solutions files, which are read in parallel worker processes.
+
+    Only the records are sent back from the workers, so the (archived)
+    solutions are never held in memory all at once. The records of a file
+    are yielded as soon as the file is read, so the order of the files
+    isn't kept.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=_get_max_workers(max_workers)) as executor:
+        futures = [executor.submit(read_solution_records, file) for file in files]
+        for future in concurrent.futures.as_completed(futures):
+            yield from future.result()
+
+
+def load_store_summaries(files: Iterable[str], max_workers: Optional[int] = None) -> list[StoreSummary]:
+    """Load the summaries of the store files in parallel worker processes (in the order of the files)."""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=_get_max_workers(max_workers)) as executor:
+        return [summary for summary in executor.map(read_store_summary, files) if summary is not None]
+
+
+def _get_max_workers(max_workers: Optional[int]) -> int:
+    return max_workers or Settings.MAX_THREADS_ACTION_EVALUATION or os.cpu_count() or 1
+
+
+@functools.lru_cache(maxsize=1)
+def _load_store(file: str) -> "Store":
+    with open(file, "rb") as f:
+        return pickle.load(f)
+
+
+def _find_store_solution(store: "Store", solution_id: str) -> "Solution":
+    solution = store.solution_tree.solution_lookup.get(solution_id)
+    if solution is not None:
+        return solution
+    for front_solution in [
+        store.base_solution,
+        *(s for front in store.pareto_fronts for s in front.solutions),
+    ]:
+        if front_solution is not None and front_solution.id == solution_id:
+            return front_solution
+    raise KeyError(f"Solution {solution_id} not found in {store.name}")
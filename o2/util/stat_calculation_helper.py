@@ -1,7 +1,9 @@
 import math
 
 import numpy as np
+from scipy.spatial import cKDTree
 
+from o2.models.settings import Settings
 from o2.models.solution import Solution
 
 
@@ -10,6 +12,47 @@ def distance(point1: tuple[float, float], point2: tuple[float, float]) -> float:
     return float(np.linalg.norm(np.array(point1) - np.array(point2)))
 
 
+def get_points(solutions: list[Solution]) -> np.ndarray:
+    """Get the (pareto_x, pareto_y) points of the solutions as a (n, 2) array."""
+    points = np.empty((len(solutions), 2), dtype=np.float64)
+    for i, solution in enumerate(solutions):
+        points[i] = solution.pareto_x, solution.pareto_y
+    return points
+
+
+def get_non_dominated_mask(points: np.ndarray) -> np.ndarray:
+    """Get a mask of the points, that are not dominated by any other (different) point.
+
+    Uses the same domination as `Solution.is_dominated_by` (incl. the
+    `Settings.EQUAL_DOMINATION_ALLOWED` setting), but instead of comparing all
+    pairs, the points are sorted by x & y and swept once, tracking the lowest
+    y of all points with a smaller x. So this runs in O(n log n).
+    """
+    mask = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return mask
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    xs = points[order, 0]
+    ys = points[order, 1]
+
+    # Group the points by x; within a group the first point has the lowest y
+    is_group_start = np.r_[True, xs[1:] != xs[:-1]]
+    group_ids = np.cumsum(is_group_start) - 1
+    group_min_y = ys[is_group_start]
+    # Lowest y of all points with a strictly smaller x
+    lower_x_min_y = np.r_[np.inf, np.minimum.accumulate(group_min_y)[:-1]][group_ids]
+
+    if Settings.EQUAL_DOMINATION_ALLOWED:
+        # Only dominated, if another point is strictly better in both dimensions
+        not_dominated = ys <= lower_x_min_y
+    else:
+        # Dominated by any other point that is at least as good in both dimensions,
+        # so only the lowest point(s) of a x-group can remain.
+        not_dominated = (ys == group_min_y[group_ids]) & (ys < lower_x_min_y)
+    mask[order] = not_dominated
+    return mask
+
+
 def calculate_hyperarea(pareto_solutions: list[Solution], reference_point: tuple[float, float]) -> float:
     """Compute the hyperarea of the Pareto solutions.
 
@@ -28,28 +71,18 @@ def calculate_hyperarea(pareto_solutions: list[Solution], reference_point: tuple
         return 0.0
 
     # Sort solutions in descending order by their x-coordinate
-    sorted_solutions = sorted(pareto_solutions, key=lambda s: s.pareto_x, reverse=True)
+    # (stable, so that ties keep their order, like `sorted(..., reverse=True)`)
+    points = get_points(pareto_solutions)
+    points = points[np.argsort(-points[:, 0], kind="stable")]
 
     ref_x, ref_y = reference_point
 
-    # Accumulate area by "slicing" from right to left
-    area = 0.0
-    # Start from the reference corner
-    last_x = ref_x
-
-    # Traverse from the solution with the largest x to the smallest
-    for sol in sorted_solutions:
-        x, y = sol.point
-
-        width = last_x - x
-        height = ref_y - y
-        # Add the area of that rectangle
-        area += width * height
-
-        # Move the x-boundary left
-        last_x = x
-
-    return area
+    # "Slice" the area from right to left, starting at the reference corner:
+    # Every solution adds the rectangle between it and the previous x-boundary.
+    widths = np.r_[ref_x, points[:-1, 0]] - points[:, 0]
+    heights = ref_y - points[:, 1]
+    # Accumulate sequentially, so the result matches a plain loop bit for bit
+    return float(np.add.accumulate(widths * heights)[-1])
 
 
 def generational_distance_p2(a: list[Solution], b: list[Solution]) -> float:
@@ -59,21 +92,16 @@ def generational_distance_p2(a: list[Solution], b: list[Solution]) -> float:
     - For each solution a in A, find the minimum Euclidean distance to any b in B.
     - Accumulate the square of that minimum distance.
     - Return the square root of the average of those squared distances (RMS).
+
+    The nearest neighbors are found with a KD-tree, so this runs in O((|A| + |B|) log |B|).
     """
     if not a:
         return 0.0
-    sum_of_squares = 0.0
-    for sol_a in a:
-        a_pt = sol_a.point
-        min_d = float("inf")
-        for sol_b in b:
-            b_pt = sol_b.point
-            dist = distance(a_pt, b_pt)
-            if dist < min_d:
-                min_d = dist
-        sum_of_squares += min_d**2
-
-    mean_sq = sum_of_squares / len(a)
+    if not b:
+        return float("inf")
+    min_distances, _ = cKDTree(get_points(b)).query(get_points(a))
+
+    mean_sq = float(np.add.accumulate(min_distances**2)[-1]) / len(a)
     return math.sqrt(mean_sq)
 
 
@@ -121,36 +149,36 @@ def calculate_delta_metric(pareto_front: list, reference_set: list) -> float:
         return 0.0
 
     # 1. Determine "extreme" reference points from the reference set
-    extreme_x = min(reference_set, key=lambda s: s.pareto_x)
-    extreme_y = min(reference_set, key=lambda s: s.pareto_y)
-
-    # 2. Sort the Pareto front along the same objective
-    sorted_front_x = sorted(pareto_front, key=lambda s: s.pareto_x)
-    sorted_front_y = sorted(pareto_front, key=lambda s: s.pareto_y)
+    # (argmin returns the first minimum, like `min`)
+    reference_points = get_points(reference_set)
+    extreme_x = reference_points[np.argmin(reference_points[:, 0])]
+    extreme_y = reference_points[np.argmin(reference_points[:, 1])]
 
     # If there is only 1 solution, there's no "spread"
-    if len(sorted_front_x) == 1:
+    if len(pareto_front) == 1:
         # You might define Δ = 0 if only one solution is present.
         return 0.0
 
+    # 2. Sort the Pareto front along the same objective
+    front_points = get_points(pareto_front)
+    sorted_front_x = front_points[np.argsort(front_points[:, 0], kind="stable")]
+    first_front_y = front_points[np.argmin(front_points[:, 1])]
+
     # 3. Compute the distances according to the formula
     # d_f: distance between the first Pareto solution and the reference min
-    d_f = distance(sorted_front_x[0].point, extreme_x.point)
+    d_f = float(np.linalg.norm(sorted_front_x[0] - extreme_x))
     # d_l: distance between the last Pareto solution and the reference max
-    d_l = distance(sorted_front_y[0].point, extreme_y.point)
+    d_l = float(np.linalg.norm(first_front_y - extreme_y))
 
     # d_i: consecutive distances between solutions in the sorted Pareto front
     # We just go one "direction" (x), because euclidean distance is commutative
-    consecutive_d = []
-    for i in range(1, len(sorted_front_x)):
-        d_i = distance(sorted_front_x[i - 1].point, sorted_front_x[i].point)
-        consecutive_d.append(d_i)
+    consecutive_d = np.linalg.norm(np.diff(sorted_front_x, axis=0), axis=1)
 
     # Average gap d̄
-    d_bar = sum(consecutive_d) / len(consecutive_d)
+    d_bar = float(np.add.accumulate(consecutive_d)[-1]) / len(consecutive_d)
 
     # Sum of absolute deviations from the mean gap
-    sum_abs_dev = sum(abs(d_i - d_bar) for d_i in consecutive_d)
+    sum_abs_dev = float(np.add.accumulate(np.abs(consecutive_d - d_bar))[-1])
 
     # Numerator and denominator of the Delta formula
     numerator = d_f + d_l + sum_abs_dev
@@ -165,7 +193,12 @@ def calculate_delta_metric(pareto_front: list, reference_set: list) -> float:
 
 def calculate_purity(pareto_front: list[Solution], reference_set: list[Solution]) -> float:
     """Calculate the Purity metric for the Pareto front."""
-    pareto_set = {tuple(sol.point) for sol in pareto_front}
-    reference_set_points = {tuple(sol.point) for sol in reference_set}
-    pure_points = pareto_set.intersection(reference_set_points)
-    return len(pure_points) / len(reference_set_points) if pareto_front else 0.0
+    if not pareto_front:
+        return 0.0
+    pareto_set = np.unique(get_points(pareto_front), axis=0)
+    reference_set_points = np.unique(get_points(reference_set), axis=0)
+    pure_points = np.isin(
+        reference_set_points.view([("x", np.float64), ("y", np.float64)]),
+        pareto_set.view([("x", np.float64), ("y", np.float64)]),
+    )
+    return int(pure_points.sum()) / len(reference_set_points)
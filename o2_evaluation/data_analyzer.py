@@ -1,5 +1,7 @@
+import concurrent.futures
 import gc
 import glob
+import os
 import pickle
 from collections import defaultdict
 from collections.abc import Iterable
@@ -16,6 +18,8 @@ from o2.util.stat_calculation_helper import (
     calculate_delta_metric,
     calculate_hyperarea,
     calculate_purity,
+    get_non_dominated_mask,
+    get_points,
 )
 
 INCLUDE_SOLUTIONS_WITHOUT_STORE = True
@@ -87,19 +91,15 @@ EMPTY_METRIC: Metrics = {
 
 
 def create_front_from_solutions(solutions: Iterable[Solution]) -> list[Solution]:
-    """Create the Pareto front from the given solutions."""
-    return list(
-        set(
-            solution
-            for solution in solutions
-            if solution.is_valid
-            and not any(
-                solution.is_dominated_by(other)
-                for other in solutions
-                if other.is_valid and other.point != solution.point
-            )
-        )
-    )
+    """Create the Pareto front from the given solutions.
+
+    Returns the valid solutions that are not dominated by any other valid
+    solution (with a different point), without duplicates. Solutions with the
+    same point are all kept.
+    """
+    valid_solutions = [solution for solution in solutions if solution.is_valid]
+    mask = get_non_dominated_mask(get_points(valid_solutions))
+    return list(dict.fromkeys(solution for solution, keep in zip(valid_solutions, mask) if keep))
 
 
 def filter_solutions(
@@ -137,8 +137,73 @@ def _update_evaluation(solution: Solution, evaluation: Evaluation) -> None:
     solution.__dict__["is_valid"] = not evaluation.is_empty
 
 
+def _share_evaluation(solution: Solution, other: Solution) -> None:
+    """Let the solution use the evaluation of the other (duplicate) solution.
+
+    If the other evaluation is archived, it isn't loaded: the solution only
+    references it, and takes the scalar fields from the kpi store.
+    """
+    if (
+        other.__dict__.get("_evaluation") is not None
+        or other.__dict__.get("evaluation") is not None
+        or not Settings.ARCHIVE_SOLUTIONS
+    ):
+        _update_evaluation(solution, other.evaluation)
+        return
+    solution.__dict__["evaluation"] = None
+    solution.__dict__["_evaluation"] = None
+    solution.__dict__["_evaluation_key"] = SolutionDumper.instance.get_evaluation_key(other)
+    solution.__dict__["pareto_x"] = other.pareto_x
+    solution.__dict__["pareto_y"] = other.pareto_y
+    solution.__dict__["point"] = (other.pareto_x, other.pareto_y)
+    solution.__dict__["is_valid"] = not other.get_kpi("is_empty")
+
+
+def _get_timetable_hash(solution: Solution) -> int:
+    return hash(solution)
+
+
+def ensure_timetable_fingerprints(solutions: list[Solution], max_workers: Optional[int] = None) -> None:
+    """Make sure the timetable hashes of the solutions are known, before hashing them.
+
+    The hashes are taken from the fingerprint store; missing ones (e.g. from
+    older archives) are computed once in parallel worker processes (as that
+    requires loading the states), and then added to the fingerprint store.
+    """
+    missing = [
+        solution
+        for solution in solutions
+        if "_timetable_hash" not in solution.__dict__
+        and (
+            not solution.actions
+            or not Settings.ARCHIVE_SOLUTIONS
+            or SolutionDumper.instance.load_timetable_fingerprint(solution) is None
+        )
+    ]
+    if not missing:
+        return
+    info(f"Computing {len(missing)} timetable fingerprints...")
+    max_workers = max_workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunksize = max(1, len(missing) // (4 * max_workers))
+        for solution, timetable_hash in zip(
+            missing, executor.map(_get_timetable_hash, missing, chunksize=chunksize)
+        ):
+            solution.__dict__["_timetable_hash"] = timetable_hash
+    if Settings.ARCHIVE_SOLUTIONS:
+        SolutionDumper.instance.dump_timetable_fingerprints(missing)
+
+
 def handle_duplicates(solutions: Iterable[Solution]) -> None:
-    """Handle duplicate solutions by updating the evaluation of the duplicate solution."""
+    """Handle duplicate solutions by updating the evaluation of the duplicate solution.
+
+    Duplicates are resolved by their (stored) KPIs only: The solution with the
+    lower total cycle time is kept, and the other one shares its evaluation.
+    """
+    solutions = list(solutions)
+    if Settings.CHECK_FOR_TIMETABLE_EQUALITY:
+        ensure_timetable_fingerprints(solutions)
+
     duplicate_lookup: dict[int, Solution] = {}
     for solution in solutions:
         if not solution.is_valid:
@@ -146,23 +211,22 @@ def handle_duplicates(solutions: Iterable[Solution]) -> None:
         if duplicate_lookup.get(hash(solution)) is None:
             duplicate_lookup[hash(solution)] = solution
         else:
-            try:
-                first_solution = duplicate_lookup[hash(solution)]
-                first_evaluation = first_solution.evaluation
-                second_evaluation = solution.evaluation
-            except Exception as e:
-                warn(f"Error getting evaluation for {solution.id}: {e}")
-                continue
+            first_solution = duplicate_lookup[hash(solution)]
             if not first_solution.is_valid and not solution.is_valid:
                 warn(f"Duplicate solution found: {solution.id}, both are invalid!")
                 continue
-            elif solution.is_valid and first_evaluation.total_cycle_time > second_evaluation.total_cycle_time:
-                _update_evaluation(first_solution, second_evaluation)
-                duplicate_lookup[hash(solution)] = solution
-                # log_io(f"Duplicate solution found: {solution.id}, keeping it.")
-            else:
-                # log_io(f"Duplicate solution found: {solution.id}, keeping first ({first_solution.id}).")
-                _update_evaluation(solution, first_evaluation)
+            try:
+                if solution.is_valid and first_solution.get_kpi("total_cycle_time") > solution.get_kpi(
+                    "total_cycle_time"
+                ):
+                    _share_evaluation(first_solution, solution)
+                    duplicate_lookup[hash(solution)] = solution
+                    # log_io(f"Duplicate solution found: {solution.id}, keeping it.")
+                else:
+                    # log_io(f"Duplicate solution found: {solution.id}, keeping first ({first_solution.id}).")
+                    _share_evaluation(solution, first_solution)
+            except Exception as e:
+                warn(f"Error getting evaluation for {solution.id}: {e}")
 
 
 def recalculate_pareto_front(solution_dict: dict[str, Solution], store: Store) -> list[Solution]:
@@ -298,11 +362,11 @@ def calculate_metrics(
         avg_x = sum(solution.pareto_x for solution in front) / len(front)
         avg_y = sum(solution.pareto_y for solution in front) / len(front)
 
-        avg_cycle_time = sum(solution.evaluation.total_cycle_time for solution in front) / len(front)
+        avg_cycle_time = sum(solution.get_kpi("total_cycle_time") for solution in front) / len(front)
 
-        best_cycle_time = min(solution.evaluation.total_cycle_time for solution in front)
+        best_cycle_time = min(solution.get_kpi("total_cycle_time") for solution in front)
 
-        best_avg_cycle_time = min(solution.evaluation.avg_cycle_time_by_case for solution in front)
+        best_avg_cycle_time = min(solution.get_kpi("avg_cycle_time_by_case") for solution in front)
 
         return {
             "store_name": f"{agent} {scenario}",
@@ -356,15 +420,15 @@ def calculate_metrics(
             "best_y": min(solution.pareto_y for solution in all_solutions_front),
             "avg_x": sum(solution.pareto_x for solution in all_solutions_front) / len(all_solutions_front),
             "avg_y": sum(solution.pareto_y for solution in all_solutions_front) / len(all_solutions_front),
-            "best_cycle_time": min(solution.evaluation.total_cycle_time for solution in all_solutions_front),
+            "best_cycle_time": min(solution.get_kpi("total_cycle_time") for solution in all_solutions_front),
             "pareto_avg_cycle_time": sum(
-                solution.evaluation.total_cycle_time for solution in all_solutions_front
+                solution.get_kpi("total_cycle_time") for solution in all_solutions_front
             )
             / len(all_solutions_front),
             "base_cycle_time": base_cycle_time,
             "base_avg_cycle_time": base_avg_cycle_time,
             "best_avg_cycle_time": min(
-                solution.evaluation.avg_cycle_time_by_case for solution in all_solutions_front
+                solution.get_kpi("avg_cycle_time_by_case") for solution in all_solutions_front
             ),
         }
     )
@@ -413,12 +477,12 @@ def calculate_metrics(
         avg_x = sum(solution.pareto_x for solution in pareto_solutions) / len(pareto_solutions)
         avg_y = sum(solution.pareto_y for solution in pareto_solutions) / len(pareto_solutions)
 
-        avg_cycle_time = sum(solution.evaluation.total_cycle_time for solution in pareto_solutions) / len(
+        avg_cycle_time = sum(solution.get_kpi("total_cycle_time") for solution in pareto_solutions) / len(
             pareto_solutions
         )
 
-        best_cycle_time = min(solution.evaluation.total_cycle_time for solution in pareto_solutions)
-        best_avg_cycle_time = min(solution.evaluation.avg_cycle_time_by_case for solution in pareto_solutions)
+        best_cycle_time = min(solution.get_kpi("total_cycle_time") for solution in pareto_solutions)
+        best_avg_cycle_time = min(solution.get_kpi("avg_cycle_time_by_case") for solution in pareto_solutions)
 
         metrics.append(
             {
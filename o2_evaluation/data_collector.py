@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 import argparse
+import multiprocessing
+import multiprocessing.connection
 import os
 
 from o2.models.settings import ActionVariationSelection, AgentType, CostType, Settings
@@ -8,7 +10,7 @@ from o2.optimizer import Optimizer
 from o2.simulation_runner import SimulationRunner
 from o2.store import Store
 from o2.util.data_collector_helper import store_with_baseline_constraints
-from o2.util.logger import info, setup_logging, stats
+from o2.util.logger import info, setup_logging, stats, warn
 from o2.util.solution_dumper import SolutionDumper
 
 
@@ -48,7 +50,7 @@ def parse_args():
         "--dump-interval",
         type=int,
         default=250,
-        help="Interval for dumping solution data (default: 250)",
+        help="Interval (in solutions) for writing checkpoints of the store (default: 250)",
     )
     parser.add_argument(
         "--active-scenarios",
@@ -125,12 +127,30 @@ def parse_args():
         default=os.cpu_count() or 1,
         help="Maximum number of threads (default: cpu_count)",
     )
+    parser.add_argument(
+        "--parallel-jobs",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Run the (scenario, agent) jobs concurrently in separate processes (default: False)",
+    )
+    parser.add_argument(
+        "--cpu-budget",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of cores shared by the jobs with --parallel-jobs (default: cpu_count)",
+    )
     parser.add_argument(
         "--max-number-of-actions-per-iteration",
         type=int,
         default=None,
         help="Maximum number of actions to select per iteration (default: max-threads -- which is cpu_count by default)",
     )
+    parser.add_argument(
+        "--ppo-actions-per-step",
+        type=int,
+        default=1,
+        help="Number of actions the PPO agents evaluate (in parallel) per step (default: 1)",
+    )
     parser.add_argument(
         "--max-number-of-variations-per-action",
         type=int,
@@ -201,18 +221,20 @@ def solve_store(store: Store, dump_interval: int) -> None:
     """Solve the store with the given agent."""
     # Persist the initial state of the store
     persist_store(store)
+    # Instead of dumping the whole store periodically, incremental checkpoints are
+    # appended, which only contain the solutions found since the last checkpoint.
+    store.settings.checkpoint_path = SolutionDumper.instance.get_checkpoint_path(store.name)
+    store.settings.checkpoint_interval = max(
+        1, dump_interval // max(1, store.settings.max_number_of_actions_per_iteration)
+    )
     optimizer = Optimizer(store)
     generator = optimizer.get_iteration_generator(yield_on_non_acceptance=True)
-    iteration = 1
     info(f"Start processing of {store.name}")
     for _ in generator:
         if store.settings.log_to_tensor_board:
             from o2.util.tensorboard_helper import TensorBoardHelper
 
             TensorBoardHelper.instance.tensor_board_iteration_callback(store.solution)
-        if iteration % dump_interval == 0:
-            persist_store(store)
-        iteration += 1
 
     persist_store(store)
 
@@ -228,10 +250,20 @@ def solve_store(store: Store, dump_interval: int) -> None:
     SimulationRunner.close_executor()
 
 
-def collect_data_sequentially(base_store: Store, args: argparse.Namespace) -> None:
-    """Collect all possible solutions and the respective Pareto fronts."""
-    info("Setting up Store")
-    # Set some global settings
+AGENT_TYPES = {
+    "Tabu Search": AgentType.TABU_SEARCH,
+    "Tabu Search Random": AgentType.TABU_SEARCH_RANDOM,
+    "Simulated Annealing": AgentType.SIMULATED_ANNEALING,
+    "Simulated Annealing Random": AgentType.SIMULATED_ANNEALING_RANDOM,
+    "Proximal Policy Optimization": AgentType.PROXIMAL_POLICY_OPTIMIZATION,
+    "Proximal Policy Optimization Random": AgentType.PROXIMAL_POLICY_OPTIMIZATION_RANDOM,
+}
+
+
+def update_global_settings(args: argparse.Namespace) -> None:
+    """Set the global settings used for the data collection."""
+    Settings.LOG_LEVEL = args.log_level
+    Settings.LOG_FILE = args.log_file if args.log_file else None
     Settings.SHOW_SIMULATION_ERRORS = True
     Settings.RAISE_SIMULATION_ERRORS = False
     Settings.COST_TYPE = CostType.AVG_WT_AND_PT_PER_TASK_INSTANCE
@@ -242,113 +274,193 @@ def collect_data_sequentially(base_store: Store, args: argparse.Namespace) -> No
     Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
     Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES = False
 
-    # Optionally archive previous TensorBoard logs
-    if (
-        base_store.settings.log_to_tensor_board or args.log_to_tensor_board
-    ) and Settings.ARCHIVE_TENSORBOARD_LOGS:
-        from o2.util.tensorboard_helper import TensorBoardHelper
-
-        TensorBoardHelper.move_logs_to_archive_dir()
 
-    stores_to_run = []
+def create_agent_store(base_store: Store, agent_name: str, args: argparse.Namespace) -> Store:
+    """Create the store for running the given agent on the base store's scenario.
 
-    # Use TABU search
-    if "Tabu Search" in args.agents:
-        store_name = f"Tabu Search {base_store.name}"
-        tabu_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            store_name,
-        )
-        update_store_settings(tabu_store, AgentType.TABU_SEARCH, args)
-        solve_store(tabu_store, args.dump_interval)
-        stores_to_run.append(("Tabu Search", tabu_store))
-    if "Tabu Search Random" in args.agents:
-        store_name = f"Tabu Search Random {base_store.name}"
-        tabu_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            store_name,
-        )
-        update_store_settings(tabu_store, AgentType.TABU_SEARCH_RANDOM, args)
-        solve_store(tabu_store, args.dump_interval)
-        stores_to_run.append(("Tabu Search Random", tabu_store))
-
-    # Use Simulated Annealing
-    if "Simulated Annealing" in args.agents:
-        store_name = f"Simulated Annealing {base_store.name}"
-        sa_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            store_name,
-        )
-        update_store_settings(sa_store, AgentType.SIMULATED_ANNEALING, args)
-        sa_store.settings.sa_initial_temperature = (
-            float(args.sa_initial_temperature) if args.sa_initial_temperature != "auto" else "auto"
-        )
-        sa_store.settings.sa_cooling_factor = (
-            float(args.sa_cooling_factor) if args.sa_cooling_factor != "auto" else "auto"
-        )
-        solve_store(sa_store, args.dump_interval)
-        stores_to_run.append(("Simulated Annealing", sa_store))
-
-    if "Simulated Annealing Random" in args.agents:
-        store_name = f"Simulated Annealing Random {base_store.name}"
-        sa_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            store_name,
-        )
-        update_store_settings(sa_store, AgentType.SIMULATED_ANNEALING_RANDOM, args)
-        sa_store.settings.sa_initial_temperature = (
+    NOTE: This also updates the global (thread) settings for the agent.
+    """
+    agent = AGENT_TYPES[agent_name]
+    store = Store.from_state_and_constraints(
+        base_store.base_state,
+        base_store.constraints,
+        f"{agent_name} {base_store.name}",
+    )
+    update_store_settings(store, agent, args)
+    if agent in (AgentType.SIMULATED_ANNEALING, AgentType.SIMULATED_ANNEALING_RANDOM):
+        store.settings.sa_initial_temperature = (
             float(args.sa_initial_temperature) if args.sa_initial_temperature != "auto" else "auto"
         )
-        sa_store.settings.sa_cooling_factor = (
+        store.settings.sa_cooling_factor = (
             float(args.sa_cooling_factor) if args.sa_cooling_factor != "auto" else "auto"
         )
-        solve_store(sa_store, args.dump_interval)
-        stores_to_run.append(("Simulated Annealing Random", sa_store))
-
-    # Use Proximal Policy Optimization (PPO)
-    if "Proximal Policy Optimization" in args.agents:
-        ppo_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            f"Proximal Policy Optimization {base_store.name}",
-        )
-        update_store_settings(ppo_store, AgentType.PROXIMAL_POLICY_OPTIMIZATION, args)
-        Settings.MAX_THREADS_ACTION_EVALUATION = 1
-        Settings.MAX_THREADS_MEDIAN_CALCULATION = Settings.NUMBER_OF_SIMULATION_FOR_MEDIAN
+    elif agent in (AgentType.PROXIMAL_POLICY_OPTIMIZATION, AgentType.PROXIMAL_POLICY_OPTIMIZATION_RANDOM):
+        store.settings.ppo_actions_per_step = args.ppo_actions_per_step
+        if args.ppo_actions_per_step == 1:
+            Settings.MAX_THREADS_ACTION_EVALUATION = 1
+            Settings.MAX_THREADS_MEDIAN_CALCULATION = Settings.NUMBER_OF_SIMULATION_FOR_MEDIAN
+        else:
+            Settings.MAX_THREADS_ACTION_EVALUATION = min(args.ppo_actions_per_step, args.max_threads)
 
-        ppo_store.settings.max_number_of_actions_per_iteration = 1
+        store.settings.max_number_of_actions_per_iteration = args.ppo_actions_per_step
         # Disable distance based selection (so we always find a new base solution)
-        ppo_store.settings.max_distance_to_new_base_solution = float("inf")
-        ppo_store.settings.error_radius_in_percent = None
+        store.settings.max_distance_to_new_base_solution = float("inf")
+        store.settings.error_radius_in_percent = None
+    return store
+
+
+def get_required_cores(agent_name: str, args: argparse.Namespace) -> int:
+    """Get the number of cores a job of the given agent uses (at most the cpu budget)."""
+    if AGENT_TYPES[agent_name] in (
+        AgentType.PROXIMAL_POLICY_OPTIMIZATION,
+        AgentType.PROXIMAL_POLICY_OPTIMIZATION_RANDOM,
+    ):
+        # PPO evaluates one action at a time (running the median simulations in parallel),
+        # or multiple actions in parallel
+        cores = (
+            Settings.NUMBER_OF_SIMULATION_FOR_MEDIAN
+            if args.ppo_actions_per_step == 1
+            else min(args.ppo_actions_per_step, args.max_threads)
+        )
+    else:
+        cores = args.max_threads
+    return max(1, min(cores, args.cpu_budget))
 
-        solve_store(ppo_store, args.dump_interval)
-        stores_to_run.append(("Proximal Policy Optimization", ppo_store))
 
-    if "Proximal Policy Optimization Random" in args.agents:
-        ppo_store = Store.from_state_and_constraints(
-            base_store.base_state,
-            base_store.constraints,
-            f"Proximal Policy Optimization Random {base_store.name}",
-        )
-        update_store_settings(ppo_store, AgentType.PROXIMAL_POLICY_OPTIMIZATION_RANDOM, args)
-        Settings.MAX_THREADS_ACTION_EVALUATION = 1
-        Settings.MAX_THREADS_MEDIAN_CALCULATION = Settings.NUMBER_OF_SIMULATION_FOR_MEDIAN
+def collect_data_sequentially(base_store: Store, args: argparse.Namespace) -> None:
+    """Collect all possible solutions and the respective Pareto fronts."""
+    info("Setting up Store")
+    # Set some global settings
+    update_global_settings(args)
 
-        ppo_store.settings.max_number_of_actions_per_iteration = 1
-        # Disable distance based selection (so we always find a new base solution)
-        ppo_store.settings.max_distance_to_new_base_solution = float("inf")
-        ppo_store.settings.error_radius_in_percent = None
+    # Optionally archive previous TensorBoard logs
+    if (
+        base_store.settings.log_to_tensor_board or args.log_to_tensor_board
+    ) and Settings.ARCHIVE_TENSORBOARD_LOGS:
+        from o2.util.tensorboard_helper import TensorBoardHelper
 
-        solve_store(ppo_store, args.dump_interval)
-        stores_to_run.append(("Proximal Policy Optimization Random", ppo_store))
+        TensorBoardHelper.move_logs_to_archive_dir()
+
+    for agent_name in AGENT_TYPES:
+        if agent_name in args.agents:
+            solve_store(create_agent_store(base_store, agent_name, args), args.dump_interval)
 
     SolutionDumper.instance.close()
 
 
+def run_job(base_store: Store, agent_name: str, args: argparse.Namespace) -> None:
+    """Run a single (scenario, agent) job in its own process.
+
+    Every job has its own SolutionDumper (and therefore its own run folder),
+    so jobs never share file handles or archives.
+    """
+    update_global_settings(args)
+    setup_logging()
+    SolutionDumper()
+    try:
+        solve_store(create_agent_store(base_store, agent_name, args), args.dump_interval)
+    finally:
+        SolutionDumper.instance.close()
+
+
+def collect_data_in_parallel(base_stores: list[Store], args: argparse.Namespace) -> None:
+    """Run all (scenario, agent) jobs concurrently, within the global cpu budget.
+
+    Each job runs in its own process & with as many threads as it would use
+    when running sequentially (capped to the budget, see `get_required_cores`).
+    A job is started as soon as enough of the budget is free, in the order
+    of the scenarios & agents.
+    """
+    update_global_settings(args)
+    if args.log_to_tensor_board and Settings.ARCHIVE_TENSORBOARD_LOGS:
+        from o2.util.tensorboard_helper import TensorBoardHelper
+
+        TensorBoardHelper.move_logs_to_archive_dir()
+
+    pending: list[tuple[Store, str, int, argparse.Namespace]] = []
+    for base_store in base_stores:
+        for agent_name in AGENT_TYPES:
+            if agent_name in args.agents:
+                cores = get_required_cores(agent_name, args)
+                job_args = argparse.Namespace(**{**vars(args), "max_threads": min(args.max_threads, cores)})
+                pending.append((base_store, agent_name, cores, job_args))
+
+    running: dict[int, tuple[multiprocessing.Process, str, int]] = {}
+    failed: list[str] = []
+    free_cores = args.cpu_budget
+    info(f"Running {len(pending)} jobs with a budget of {args.cpu_budget} cores")
+    while pending or running:
+        # Start all jobs that fit into the remaining budget
+        for job in list(pending):
+            base_store, agent_name, cores, job_args = job
+            if cores > free_cores:
+                continue
+            name = f"{agent_name} {base_store.name}"
+            process = multiprocessing.Process(
+                target=run_job, args=(base_store, agent_name, job_args), name=name
+            )
+            process.start()
+            running[process.sentinel] = (process, name, cores)
+            free_cores -= cores
+            pending.remove(job)
+            info(f"Started {name} ({cores} cores, {free_cores} free, {len(pending)} waiting)")
+
+        for sentinel in multiprocessing.connection.wait(list(running)):
+            process, name, cores = running.pop(sentinel)
+            process.join()
+            free_cores += cores
+            if process.exitcode != 0:
+                warn(f"Job {name} failed with exit code {process.exitcode}")
+                failed.append(name)
+            else:
+                stats(f"Finished {name}")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} jobs failed: {', '.join(failed)}")
+
+
+def load_scenario_store(scenario: str, args: argparse.Namespace) -> Store:
+    """Load the store of the given scenario with the baseline constraints."""
+    if scenario == "Demo":
+        from o2_evaluation.scenarios.demo.demo_model import demo_store
+
+        return demo_store
+
+    scenario_folder = "o2_evaluation/scenarios"
+
+    if scenario == "Purchasing":
+        timetable_path = f"{scenario_folder}/purchasing_example/purchasing_example.json"
+        bpmn_path = f"{scenario_folder}/purchasing_example/purchasing_example.bpmn"
+    elif scenario == "TwoTasks":
+        timetable_path = "examples/two_tasks_batching/two_tasks_batching.json"
+        bpmn_path = "examples/two_tasks_batching/two_tasks_batching.bpmn"
+    else:
+        timetable_path = f"{scenario_folder}/{scenario}/{scenario}.json"
+        bpmn_path = f"{scenario_folder}/{scenario}/{scenario}.bpmn"
+        # Check if the files exist
+        if not os.path.exists(timetable_path):
+            raise FileNotFoundError(f"Unknown scenario: {scenario}. Please check the scenario folder.")
+        if not os.path.exists(bpmn_path):
+            raise FileNotFoundError(f"Unknown scenario: {scenario}. Please check the scenario folder.")
+
+    info(f"Loaded Scenario {scenario}")
+
+    if args.name:
+        name = args.name
+    else:
+        name = scenario.replace("-", "_").replace(" ", "_").lower()
+
+    # Pass the cost and duration functions from CLI arguments.
+    return store_with_baseline_constraints(
+        timetable_path,
+        bpmn_path,
+        args.duration_fn,
+        args.cost_fn,
+        args.max_batch_size,
+        name,
+    )
+
+
 if __name__ == "__main__":
     # Parse CLI arguments
     args = parse_args()
@@ -358,54 +470,20 @@ if __name__ == "__main__":
 
     setup_logging()
 
-    # Initialize the solution dumper
-    SolutionDumper()
+    if args.parallel_jobs:
+        # Every job initializes its own solution dumper
+        collect_data_in_parallel(
+            [load_scenario_store(scenario, args) for scenario in args.active_scenarios], args
+        )
+        stats("All Done!")
+    else:
+        # Initialize the solution dumper
+        SolutionDumper()
 
-    # Loop over the active scenarios provided via CLI
-    for scenario in args.active_scenarios:
-        if scenario == "Demo":
-            from o2_evaluation.scenarios.demo.demo_model import demo_store
+        # Loop over the active scenarios provided via CLI
+        for scenario in args.active_scenarios:
+            store = load_scenario_store(scenario, args)
 
-            store = demo_store
-        else:
-            scenario_folder = "o2_evaluation/scenarios"
-
-            if scenario == "Purchasing":
-                timetable_path = f"{scenario_folder}/purchasing_example/purchasing_example.json"
-                bpmn_path = f"{scenario_folder}/purchasing_example/purchasing_example.bpmn"
-            elif scenario == "TwoTasks":
-                timetable_path = "examples/two_tasks_batching/two_tasks_batching.json"
-                bpmn_path = "examples/two_tasks_batching/two_tasks_batching.bpmn"
-            else:
-                timetable_path = f"{scenario_folder}/{scenario}/{scenario}.json"
-                bpmn_path = f"{scenario_folder}/{scenario}/{scenario}.bpmn"
-                # Check if the files exist
-                if not os.path.exists(timetable_path):
-                    raise FileNotFoundError(
-                        f"Unknown scenario: {scenario}. Please check the scenario folder."
-                    )
-                if not os.path.exists(bpmn_path):
-                    raise FileNotFoundError(
-                        f"Unknown scenario: {scenario}. Please check the scenario folder."
-                    )
-
-            info(f"Loaded Scenario {scenario}")
-
-            if args.name:
-                name = args.name
-            else:
-                name = scenario.replace("-", "_").replace(" ", "_").lower()
-
-            # Pass the cost and duration functions from CLI arguments.
-            store = store_with_baseline_constraints(
-                timetable_path,
-                bpmn_path,
-                args.duration_fn,
-                args.cost_fn,
-                args.max_batch_size,
-                name,
-            )
-
-        # Run the simulation/collection for the current scenario
-        collect_data_sequentially(store, args)
-        stats("All Done!")
+            # Run the simulation/collection for the current scenario
+            collect_data_sequentially(store, args)
+            stats("All Done!")
@@ -7,12 +7,19 @@ import sys
 import tempfile
 from collections import defaultdict
 from collections.abc import Generator
+from typing import TypeVar
 
 from o2.models.settings import CostType, Settings
 from o2.models.solution import Solution
 from o2.store import Store
 from o2.util.logger import debug, info, setup_logging, stats, warn
 from o2.util.solution_dumper import SolutionDumper
+from o2.util.solution_loader import (
+    SolutionRecord,
+    StoreSummary,
+    load_store_summaries,
+    stream_solution_records,
+)
 from o2_evaluation.data_analyzer import (
     create_front_from_solutions,
     filter_solutions,
@@ -41,6 +48,8 @@ LOCAL_OUTPUT_DIR = "evaluations"
 
 INCLUDE_SOLUTIONS_WITHOUT_STORE = True
 
+SolutionT = TypeVar("SolutionT", Solution, SolutionRecord)
+
 FIND_NEW_PARETO_FRONT_FILES = False
 
 
@@ -105,9 +114,9 @@ def get_stores_and_solutions():
         yield stores, solutions
 
 
-def get_duplicate_solutions(solutions: list[Solution]) -> Generator[Solution, None, None]:
+def get_duplicate_solutions(solutions: list[SolutionT]) -> Generator[SolutionT, None, None]:
     """Get the duplicate solutions from the solutions."""
-    counter: dict[int, tuple[Solution, bool]] = {}
+    counter: dict[int, tuple[SolutionT, bool]] = {}
     for solution in solutions:
         if not solution.is_valid:
             continue
@@ -124,28 +133,59 @@ def get_duplicate_solutions(solutions: list[Solution]) -> Generator[Solution, No
             counter[hash(solution)] = (solution, False)
 
 
+def get_store_summaries_and_records() -> Generator[
+    tuple[list[tuple[str, StoreSummary]], list[SolutionRecord]], None, None
+]:
+    """Get the store summaries and solution records from the local directory.
+
+    Like `get_stores_and_solutions`, but the files are read in parallel worker
+    processes, and only the scalar fields of the solutions are kept in memory.
+    """
+    analyze_stores_dir = "o2_evaluation/redumped_stores"
+    analyze_solutions_dir = "o2_evaluation/redumped_stores"
+    stores_files: defaultdict[str, list[str]] = defaultdict(list)
+    solutions_files: defaultdict[str, list[str]] = defaultdict(list)
+
+    for file in glob.glob(f"{analyze_stores_dir}/**store_*.pkl"):
+        stores_files[get_scenario_from_filename(file)].append(file)
+
+    for file in glob.glob(f"{analyze_solutions_dir}/**solutions_*.pkl"):
+        solutions_files[get_scenario_from_filename(file)].append(file)
+
+    for scenario in list(stores_files.keys()):
+        if not ("2019" in scenario.lower() or "gov" in scenario.lower() or "sepsis" in scenario.lower()):
+            continue
+
+        stores = [
+            (get_agent_from_filename(summary.file), summary)
+            for summary in load_store_summaries(stores_files[scenario])
+        ]
+        solutions = list(stream_solution_records(solutions_files[scenario]))
+
+        info(f"Loaded {len(stores)} stores and {len(solutions)} solutions")
+        yield stores, solutions
+
+
 def find_required_files() -> list[str]:
     """Find the required files for the given stores and solutions."""
     # Create a temporary directory
     required_files: list[str] = []
 
-    for stores, extra_solutions in get_stores_and_solutions():
+    for stores, extra_solutions in get_store_summaries_and_records():
         info(
             f"Start Processing of {stores[0][1].name} ({len(stores)} stores, {len(extra_solutions)} extra solutions)"
         )
 
-        extra_solutions_dict: dict[str, Solution] = {solution.id: solution for solution in extra_solutions}
+        extra_solutions_dict: dict[str, SolutionRecord] = {
+            solution.id: solution for solution in extra_solutions
+        }
         added_extra_solutions: set[tuple[str, str]] = set()
 
-        all_solutions_list: list[Solution] = list()
-        random_solutions: list[Solution] = list()
-        optimos_solutions: list[Solution] = list()
+        all_solutions_list: list[SolutionRecord] = list()
 
         for _, store in stores:
-            for solution_id, solution in store.solution_tree.solution_lookup.items():
+            for solution_id, solution in store.solution_lookup.items():
                 if solution is not None:
-                    # Add store name so we can load the evaluation and state later
-                    solution.__dict__["_store_name"] = store.name
                     all_solutions_list.append(solution)
                 elif extra_solutions_dict.get(solution_id) is not None:
                     added_extra_solutions.add((store.name, solution_id))
@@ -155,7 +195,7 @@ def find_required_files() -> list[str]:
 
         if INCLUDE_SOLUTIONS_WITHOUT_STORE:
             for solution in extra_solutions:
-                if (solution.__dict__["_store_name"], solution.id) not in added_extra_solutions:
+                if (solution.store_name, solution.id) not in added_extra_solutions:
                     all_solutions_list.append(solution)
 
         debug("Compiled all solutions")
@@ -182,12 +222,7 @@ def find_required_files() -> list[str]:
             # Add every non-dominated solution from the optimos front
             + optimos_solutions_front
             # Add every solution of all Pareto fronts from all stores
-            + [
-                solution
-                for _, store in stores
-                for front in store.pareto_fronts
-                for solution in front.solutions
-            ]
+            + [solution for _, store in stores for solution in store.pareto_front_solutions]
             # Add base solution from each store
             + [store.base_solution for _, store in stores if store.base_solution is not None]
             # Add duplicate solutions
@@ -195,7 +230,7 @@ def find_required_files() -> list[str]:
         )
 
         new_required_files = set(
-            f"evaluation_{solution.__dict__['_store_name'].replace(' ', '_').lower()}_{solution.id}.pkl"
+            f"evaluation_{solution.store_name.replace(' ', '_').lower()}_{solution.id}.pkl"
             for solution in required_solutions
         )
 
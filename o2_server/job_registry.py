@@ -0,0 +1,182 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from o2_server.server_types import JobStatus
+
+FINAL_STATUSES: tuple[JobStatus, ...] = ("completed", "cancelled", "failed")
+ACTIVE_STATUSES: tuple[JobStatus, ...] = ("pending", "running", "cancel_requested")
+
+_JOB_COLUMNS = "id, output_path, status, config_hash, request_hash, created_at, started_at, finished_at"
+
+
+@dataclass(frozen=True)
+class Job:
+    """An optimization job of the `JobRegistry`."""
+
+    id: str
+    output_path: str
+    status: JobStatus
+    config_hash: Optional[str]
+    request_hash: Optional[str]
+    """The fingerprint of the whole request (see `hash_request`)."""
+    created_at: str
+    started_at: Optional[str]
+    finished_at: Optional[str]
+
+
+class JobRegistry:
+    """A persistent registry of the optimization jobs, backed by SQLite.
+
+    Every call opens its own (short-lived) connection, so the registry can be
+    used from the server's threads, the optimization processes and multiple
+    server workers at once, and survives restarts of the server. The database
+    runs in WAL mode, so reads (e.g. status polling) don't block on writes.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the registry, creating the database if it doesn't exist."""
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    output_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    config_hash TEXT,
+                    request_hash TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+                """
+            )
+            # Registries created before the result cache don't have the request hash yet
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "request_hash" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN request_hash TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash, status)")
+
+    def add(
+        self,
+        id: str,
+        output_path: str,
+        config_hash: Optional[str] = None,
+        request_hash: Optional[str] = None,
+    ) -> None:
+        """Add a new (pending) job."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, output_path, status, config_hash, request_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (id, output_path, "pending", config_hash, request_hash, _now()),
+            )
+
+    def import_mapping(self, mapping_file: str) -> int:
+        """Import the jobs of a `mapping.json` ({id: output_path}) of older versions as completed jobs.
+
+        The finish time is taken from the output file (if it still exists). Jobs,
+        that are already in the registry, are skipped. Returns the number of imported jobs.
+        """
+        with open(mapping_file) as f:
+            content = f.read()
+        mapping: dict[str, str] = json.loads(content) if content.strip() else {}
+        rows = []
+        for id, output_path in mapping.items():
+            finished_at = (
+                datetime.datetime.fromtimestamp(os.path.getmtime(output_path)).isoformat()
+                if os.path.exists(output_path)
+                else _now()
+            )
+            rows.append((id, output_path, "completed", finished_at, finished_at))
+        with self._connect() as connection:
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO jobs (id, output_path, status, created_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return cursor.rowcount
+
+    def get(self, id: str) -> Optional[Job]:
+        """Get the job with the given id, or None if there is no such job."""
+        with self._connect() as connection:
+            row = connection.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (id,)).fetchone()
+        return None if row is None else Job(*row)
+
+    def get_completed_jobs(self, request_hash: str) -> list[Job]:
+        """Get the completed jobs for the request, the latest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE request_hash = ? AND status = 'completed' "
+                "ORDER BY finished_at DESC",
+                (request_hash,),
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+    def get_finished_jobs(self) -> list[Job]:
+        """Get all finished (completed, cancelled or failed) jobs, the oldest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status IN (?, ?, ?) ORDER BY finished_at",
+                FINAL_STATUSES,
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+    def request_cancel(self, id: str) -> bool:
+        """Ask the process of the job to cancel it, returns False if the job isn't active (anymore)."""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'cancel_requested' "
+                "WHERE id = ? AND status IN ('pending', 'running', 'cancel_requested')",
+                (id,),
+            )
+            return cursor.rowcount > 0
+
+    def is_cancel_requested(self, id: str) -> bool:
+        """Check if the cancellation of the job was requested (e.g. by another server worker)."""
+        job = self.get(id)
+        return job is not None and job.status == "cancel_requested"
+
+    def set_status(self, id: str, status: JobStatus) -> None:
+        """Update the status of the job (also setting its start or finish time).
+
+        Only pending jobs are set to running, so a cancellation requested before
+        the job started isn't lost.
+        """
+        with self._connect() as connection:
+            if status == "running":
+                connection.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = 'pending'",
+                    (status, _now(), id),
+                )
+            elif status in FINAL_STATUSES:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (status, _now(), id)
+                )
+            else:
+                connection.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, id))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Commit (or rollback) the transaction & close the connection afterwards
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            yield connection
+
+
+def hash_config(config: Any) -> str:  # noqa: ANN401
+    """Hash the config of a request (independent of the order of its keys)."""
+    content = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
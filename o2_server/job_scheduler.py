@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from o2_server.optimos_service import OptimosService
+from o2_server.server_types import ProcessingRequest
+
+
+@dataclass(order=True)
+class QueuedJob:
+    """A job waiting in the queue of the `JobScheduler`."""
+
+    sort_key: tuple[int, int]
+    """(-priority, sequence number), so higher priorities & older jobs come first."""
+    service: OptimosService = field(compare=False)
+    request: ProcessingRequest = field(compare=False)
+    cores: int = field(compare=False)
+
+
+@dataclass
+class RunningJob:
+    """A job currently running in its own process."""
+
+    service: OptimosService
+    process: multiprocessing.Process
+    cores: int
+
+
+class JobScheduler:
+    """Runs optimization jobs within a global cpu budget.
+
+    Every job gets a core quota, which is the number of simulation workers
+    it may use. Jobs are admitted from a priority queue (higher priority
+    first, then first come first served) as long as the sum of the quotas of
+    the running jobs stays within the budget, so the machine is never
+    oversubscribed, no matter how many jobs are submitted.
+
+    The queue is processed in strict order: If the next job doesn't fit into
+    the remaining budget, no later (smaller) job is started before it, so big
+    jobs can't be starved.
+    """
+
+    def __init__(self, cpu_budget: int, default_cores_per_job: Optional[int] = None) -> None:
+        """Initialize the scheduler (the dispatcher thread is started on the first submit)."""
+        self.cpu_budget = max(1, cpu_budget)
+        self.default_cores_per_job = min(default_cores_per_job or self.cpu_budget, self.cpu_budget)
+        self.free_cores = self.cpu_budget
+
+        self._queue: list[QueuedJob] = []
+        self._running: dict[str, RunningJob] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        service: OptimosService,
+        request: ProcessingRequest,
+        priority: int = 0,
+        cores: Optional[int] = None,
+    ) -> None:
+        """Add the job to the queue (it's started as soon as its quota fits into the budget)."""
+        cores = max(1, min(cores or self.default_cores_per_job, self.cpu_budget))
+        with self._lock:
+            heapq.heappush(
+                self._queue,
+                QueuedJob((-priority, next(self._sequence)), service, request, cores),
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="o2-job-scheduler", daemon=True)
+                self._thread.start()
+        self._wakeup()
+
+    def get_queue_position(self, id: str) -> Optional[int]:
+        """Get the (0-based) position of the job in the queue, or None if it's not queued."""
+        with self._lock:
+            for position, job in enumerate(sorted(self._queue)):
+                if job.service.id == id:
+                    return position
+        return None
+
+    def get_cores(self, id: str) -> Optional[int]:
+        """Get the core quota of a queued or running job."""
+        with self._lock:
+            if id in self._running:
+                return self._running[id].cores
+            for job in self._queue:
+                if job.service.id == id:
+                    return job.cores
+        return None
+
+    def cancel(self, id: str) -> bool:
+        """Remove the job from the queue, returns False if it's not queued (anymore)."""
+        with self._lock:
+            for job in self._queue:
+                if job.service.id == id:
+                    self._queue.remove(job)
+                    heapq.heapify(self._queue)
+                    break
+            else:
+                return False
+        # The budget of the job might allow a smaller job to start now
+        self._wakeup()
+        return True
+
+    def _wakeup(self) -> None:
+        self._wakeup_writer.send(None)
+
+    def _run(self) -> None:
+        while True:
+            self._start_jobs()
+            with self._lock:
+                sentinels = {job.process.sentinel: id for id, job in self._running.items()}
+            ready = multiprocessing.connection.wait([self._wakeup_reader, *sentinels])
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv()
+            with self._lock:
+                for sentinel in ready:
+                    if sentinel is self._wakeup_reader:
+                        continue
+                    job = self._running.pop(sentinels[sentinel])
+                    job.process.join()
+                    self.free_cores += job.cores
+                    if job.process.exitcode != 0:
+                        print(f"Job {job.service.id} failed with exit code {job.process.exitcode}")
+                        # Make sure the job isn't reported as running forever
+                        job.service.mark_failed()
+
+    def _start_jobs(self) -> None:
+        with self._lock:
+            while self._queue and self._queue[0].cores <= self.free_cores:
+                job = heapq.heappop(self._queue)
+                process = multiprocessing.Process(
+                    target=job.service.process,
+                    args=(job.request, job.cores),
+                    name=f"optimos-{job.service.id}",
+                )
+                process.start()
+                self._running[job.service.id] = RunningJob(job.service, process, job.cores)
+                self.free_cores -= job.cores
+                print(f"Started job {job.service.id} with {job.cores} cores ({self.free_cores} cores free)")
@@ -1,20 +1,23 @@
 import datetime
 import os
+import time
 import traceback
 import uuid
 from pprint import pprint
+from queue import Queue
 from tempfile import mkstemp
-from threading import Event
+from typing import Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
-from o2.models.json_report import JSONReport
+from o2.models.json_report import IncrementalJSONReport, JSONReport
 from o2.models.legacy_approach import LegacyApproach
 from o2.models.settings import Settings
 from o2.models.state import State
 from o2.optimizer import Optimizer
 from o2.store import Store
 from o2.util.logger import setup_logging
-from o2_server.server_types import ProcessingRequest
+from o2_server.job_registry import JobRegistry
+from o2_server.server_types import JobStatus, ProcessingRequest, ProgressEvent
 
 
 class OptimosService:
@@ -23,27 +26,51 @@ class OptimosService:
     This service is responsible for running the Optimos optimization.
     """
 
-    def __init__(self, cancelled: Event, running: Event, stopped: Event) -> None:
-        """Initialize the OptimosService with synchronization events.
+    def __init__(
+        self,
+        progress_queue: "Optional[Queue[Optional[ProgressEvent]]]" = None,
+        registry: Optional[JobRegistry] = None,
+    ) -> None:
+        """Initialize the OptimosService.
 
         Args:
-            cancelled: Event to signal that the optimization process should be cancelled
-            running: Event to signal that the optimization process is running
-            stopped: Event to signal that the optimization process has stopped
+            progress_queue: Queue to publish a summary of every iteration to (see `ProgressBroker`)
+            registry: The registry to keep the status of the job up to date in, it's also
+                polled for cancellation requests (see `JobRegistry.request_cancel`)
 
         """
-        self.cancelled = cancelled
-        self.running = running
-        self.stopped = stopped
+        self.progress_queue = progress_queue
+        self.registry = registry
 
         self.id = str(uuid.uuid4())
         self.last_update = datetime.datetime.now()
         output_file, self.output_path = mkstemp(suffix=".zip", prefix="optimos_output_")
         os.fdopen(output_file).close()
+        self.delta_path = OptimosService.get_delta_path(self.output_path)
 
-    def process(self, request: ProcessingRequest) -> None:
-        """Process the optimization request."""
-        self.running.set()
+    @staticmethod
+    def get_delta_path(output_path: str) -> str:
+        """Get the path of the report deltas, that are written while the optimization is running.
+
+        The (zipped) full report is only written once the optimization has finished.
+        """
+        return os.path.splitext(output_path)[0] + ".deltas.jsonl"
+
+    def process(self, request: ProcessingRequest, max_threads: Optional[int] = None) -> None:
+        """Process the optimization request.
+
+        Args:
+            request: The optimization request
+            max_threads: The number of simulation workers the job may use (its core quota),
+                defaults to all but one cpu core
+
+        """
+        if self.is_cancel_requested():
+            # Cancelled while it was queued (e.g. through another server worker)
+            print("Optimization Cancelled before it started!")
+            self.set_status("cancelled")
+            return
+        self.set_status("running")
 
         log_file_name = f"optimos_server_{self.id}.log"
         Settings.LOG_FILE = log_file_name
@@ -108,7 +135,7 @@ class OptimosService:
         Settings.OVERWRITE_EXISTING_SOLUTION_ARCHIVES = False
 
         # Keep one cpu core free for other processes (e.g. web request handling)
-        Settings.MAX_THREADS_ACTION_EVALUATION = max(1, (os.cpu_count() or 1) - 1)
+        Settings.MAX_THREADS_ACTION_EVALUATION = max_threads or max(1, (os.cpu_count() or 1) - 1)
 
         store.settings.optimos_legacy_mode = config["mode"] == "timetable"
         store.settings.batching_only = config["mode"] == "batching"
@@ -126,15 +153,21 @@ class OptimosService:
         store.settings.max_non_improving_actions = config["max_non_improving_actions"]
         store.settings.agent = config["agent"]
 
+        self.report = IncrementalJSONReport()
+        self.iteration = 0
+        self.start_time = self.last_iteration_time = time.monotonic()
+
         # Upload initial evaluation
         self.iteration_callback(store)
 
         optimizer = Optimizer(store)
         generator = optimizer.get_iteration_generator()
 
+        cancelled = False
         for _ in generator:
-            if self.cancelled.is_set():
+            if self.is_cancel_requested():
                 print("Optimization Cancelled!")
+                cancelled = True
                 break
 
             self.iteration_callback(store)
@@ -143,19 +176,61 @@ class OptimosService:
             store,
             last_iteration=True,
         )
-        print("Setting stopped to True")
-        self.stopped.set()
-        self.running.clear()
+        # The (partial) results of cancelled jobs are not reused by the result cache
+        self.set_status("cancelled" if cancelled else "completed")
+
+    def set_status(self, status: JobStatus) -> None:
+        """Update the status of the job in the registry (if any)."""
+        if self.registry is not None:
+            self.registry.set_status(self.id, status)
+
+    def is_cancel_requested(self) -> bool:
+        """Check if the job should be cancelled (see `JobRegistry.request_cancel`)."""
+        return self.registry is not None and self.registry.is_cancel_requested(self.id)
+
+    def mark_failed(self) -> None:
+        """Mark the job as failed, e.g. if its process crashed."""
+        self.set_status("failed")
 
     def iteration_callback(self, store: Store, last_iteration: bool = False) -> None:
-        """Write Iteration to file."""
-        try:
-            json_solutions = JSONReport.from_store(store, is_final=last_iteration)
-            json_content = json_solutions.model_dump_json()
-            # Replace Infinity and NaN with their String representation
+        """Write Iteration to file.
 
-            with ZipFile(self.output_path, "w", compression=ZIP_DEFLATED) as zipf:
-                zipf.writestr("result.json", json_content)
+        Every iteration only appends the changes of the report (a line of the
+        delta file), the full report is written once, after the last iteration.
+        """
+        try:
+            delta = self.report.get_delta(store, is_final=last_iteration)
+            with open(self.delta_path, "ab") as f:
+                f.write(delta.model_dump_json().encode() + b"\n")
+
+            if last_iteration:
+                json_solutions = JSONReport.from_store(store, is_final=True)
+                json_content = json_solutions.model_dump_json()
+
+                with ZipFile(self.output_path, "w", compression=ZIP_DEFLATED) as zipf:
+                    zipf.writestr("result.json", json_content)
+
+            if self.progress_queue is not None:
+                now = time.monotonic()
+                self.progress_queue.put(
+                    ProgressEvent(
+                        id=self.id,
+                        iteration=self.iteration,
+                        iteration_time=now - self.last_iteration_time,
+                        elapsed_time=now - self.start_time,
+                        solutions_explored=store.solution_tree.total_solutions,
+                        solutions_discarded=store.solution_tree.discarded_solutions,
+                        number_of_fronts=len(store.pareto_fronts),
+                        pareto_front=[
+                            {"id": solution.id, "pareto_x": solution.pareto_x, "pareto_y": solution.pareto_y}
+                            for solution in store.current_pareto_front.solutions
+                        ],
+                        new_solutions=list(delta.solutions),
+                        is_final=last_iteration,
+                    )
+                )
+                self.last_iteration_time = now
+            self.iteration += 1
         except Exception as e:
             print(f"Error writing iteration callback: {e}")
             print(traceback.format_exc())
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+from queue import Queue
+from typing import Optional
+
+from o2_server.server_types import ProgressEvent
+
+
+class ProgressBroker:
+    """Forwards the progress events of the optimization processes to subscribed clients.
+
+    The optimization processes publish their events to a single (manager)
+    queue, which is read by a thread of the server, and fanned out to the
+    asyncio queues of the subscribers of the respective job. The last event
+    of every running job is kept, so new subscribers immediately get the
+    current state. It's dropped after the final event of the job (later
+    subscribers get the final status from the registry instead), or by `prune`.
+    """
+
+    def __init__(self, queue: "Queue[Optional[ProgressEvent]]") -> None:
+        """Initialize the broker (the reader thread is started on the first subscription)."""
+        self.queue = queue
+        self._subscribers: dict[str, set[asyncio.Queue[ProgressEvent]]] = defaultdict(set)
+        self._last_events: dict[str, ProgressEvent] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def subscribe(
+        self, id: str, keepalive: Optional[float] = None
+    ) -> AsyncIterator[Optional[ProgressEvent]]:
+        """Iterate over the progress events of the job, until the final event.
+
+        If `keepalive` is set, None is yielded whenever there was no event for
+        that many seconds.
+        """
+        self._start(asyncio.get_running_loop())
+        queue: asyncio.Queue[ProgressEvent] = asyncio.Queue()
+        with self._lock:
+            self._subscribers[id].add(queue)
+            last_event = self._last_events.get(id)
+        try:
+            if last_event is not None:
+                yield last_event
+                if last_event["is_final"]:
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["is_final"]:
+                    return
+        finally:
+            with self._lock:
+                self._subscribers[id].discard(queue)
+                if not self._subscribers[id]:
+                    del self._subscribers[id]
+
+    def prune(self, is_active: Callable[[str], bool]) -> None:
+        """Drop the last events of the jobs, that aren't active anymore.
+
+        E.g. jobs that crashed, and thereby never sent their final event.
+        """
+        with self._lock:
+            ids = list(self._last_events)
+        inactive_ids = [id for id in ids if not is_active(id)]
+        with self._lock:
+            for id in inactive_ids:
+                self._last_events.pop(id, None)
+
+    def _start(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = loop
+            self._thread = threading.Thread(target=self._run, name="o2-progress-broker", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        assert self._loop is not None
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            with self._lock:
+                if event["is_final"]:
+                    self._last_events.pop(event["id"], None)
+                else:
+                    self._last_events[event["id"]] = event
+                subscribers = list(self._subscribers.get(event["id"], ()))
+            for subscriber in subscribers:
+                self._loop.call_soon_threadsafe(subscriber.put_nowait, event)
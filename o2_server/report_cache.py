@@ -0,0 +1,51 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    """A serialized report, with the ETag of the file it was read from."""
+
+    etag: str
+    content: bytes
+
+
+class ReportCache:
+    """LRU cache of serialized reports by job id.
+
+    An entry is valid as long as the report file it was read from is
+    unchanged (same mtime & size), so polling a report, that didn't change
+    since the last request, neither reads nor parses any file.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        """Initialize the cache, keeping at most `max_entries` reports in memory."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedReport] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_etag(path: str) -> str:
+        """Get the ETag of a report file (based on its mtime & size)."""
+        stat = os.stat(path)
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def get(self, id: str, path: str, load: Callable[[], bytes]) -> CachedReport:
+        """Get the report of the job, calling `load` if the report file changed since it was cached."""
+        etag = ReportCache.get_etag(path)
+        with self._lock:
+            entry = self._entries.get(id)
+            if entry is not None and entry.etag == etag:
+                self._entries.move_to_end(id)
+                return entry
+
+        entry = CachedReport(etag, load())
+        with self._lock:
+            self._entries[id] = entry
+            self._entries.move_to_end(id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
@@ -0,0 +1,86 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+
+from o2_server.job_registry import Job, JobRegistry
+from o2_server.optimos_service import OptimosService
+from o2_server.server_types import ProcessingRequest
+
+
+def normalize_bpmn(bpmn_model: str) -> str:
+    """Normalize the formatting of a bpmn model (whitespace between tags & line endings)."""
+    return re.sub(r">\s+<", "><", bpmn_model.strip().replace("\r\n", "\n"))
+
+
+def hash_request(request: ProcessingRequest) -> str:
+    """Fingerprint the request, so identical requests can be served from the same result.
+
+    The bpmn model is normalized, and the timetable, constraints & config are
+    hashed independent of the order of their keys.
+    """
+    content = json.dumps(
+        {
+            "bpmn_model": normalize_bpmn(request["bpmn_model"]),
+            "timetable": request["timetable"].to_dict(),
+            "constraints": request["constraints"].to_dict(),
+            "config": request["config"],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ResultCache:
+    """Serves identical optimization requests from the results of earlier jobs.
+
+    The results are the output files of the finished jobs in the `JobRegistry`.
+    `prune` removes the outputs that are older than the retention period, and
+    the oldest ones, while the outputs take up more than `max_bytes`. The jobs
+    are kept in the registry as "expired", so their ids aren't reported as unknown.
+    """
+
+    def __init__(self, registry: JobRegistry, retention: datetime.timedelta, max_bytes: int) -> None:
+        """Initialize the cache."""
+        self.registry = registry
+        self.retention = retention
+        self.max_bytes = max_bytes
+
+    def get(self, request_hash: str) -> Optional[Job]:
+        """Get the latest completed job for the request, whose result is still available."""
+        for job in self.registry.get_completed_jobs(request_hash):
+            if os.path.exists(job.output_path) and os.path.getsize(job.output_path) > 0:
+                return job
+        return None
+
+    def prune(self) -> None:
+        """Remove the outputs of finished jobs, according to the retention policy & size limit."""
+        expires_at = (datetime.datetime.now() - self.retention).isoformat()
+        jobs = self.registry.get_finished_jobs()
+        sizes = {job.id: _get_output_size(job) for job in jobs}
+        total_size = sum(sizes.values())
+        for job in jobs:
+            if job.finished_at is not None and job.finished_at >= expires_at and total_size <= self.max_bytes:
+                # Jobs are sorted by their finish time, so all following jobs are kept as well
+                break
+            _remove_output(job)
+            self.registry.set_status(job.id, "expired")
+            total_size -= sizes[job.id]
+            print(f"Removed result of job {job.id} (finished at {job.finished_at})")
+
+
+def _get_output_files(job: Job) -> list[str]:
+    return [job.output_path, OptimosService.get_delta_path(job.output_path)]
+
+
+def _get_output_size(job: Job) -> int:
+    return sum(os.path.getsize(file) for file in _get_output_files(job) if os.path.exists(file))
+
+
+def _remove_output(job: Job) -> None:
+    for file in _get_output_files(job):
+        if os.path.exists(file):
+            os.remove(file)
@@ -1,20 +1,27 @@
 import asyncio
-import json
+import contextlib
+import datetime
+import io
 import multiprocessing
 import os
 import zipfile
-from concurrent.futures import ProcessPoolExecutor
-from threading import Lock
+from collections.abc import AsyncIterator
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Path
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Path, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, ORJSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from typing_extensions import TypedDict
 
 from o2.models.json_report import JSONReport
+from o2_server.job_registry import ACTIVE_STATUSES, JobRegistry, hash_config
+from o2_server.job_scheduler import JobScheduler
 from o2_server.optimos_service import OptimosService
-from o2_server.server_types import ProcessingRequest
+from o2_server.progress import ProgressBroker
+from o2_server.report_cache import CachedReport, ReportCache
+from o2_server.result_cache import ResultCache, hash_request
+from o2_server.server_types import JobStatus, ProcessingRequest
 
 tags_metadata = [
     {
@@ -55,11 +62,32 @@ app.add_middleware(
 TMP_DIR = "tmp"
 os.makedirs(TMP_DIR, exist_ok=True)
 
-# File for persisting the hash to path and timestamp mapping
-MAPPING_FILE = "mapping.json"
+# SQLite database of all optimization jobs (ids, output paths, status, timestamps)
+JOB_REGISTRY_FILE = os.environ.get("OPTIMOS_JOB_REGISTRY", "jobs.sqlite3")
 
-# Lock for making file operations thread-safe
-file_lock = Lock()
+# Job mapping ({id: output path}) of older versions, imported into the registry on the first start
+LEGACY_MAPPING_FILE = "mapping.json"
+
+# Number of days the results of finished jobs are kept (and reused for identical requests)
+RESULT_RETENTION_DAYS = float(os.environ.get("OPTIMOS_RESULT_RETENTION_DAYS", 30))
+
+# Maximum size of the results of all finished jobs, the oldest results are removed first
+RESULT_MAX_BYTES = int(os.environ.get("OPTIMOS_RESULT_MAX_BYTES", 5 * 1024**3))
+
+# Number of cpu cores shared by all optimization jobs
+# (by default we keep one core free for other processes, e.g. web request handling)
+CPU_BUDGET = int(os.environ.get("OPTIMOS_CPU_BUDGET", max(1, (os.cpu_count() or 1) - 1)))
+
+# Number of optimization jobs, that run concurrently with the default core quota
+DEFAULT_CONCURRENT_JOBS = 5
+
+# Default number of cores (simulation workers) a single job may use
+# (by default the budget is split between DEFAULT_CONCURRENT_JOBS jobs, like the former fixed pool of 5 jobs)
+# NOTE: So a lone job only uses a fifth of the cores, set it to the budget if jobs mostly run alone
+CORES_PER_JOB = int(os.environ.get("OPTIMOS_CORES_PER_JOB", max(1, CPU_BUDGET // DEFAULT_CONCURRENT_JOBS)))
+
+# Seconds after which a keepalive comment is sent to idle progress streams
+PROGRESS_KEEPALIVE = 15
 
 
 class OptimizationResponse(TypedDict):
@@ -80,27 +108,54 @@ class CancelResponse(TypedDict):
     """Status message about the cancellation request"""
 
 
-services: dict[str, OptimosService] = {}
-
 manager = multiprocessing.Manager()
-executor = ProcessPoolExecutor(max_workers=5)
+registry = JobRegistry(JOB_REGISTRY_FILE)
+# (If there are multiple server workers, the first one imports & renames the file)
+with contextlib.suppress(FileNotFoundError):
+    registry.import_mapping(LEGACY_MAPPING_FILE)
+    # Keep the file as a backup, but don't import it again (e.g. after its results were pruned)
+    os.replace(LEGACY_MAPPING_FILE, f"{LEGACY_MAPPING_FILE}.imported")
+result_cache = ResultCache(registry, datetime.timedelta(days=RESULT_RETENTION_DAYS), RESULT_MAX_BYTES)
+scheduler = JobScheduler(CPU_BUDGET, CORES_PER_JOB)
+progress_broker = ProgressBroker(manager.Queue())
+report_cache = ReportCache()
 
 
 @app.post("/start_optimization", status_code=202, tags=["optimization"])
-async def start_optimization(data: "ProcessingRequest") -> OptimizationResponse:
+async def start_optimization(
+    data: "ProcessingRequest",
+    priority: int = Query(0, description="Jobs with a higher priority are started first"),
+    cores: Optional[int] = Query(
+        None, description="Number of cpu cores the job may use (default: OPTIMOS_CORES_PER_JOB)", ge=1
+    ),
+    use_cache: bool = Query(True, description="Return the result of an earlier, identical request"),
+) -> OptimizationResponse:
     """Start an optimization process.
 
-    Return a JSON file containing the optimization results.
+    The job is queued, and started as soon as its cores fit into the cpu budget
+    of the server. Return a JSON file containing the optimization results.
+
+    If an identical request was completed before (and its result wasn't
+    removed yet), the id of that job is returned instead of starting a new one.
     """
     try:
-        cancelled = manager.Event()
-        running = manager.Event()
-        stopped = manager.Event()
-        optimos_service = OptimosService(cancelled, running, stopped)
-        save_mapping(optimos_service.id, optimos_service.output_path)
-        services[optimos_service.id] = optimos_service
-
-        executor.submit(optimos_service.process, data)
+        result_cache.prune()
+        progress_broker.prune(is_job_active)
+        request_hash = hash_request(data)
+        cached_job = result_cache.get(request_hash) if use_cache else None
+        if cached_job is not None:
+            return {
+                "message": "Optimization result found in cache",
+                "json_url": f"/get_json/{cached_job.id}",
+                "id": cached_job.id,
+            }
+
+        optimos_service = OptimosService(progress_broker.queue, registry)
+        registry.add(
+            optimos_service.id, optimos_service.output_path, hash_config(data["config"]), request_hash
+        )
+
+        scheduler.submit(optimos_service, data, priority=priority, cores=cores)
 
         # Wait a bit for the optimization to start
         await asyncio.sleep(1)
@@ -120,20 +175,28 @@ async def start_optimization(data: "ProcessingRequest") -> OptimizationResponse:
     responses={
         200: {"description": "Report zip file retrieved"},
         404: {"description": "File not found"},
+        410: {"description": "The result expired (see OPTIMOS_RESULT_RETENTION_DAYS)"},
     },
     tags=["reports"],
 )
 async def get_report_zip_file(
     id: str = Path(..., description="The identifier of the zip file"),
-) -> FileResponse:
-    """Return a JSON file from the file system based on the given id."""
-    zip = get_mapping(id)
-    if zip is None:
-        raise HTTPException(status_code=404, detail="File not found")
+) -> Response:
+    """Return a JSON file from the file system based on the given id.
 
+    While the optimization is running, the zip is created from the current report deltas.
+    """
+    zip = get_output_path(id)
     if not os.path.exists(zip):
         raise HTTPException(status_code=404, detail="File not found")
 
+    if os.path.getsize(zip) == 0 and os.path.exists(OptimosService.get_delta_path(zip)):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr("result.json", get_cached_report(id, zip).content)
+        buffer.seek(0)
+        return StreamingResponse(buffer, media_type="application/zip")
+
     return FileResponse(path=zip, media_type="application/zip")
 
 
@@ -142,86 +205,187 @@ async def get_report_zip_file(
     responses={
         200: {"description": "Report zip file retrieved"},
         404: {"description": "File not found"},
+        410: {"description": "The result expired (see OPTIMOS_RESULT_RETENTION_DAYS)"},
     },
     tags=["reports"],
     response_model=JSONReport,
 )
 async def get_report_file(
     id: str = Path(..., description="The identifier of the zip file"),
-) -> JSONReport:
-    """Return a JSON file from the file system based on the given id."""
-    zip = get_mapping(id)
-    if zip is None:
-        raise HTTPException(status_code=404, detail="File not found")
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """Return a JSON file from the file system based on the given id.
 
+    While the optimization is running, the report is assembled from the current report deltas.
+    The report is returned with an ETag; if it matches the `If-None-Match` header,
+    304 (Not Modified) is returned instead.
+    """
+    zip = get_output_path(id)
     if not os.path.exists(zip):
         raise HTTPException(status_code=404, detail="File not found")
 
-    # Get file size, and throw error if empty
-    file_size = os.path.getsize(zip)
-    if file_size == 0:
-        raise HTTPException(status_code=404, detail="File is empty (no results yet)")
+    headers = {"Cache-Control": "no-cache"}
+    if if_none_match is not None:
+        etag = ReportCache.get_etag(get_report_path(zip))
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers={**headers, "ETag": etag})
 
-    # Unzip into memory, return first (only) file content
-    with zipfile.ZipFile(zip) as z, z.open(z.namelist()[0]) as f:
-        data = f.read()
-        report = JSONReport.model_validate_json(data)
-        if not isinstance(report, JSONReport):
-            raise HTTPException(status_code=500, detail="Invalid JSON file")
+    report = get_cached_report(id, zip)
+    return Response(
+        content=report.content,
+        media_type="application/json",
+        headers={**headers, "ETag": report.etag},
+    )
+
+
+@app.get(
+    "/progress/{id}",
+    responses={
+        200: {"description": "Stream of progress events", "content": {"text/event-stream": {}}},
+        404: {"description": "Optimization not found"},
+    },
+    tags=["optimization"],
+    response_class=StreamingResponse,
+)
+async def get_progress(id: str) -> StreamingResponse:
+    """Stream the progress of the optimization process as server-sent events.
+
+    After every iteration a `progress` event with a summary of the iteration
+    (see `ProgressEvent`) is sent, starting with the latest one. The stream
+    ends after the final iteration. If the job isn't running (anymore), e.g.
+    it finished before, or its final event was missed, a `status` event with
+    its status (see `/status/{id}`) is sent instead, and the stream ends.
+    """
+    job = registry.get(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Optimization not found")
 
-        return report
+    def status_event(status: JobStatus) -> bytes:
+        return b"event: status\ndata: " + orjson.dumps(status) + b"\n\n"
+
+    async def event_stream() -> AsyncIterator[bytes]:
+        if job.status not in ACTIVE_STATUSES:
+            yield status_event(job.status)
+            return
+        async for event in progress_broker.subscribe(id, keepalive=PROGRESS_KEEPALIVE):
+            if event is None:
+                # Jobs that were cancelled before they started, crashed or run on another
+                # server worker don't send a final event (to this worker)
+                current_job = registry.get(id)
+                if current_job is None or current_job.status not in ACTIVE_STATUSES:
+                    if current_job is not None:
+                        yield status_event(current_job.status)
+                    return
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: progress\ndata: " + orjson.dumps(event) + b"\n\n"
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
 
 
 @app.post("/cancel_optimization/{id}", status_code=202, tags=["optimization"])
 async def cancel_optimization(id: str) -> CancelResponse:
-    """Cancel an ongoing optimization process."""
-    if id not in services:
+    """Cancel an ongoing optimization process.
+
+    The cancellation is requested through the registry, so it also works for
+    jobs of other server workers; the job's process stops after its current iteration.
+    """
+    job = registry.get(id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Optimization not found")
 
-    services[id].cancelled.set()
+    if not registry.request_cancel(id):
+        return {"message": f"Optimization already {job.status}"}
+    # Jobs that are still queued (in this worker) are never started
+    if scheduler.cancel(id):
+        registry.set_status(id, "cancelled")
 
     return {"message": "Optimization cancelled"}
 
 
-@app.get("/status/{id}", tags=["optimization"])
-async def get_status(id: str) -> str:
-    """Return the status of the optimization process."""
-    if id not in services:
-        mapping = get_mapping(id)
-        if mapping is None:
-            raise HTTPException(status_code=404, detail="Optimization not found")
-        else:
-            return "completed"
-
-    if services[id].stopped.is_set():
-        return "completed"
-    if services[id].running.is_set():
-        return "running"
-    elif services[id].cancelled.is_set():
-        return "cancelled"
-    return "pending"
-
-
-def save_mapping(id: str, path: str) -> None:
-    """Save the mappings to a file with thread safety."""
-    with file_lock, open(MAPPING_FILE, "w+") as f:
-        content = f.read()
-
-        # Check if the content is empty or only contains whitespace
-        current = json.load(f) if content.strip() else {}
-        current[id] = path
-        f.seek(0)
-        json.dump(current, f)
-
-
-def get_mapping(id: str) -> Optional[str]:
-    """Retrieve the path from the mappings."""
-    if not os.path.exists(MAPPING_FILE):
-        return None
-
-    with file_lock, open(MAPPING_FILE) as f:
-        current = json.load(f)
-        return current.get(id, None)
+@app.get(
+    "/status/{id}",
+    responses={
+        404: {"description": "Optimization not found"},
+        410: {"description": "The result expired (see OPTIMOS_RESULT_RETENTION_DAYS)"},
+    },
+    tags=["optimization"],
+)
+async def get_status(id: str, response: Response) -> JobStatus:
+    """Return the status of the optimization process.
+
+    For queued ("pending") jobs, the (0-based) position in the queue is
+    returned in the `X-Queue-Position` header. Jobs whose process crashed
+    are "failed". If the result of the job was removed, 410 (Gone) is returned.
+    """
+    job = registry.get(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Optimization not found")
+    if job.status == "expired":
+        raise HTTPException(status_code=410, detail="The result of the optimization expired")
+
+    if job.status == "pending":
+        queue_position = scheduler.get_queue_position(id)
+        if queue_position is not None:
+            response.headers["X-Queue-Position"] = str(queue_position)
+    return job.status
+
+
+def get_report_path(zip: str) -> str:
+    """Get the file the report is read from: The zip, or the deltas of a running optimization."""
+    if os.path.getsize(zip) > 0:
+        return zip
+    delta_path = OptimosService.get_delta_path(zip)
+    if not os.path.exists(delta_path) or os.path.getsize(delta_path) == 0:
+        raise HTTPException(status_code=404, detail="File is empty (no results yet)")
+    return delta_path
+
+
+def read_report_json(path: str) -> bytes:
+    """Read the (JSON encoded) report from the zip or assemble it from the deltas.
+
+    The report in the zip was written by the `OptimosService`, so it's
+    passed through as is, without validating it again.
+    """
+    if path.endswith(".zip"):
+        # Unzip into memory, return first (only) file content
+        with zipfile.ZipFile(path) as z, z.open(z.namelist()[0]) as f:
+            return f.read()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    # Ignore a trailing, incomplete line (it's currently being written)
+    deltas = data[: data.rfind(b"\n") + 1].splitlines()
+    if not deltas:
+        raise HTTPException(status_code=404, detail="File is empty (no results yet)")
+    return JSONReport.from_deltas(deltas).model_dump_json().encode()
+
+
+def get_cached_report(id: str, zip: str) -> CachedReport:
+    """Get the report of the job, it's only read again if the report file changed."""
+    path = get_report_path(zip)
+    return report_cache.get(id, path, lambda: read_report_json(path))
+
+
+def is_job_active(id: str) -> bool:
+    """Check if the job is still queued or running."""
+    job = registry.get(id)
+    return job is not None and job.status in ACTIVE_STATUSES
+
+
+def get_output_path(id: str) -> str:
+    """Retrieve the output path of the job from the registry.
+
+    Raises 404 for unknown jobs and 410 (Gone) if the result of the job expired.
+    """
+    job = registry.get(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    if job.status == "expired":
+        raise HTTPException(status_code=410, detail="The result of the optimization expired")
+    return job.output_path
 
 
 def start() -> None:
@@ -9,6 +9,8 @@ from o2.models.legacy_approach import LegacyApproachAbbreviation
 from o2.models.settings import ActionVariationSelection, AgentType, CostType
 from o2.models.timetable import TimetableType
 
+JobStatus = Literal["pending", "running", "cancel_requested", "completed", "cancelled", "failed", "expired"]
+
 
 class ConfigType(TypedDict):
     """Configuration parameters for the optimization task."""
@@ -44,3 +46,31 @@ class ProcessingRequest(TypedDict):
         populate_by_name=True,
         from_attributes=True,
     )  # type: ignore
+
+
+class ProgressPoint(TypedDict):
+    """A solution of the current pareto front."""
+
+    id: str
+    pareto_x: float
+    pareto_y: float
+
+
+class ProgressEvent(TypedDict):
+    """A summary of an optimization iteration, as streamed by the /progress/{id} endpoint."""
+
+    id: str
+    """The identifier of the optimization process"""
+    iteration: int
+    iteration_time: float
+    """Seconds since the previous event"""
+    elapsed_time: float
+    """Seconds since the start of the optimization"""
+    solutions_explored: int
+    solutions_discarded: int
+    number_of_fronts: int
+    pareto_front: list[ProgressPoint]
+    """The solutions of the current pareto front"""
+    new_solutions: list[str]
+    """The ids of the solutions, that were added to the pareto fronts since the previous event"""
+    is_final: bool
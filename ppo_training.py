@@ -1,11 +1,12 @@
 # Initialize the PPO agent
+import argparse
 import json
+import os
 import warnings
 from datetime import datetime
 from math import ceil
 from xml.etree import ElementTree
 
-import gymnasium as gym
 from sb3_contrib import MaskablePPO
 from stable_baselines3.common.callbacks import CheckpointCallback
 
@@ -22,7 +23,26 @@ warnings.filterwarnings(
 )
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Train the PPO model.")
+    parser.add_argument(
+        "--n-envs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of environments with parallel rollouts, each in its own process (default: cpu_count)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the model & environments (environment i is seeded with seed + i)",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
     timetable_path = "examples/demo_legacy/timetable.json"
     constraints_path = "examples/demo_legacy/constraints.json"
     bpmn_path = "examples/demo_legacy/model.bpmn"
@@ -49,16 +69,17 @@ def main() -> None:
 
     STEPS_PER_ITERATION = 50
 
-    env: gym.Env = PPOEnv(store, max_steps=STEPS_PER_ITERATION)
+    env = PPOEnv.make_vec_env(store, args.n_envs, max_steps=STEPS_PER_ITERATION, seed=args.seed)
     model = MaskablePPO(
         "MultiInputPolicy",
         env,
         verbose=1,
+        seed=args.seed,
         # tensorboard_log="./logs/progress_tensorboard/",
         clip_range=0.2,
         # TODO make learning rate smarter
         # learning_rate=linear_schedule(3e-4),
-        n_steps=1 * STEPS_PER_ITERATION,  #  Multiple of 50
+        n_steps=1 * STEPS_PER_ITERATION,  #  Multiple of 50 (per environment)
         batch_size=round(0.5 * STEPS_PER_ITERATION),  # Divisor of 50
         gamma=1,
     )  # type: ignore
@@ -66,11 +87,13 @@ def main() -> None:
     print("Created model & environment")
     print("Input space:", env.observation_space)
     print("Output space:", env.action_space)
-    print("Action mask Shape:", env.action_masks().shape)  # type: ignore
+    print("Action mask Shape:", env.env_method("action_masks")[0].shape)
+    print("Parallel environments:", env.num_envs)
 
     # Train the agent, 100 Iterations
     checkpoint_callback = CheckpointCallback(
-        save_freq=500,
+        # The frequency is counted in steps per environment
+        save_freq=max(1, 500 // env.num_envs),
         save_path="./model_checkpoints/",
         save_replay_buffer=True,
         save_vecnormalize=True,
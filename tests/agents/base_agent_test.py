@@ -5,6 +5,7 @@ import pytest
 
 from o2.actions.base_actions.base_action import BaseAction
 from o2.agents.agent import Agent
+from o2.agents.parallel_action_generator import ParallelActionGenerator
 from o2.models.self_rating import RATING
 from o2.models.settings import Settings
 from o2.models.solution import Solution
@@ -184,6 +185,42 @@ def test_agent_set_action_generators(mock_store, simple_solution, mock_self_rati
     assert agent.action_generator_counter == {}
 
 
+def test_agent_resumes_action_generators(mock_store, simple_solution, different_solution):
+    """Test that returning to a solution resumes its action generators"""
+    agent = TestAgent(mock_store)
+    agent.catalog = cast(list[type[BaseAction]], [MockActionClass])
+    agent.set_action_generators(simple_solution)
+    generators = agent.catalog_action_generators
+    agent.action_generator_tabu_ids.add("mock_action_id")
+
+    agent.set_action_generators(different_solution)
+    assert agent.catalog_action_generators is not generators
+    assert agent.action_generator_tabu_ids == set()
+
+    agent.set_action_generators(simple_solution)
+    assert agent.catalog_action_generators is generators
+    assert agent.action_generator_tabu_ids == {"mock_action_id"}
+
+    # Setting the generators for the current solution again recreates them
+    agent.set_action_generators(simple_solution)
+    assert agent.catalog_action_generators is not generators
+    assert agent.action_generator_tabu_ids == set()
+
+
+def test_agent_action_generator_cache_eviction(mock_store, simple_solution, different_solution):
+    """Test that the action generators are recreated, if they were evicted from the cache"""
+    agent = TestAgent(mock_store)
+    agent.catalog = cast(list[type[BaseAction]], [MockActionClass])
+    agent.set_action_generators(simple_solution)
+    generators = agent.catalog_action_generators
+
+    with mock.patch.object(Settings, "MAX_CACHED_ACTION_GENERATORS", 0):
+        agent.set_action_generators(different_solution)
+        agent.set_action_generators(simple_solution)
+    assert agent.catalog_action_generators is not generators
+    assert len(agent.action_generator_cache) == 0
+
+
 def test_agent_get_valid_actions(mock_store, mock_action):
     """Test that the get_valid_actions method returns valid actions"""
     agent = TestAgent(mock_store)
@@ -203,6 +240,68 @@ def test_agent_get_valid_actions(mock_store, mock_action):
     assert actions[0] == (RATING.HIGH, mock_action)
 
 
+def test_agent_get_valid_actions_parallel(store: Store):
+    """Test that the parallel action generation is deterministic & sorted by rating"""
+    store.settings.batching_only = True
+    store.settings.max_variants_per_action = 3
+    store.settings.max_number_of_actions_per_iteration = 4
+
+    def get_valid_actions(number_of_workers: int):
+        agent = TestAgent(store)
+        with (
+            mock.patch.object(Settings, "MAX_THREADS_ACTION_GENERATION", number_of_workers),
+            mock.patch.object(Settings, "DISABLE_PARALLEL_EVALUATION", False),
+        ):
+            # With a single worker, the entries are generated in-process
+            actions = agent._get_valid_actions_parallel()
+        return agent, actions
+
+    try:
+        in_process_agent, in_process_actions = get_valid_actions(1)
+        agent, actions = get_valid_actions(2)
+    finally:
+        ParallelActionGenerator.close_executor()
+
+    assert 0 < len(actions) <= 4
+    assert [action.id for _, action in actions] == [action.id for _, action in in_process_actions]
+    ratings = [rating for rating, _ in actions]
+    assert ratings == sorted(ratings, reverse=True)
+    assert {action.id for _, action in actions} <= agent.action_generator_tabu_ids
+    assert len(agent.action_generators) == len(in_process_agent.action_generators)
+
+
+def test_agent_get_valid_actions_parallel_keeps_candidates(store: Store):
+    """Test that the parallel action generation advances the generators & keeps unselected candidates"""
+    store.settings.batching_only = True
+    store.settings.max_variants_per_action = 3
+    store.settings.max_number_of_actions_per_iteration = 2
+    agent = TestAgent(store)
+
+    validated_ids: list[str] = []
+
+    def validate(store, actions):
+        validated_ids.extend(action.id for action in actions)
+        return [True] * len(actions)
+
+    selected_ids: list[str] = []
+    with mock.patch.object(ParallelActionGenerator, "validate", side_effect=validate):
+        actions = agent._get_valid_actions_parallel()
+        # The candidates, that were not selected, are kept for the next call
+        kept_ids = {action.id for candidates in agent.validated_actions.values() for _, action in candidates}
+        assert len(validated_ids) > len(actions)
+        assert kept_ids == set(validated_ids) - {action.id for _, action in actions}
+
+        while actions:
+            selected_ids.extend(action.id for _, action in actions)
+            actions = agent._get_valid_actions_parallel()
+
+    assert kept_ids <= set(selected_ids)
+    assert len(selected_ids) == len(set(selected_ids))
+    # Every action was only yielded (and validated) once
+    assert len(validated_ids) == len(set(validated_ids))
+    assert set(selected_ids) <= set(validated_ids)
+
+
 def test_agent_select_actions(mock_store, mock_action):
     """Test that the select_actions method returns the correct actions"""
     agent = TestAgent(mock_store)
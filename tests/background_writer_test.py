@@ -0,0 +1,174 @@
+import os
+import pickle
+import threading
+
+import pytest
+
+from o2.models.settings import FsyncPolicy, Settings
+from o2.models.state import State
+from o2.util.background_writer import BackgroundWriter
+from o2.util.solution_dumper import SolutionDumper
+from tests.fixtures.test_helpers import create_mock_solution
+
+
+@pytest.fixture
+def archive_settings():
+    """Enable (async) solution archiving for a test and restore the settings afterwards."""
+    original = (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.ASYNC_SOLUTION_DUMPS,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+    )
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.ASYNC_SOLUTION_DUMPS = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
+    yield
+    (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.ASYNC_SOLUTION_DUMPS,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+    ) = original
+
+
+def test_write_file_and_append(tmp_path):
+    writer = BackgroundWriter(batch_size=4, fsync_policy=FsyncPolicy.BATCH)
+    for i in range(10):
+        writer.write_file(os.path.join(tmp_path, f"{i}.pkl"), pickle.dumps({"i": i}))
+    with open(os.path.join(tmp_path, "stream.pkl"), "wb") as stream:
+        for i in range(3):
+            writer.append(stream, pickle.dumps(i))
+        writer.flush()
+
+    for i in range(10):
+        with open(os.path.join(tmp_path, f"{i}.pkl"), "rb") as f:
+            assert pickle.load(f) == {"i": i}
+    with open(os.path.join(tmp_path, "stream.pkl"), "rb") as f:
+        assert [pickle.load(f) for _ in range(3)] == [0, 1, 2]
+
+    assert writer.metrics.writes == 13
+    assert writer.metrics.queue_depth == 0
+    assert writer.metrics.bytes_written == sum(os.path.getsize(path) for path in tmp_path.iterdir())
+    writer.close()
+
+
+BLOCKER = threading.Event()
+
+
+class BlockingFile:
+    """Blocks the background writer while being appended to."""
+
+    def write(self, data: bytes) -> None:
+        BLOCKER.wait()
+
+    def flush(self) -> None:
+        pass
+
+
+def test_pending_writes_can_be_read(tmp_path):
+    writer = BackgroundWriter(max_queue_size=2, batch_size=1)
+    BLOCKER.clear()
+    path = os.path.join(tmp_path, "pending.pkl")
+    writer.append(BlockingFile(), b"blocking")  # type: ignore
+    writer.write_file(path, b"value")
+    assert writer.get_pending(path) == b"value"
+
+    BLOCKER.set()
+    writer.close()
+    assert writer.get_pending(path) is None
+    with open(path, "rb") as f:
+        assert f.read() == b"value"
+
+
+def test_pending_writes_can_be_cancelled(tmp_path):
+    writer = BackgroundWriter(max_queue_size=3, batch_size=1)
+    BLOCKER.clear()
+    path = os.path.join(tmp_path, "cancelled.pkl")
+    writer.append(BlockingFile(), b"blocking")  # type: ignore
+    writer.write_file(path, b"value")
+    assert writer.cancel_pending(path) == b"value"
+    assert writer.get_pending(path) is None
+
+    BLOCKER.set()
+    writer.close()
+    assert not os.path.exists(path)
+    # Already written files can't be cancelled
+    writer.write_file(path, b"value")
+    writer.flush()
+    assert writer.cancel_pending(path) is None
+    assert os.path.exists(path)
+    writer.close()
+
+
+def test_errors_are_raised_on_flush(tmp_path):
+    writer = BackgroundWriter()
+    writer.write_file(os.path.join(tmp_path, "missing", "file.pkl"), b"1")
+    with pytest.raises(RuntimeError):
+        writer.flush()
+
+
+def test_solution_dumper_writes_in_background(tmp_path, monkeypatch, archive_settings, one_task_state: State):
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Test Store")
+
+    solution = create_mock_solution(one_task_state, 3, 7)
+    dumper.dump_solution(solution)
+
+    # Loading works, regardless of whether the write already happened
+    assert dumper.load_evaluation(solution).pareto_x == solution.pareto_x
+    dumper.close()
+
+    assert len(os.listdir(dumper.evaluation_folder)) == 1
+    assert len(os.listdir(dumper.state_folder)) == 1
+    with open(dumper.solutions_filename, "rb") as f:
+        assert pickle.load(f).id == solution.id
+
+
+def test_solution_dumper_objects_can_change_after_dump(
+    tmp_path, monkeypatch, archive_settings, one_task_state: State
+):
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Test Store")
+    BLOCKER.clear()
+    dumper.writer.append(BlockingFile(), b"blocking")  # type: ignore
+
+    solution = create_mock_solution(one_task_state, 3, 7)
+    evaluation = solution.evaluation
+    dumper.dump_evaluation(solution)
+    # The loaded evaluation is a copy, so the pending write isn't affected by changes to it
+    loaded_evaluation = dumper.load_evaluation(solution)
+    assert loaded_evaluation is not evaluation
+    loaded_evaluation.__dict__["changed_after_dump"] = True
+
+    BLOCKER.set()
+    dumper.close()
+    assert dumper.writer._thread is None
+    assert dumper.load_evaluation(solution).pareto_x == solution.pareto_x
+    assert "changed_after_dump" not in dumper.load_evaluation(solution).__dict__
+
+
+def test_solution_dumper_deletes_pending_archives(
+    tmp_path, monkeypatch, archive_settings, one_task_state: State
+):
+    monkeypatch.chdir(tmp_path)
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = True
+    dumper = SolutionDumper()
+    dumper.update_store_name("Test Store")
+    BLOCKER.clear()
+    dumper.writer.append(BlockingFile(), b"blocking")  # type: ignore
+
+    pending_solution = create_mock_solution(one_task_state, 3, 7)
+    dumper.dump_evaluation(pending_solution)
+    assert dumper.load_evaluation(pending_solution).pareto_x == pending_solution.pareto_x
+    BLOCKER.set()
+    dumper.writer.flush()
+
+    written_solution = create_mock_solution(one_task_state, 5, 2)
+    dumper.dump_evaluation(written_solution)
+    dumper.writer.flush()
+    assert len(os.listdir(dumper.evaluation_folder)) == 1
+    assert dumper.load_evaluation(written_solution).pareto_x == written_solution.pareto_x
+
+    dumper.close()
+    assert os.listdir(dumper.evaluation_folder) == []
@@ -0,0 +1,89 @@
+import os
+import pickle
+
+from o2.checkpoint import CheckpointDelta, CheckpointHeader
+from o2.models.settings import Settings
+from o2.optimizer import Optimizer
+from o2.store import Store
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.test_helpers import replace_constraints
+
+
+def _read_records(path: str) -> list:
+    records = []
+    with open(path, "rb") as f:
+        while True:
+            try:
+                records.append(pickle.load(f))
+            except EOFError:
+                return records
+
+
+def test_checkpoint_and_resume(tmp_path, store: Store):
+    store = replace_constraints(store, resources=ConstraintsGenerator.resource_constraints())
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    path = os.path.join(tmp_path, "checkpoint.pkl")
+    store.settings.max_iterations = 2
+    store.settings.checkpoint_path = path
+    store.settings.checkpoint_interval = 1
+
+    optimizer = Optimizer(store)
+    for _ in optimizer.get_iteration_generator(yield_on_non_acceptance=True):
+        pass
+
+    records = _read_records(path)
+    assert isinstance(records[0], CheckpointHeader)
+    deltas = [record for record in records[1:] if isinstance(record, CheckpointDelta)]
+    assert len(deltas) == len(records) - 1
+    # The last iteration is a multiple of the interval, so it's only checkpointed once
+    assert [delta.iteration for delta in deltas] == [0, 1]
+    # After the first checkpoint, only the changed ids of the tree are tracked
+    assert store.solution_tree.changed_ids == {}
+    # Every solution is only written once
+    written_ids = [solution.id for delta in deltas for solution in delta.solutions]
+    assert len(written_ids) == len(set(written_ids))
+
+    resumed = Optimizer.resume(path)
+    resumed_store = resumed.agent.store
+    assert resumed.start_iteration == 2
+    assert resumed_store.solution.id == store.solution.id
+    assert [[s.id for s in front.solutions] for front in resumed_store.pareto_fronts] == [
+        [s.id for s in front.solutions] for front in store.pareto_fronts
+    ]
+    assert {
+        solution_id: solution is not None
+        for solution_id, solution in resumed_store.solution_tree.solution_lookup.items()
+    } == {
+        solution_id: solution is not None
+        for solution_id, solution in store.solution_tree.solution_lookup.items()
+    }
+    assert resumed.agent.get_state() == optimizer.agent.get_state()
+
+    # Continuing the run appends to the same file
+    resumed_store.settings.max_iterations = 3
+    resumed.max_iter = 3
+    for _ in resumed.get_iteration_generator(yield_on_non_acceptance=True):
+        pass
+    assert _read_records(path)[-1].iteration == 2
+
+
+def test_incomplete_last_record_is_ignored(tmp_path, store: Store):
+    store = replace_constraints(store, resources=ConstraintsGenerator.resource_constraints())
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    path = os.path.join(tmp_path, "checkpoint.pkl")
+    store.settings.max_iterations = 2
+    store.settings.checkpoint_path = path
+    store.settings.checkpoint_interval = 1
+
+    optimizer = Optimizer(store)
+    for _ in optimizer.get_iteration_generator(yield_on_non_acceptance=True):
+        pass
+
+    # Simulate a crash while writing the last checkpoint
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(pickle.dumps(_read_records(path)[-1])[:-10])
+    assert os.path.getsize(path) > size
+
+    resumed = Optimizer.resume(path)
+    assert resumed.start_iteration == 2
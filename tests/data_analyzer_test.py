@@ -1,6 +1,16 @@
+import pytest
+
+from o2.models.settings import CostType, Settings
 from o2.models.solution import Solution
 from o2.models.state import State
-from o2_evaluation.data_analyzer import handle_duplicates
+from o2.util.fingerprint_store import FingerprintStore
+from o2.util.solution_dumper import SolutionDumper
+from o2_evaluation.data_analyzer import (
+    create_front_from_solutions,
+    ensure_timetable_fingerprints,
+    handle_duplicates,
+)
+from tests.fixtures.test_helpers import create_mock_solution
 
 
 def test_handle_duplicates(one_task_state: State):
@@ -14,3 +24,86 @@ def test_handle_duplicates(one_task_state: State):
     min_cycle_time = min(evaluation1.total_cycle_time, evaluation2.total_cycle_time)
     assert solution1.evaluation.total_cycle_time == min_cycle_time
     assert solution2.evaluation.total_cycle_time == min_cycle_time
+
+
+def test_create_front_from_solutions(one_task_state: State):
+    """Test that the front only contains the valid, non-dominated solutions."""
+    original_cost_type = Settings.COST_TYPE
+    Settings.COST_TYPE = CostType.TOTAL_COST
+    try:
+        a = create_mock_solution(one_task_state, 1, 10)
+        b = create_mock_solution(one_task_state, 5, 5)
+        b_same_point = create_mock_solution(one_task_state, 5, 5)
+        dominated = create_mock_solution(one_task_state, 6, 6)
+        c = create_mock_solution(one_task_state, 10, 1)
+        invalid = create_mock_solution(one_task_state, 0, 0)
+        solutions = [a, b, b_same_point, dominated, c, invalid, a]
+
+        front = create_front_from_solutions(solutions)
+        assert front == [a, b, b_same_point, c]
+    finally:
+        Settings.COST_TYPE = original_cost_type
+
+
+@pytest.fixture
+def archive_settings():
+    """Archive the (valid) mock solutions & detect duplicates by timetable."""
+    original = (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+        Settings.CHECK_FOR_TIMETABLE_EQUALITY,
+        Settings.COST_TYPE,
+    )
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
+    Settings.CHECK_FOR_TIMETABLE_EQUALITY = True
+    Settings.COST_TYPE = CostType.TOTAL_COST
+    yield
+    (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+        Settings.CHECK_FOR_TIMETABLE_EQUALITY,
+        Settings.COST_TYPE,
+    ) = original
+
+
+def test_handle_duplicates_of_archived_solutions(
+    tmp_path, monkeypatch, archive_settings, one_task_state: State
+):
+    """Test that archived duplicates are resolved without loading states or evaluations."""
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Store")
+    worse = create_mock_solution(one_task_state, 5, 5)
+    better = create_mock_solution(one_task_state, 3, 3)
+    for solution in [worse, better]:
+        dumper.dump_solution(solution)
+        del solution.__dict__["_timetable_hash"]
+
+    handle_duplicates([worse, better])
+
+    assert worse.__dict__["_state"] is None
+    assert worse.__dict__["_evaluation"] is None
+    assert worse.__dict__["_evaluation_key"] == dumper.get_evaluation_key(better)
+    assert worse.pareto_x == better.pareto_x
+    assert worse.evaluation.pareto_x == better.pareto_x
+    dumper.close()
+
+
+def test_ensure_timetable_fingerprints(tmp_path, monkeypatch, archive_settings, one_task_state: State):
+    """Test that missing fingerprints are computed & stored."""
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Store")
+    solutions = [create_mock_solution(one_task_state, x, x) for x in range(1, 4)]
+    for solution in solutions:
+        dumper.dump_solution(solution)
+    expected = [solution.__dict__.pop("_timetable_hash") for solution in solutions]
+    dumper.writer.flush()
+    dumper.fingerprint_store = FingerprintStore(str(tmp_path / "empty.txt"))
+
+    ensure_timetable_fingerprints(solutions, max_workers=2)
+
+    assert [solution.__dict__["_timetable_hash"] for solution in solutions] == expected
+    assert [dumper.load_timetable_fingerprint(solution) for solution in solutions] == expected
+    dumper.close()
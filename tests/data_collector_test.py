@@ -0,0 +1,55 @@
+import argparse
+import os
+
+import pytest
+
+from o2.store import Store
+from o2_evaluation import data_collector
+from o2_evaluation.data_collector import collect_data_in_parallel, get_required_cores
+
+
+def _args(tmp_path, **kwargs) -> argparse.Namespace:
+    args = {
+        "agents": ["Tabu Search", "Simulated Annealing", "Proximal Policy Optimization"],
+        "max_threads": 4,
+        "cpu_budget": 4,
+        "ppo_actions_per_step": 1,
+        "log_level": "INFO",
+        "log_file": None,
+        "number_of_cases": 10,
+        "archive_tensorboard_logs": False,
+        "log_to_tensor_board": False,
+        "tmp_path": str(tmp_path),
+    }
+    return argparse.Namespace(**{**args, **kwargs})
+
+
+def _fake_run_job(base_store: Store, agent_name: str, args: argparse.Namespace) -> None:
+    if agent_name == "Simulated Annealing" and args.fail_sa:
+        raise ValueError("Job failed")
+    with open(os.path.join(args.tmp_path, f"{agent_name} {args.max_threads}"), "w") as f:
+        f.write(base_store.name)
+
+
+def test_get_required_cores(tmp_path):
+    args = _args(tmp_path, max_threads=16, cpu_budget=8)
+    assert get_required_cores("Tabu Search", args) == 8
+    assert get_required_cores("Proximal Policy Optimization", args) == 5
+    args = _args(tmp_path, max_threads=16, cpu_budget=8, ppo_actions_per_step=6)
+    assert get_required_cores("Proximal Policy Optimization", args) == 6
+
+
+def test_collect_data_in_parallel(tmp_path, monkeypatch, one_task_store: Store):
+    monkeypatch.setattr(data_collector, "run_job", _fake_run_job)
+    # Don't change the global settings of the test process
+    monkeypatch.setattr(data_collector, "update_global_settings", lambda _: None)
+
+    collect_data_in_parallel([one_task_store], _args(tmp_path, fail_sa=False, cpu_budget=3))
+    assert sorted(os.listdir(tmp_path)) == [
+        "Proximal Policy Optimization 3",
+        "Simulated Annealing 3",
+        "Tabu Search 3",
+    ]
+
+    with pytest.raises(RuntimeError, match="1 jobs failed"):
+        collect_data_in_parallel([one_task_store], _args(tmp_path, fail_sa=True))
@@ -0,0 +1,135 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from o2.actions.batching_actions.modify_size_rule_by_cost_action import (
+    ModifySizeRuleByCostAction,
+    ModifySizeRuleByCostActionParamsType,
+)
+from o2.distributed_evaluation import (
+    DistributedEvaluationBackend,
+    EvaluationJob,
+    EvaluationWorker,
+    LocalBroker,
+)
+from o2.models.rule_selector import RuleSelector
+from o2.models.settings import Settings
+from o2.models.solution import Solution
+from o2.models.state import State
+from o2.optimizer import Optimizer
+from o2.store import Store
+from tests.fixtures.test_helpers import replace_timetable
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+
+@pytest.fixture
+def batching_store(one_task_store: Store) -> Store:
+    return replace_timetable(
+        one_task_store,
+        batch_processing=[TimetableGenerator.batching_size_rule(TimetableGenerator.FIRST_ACTIVITY, 10, 1)],
+    )
+
+
+@pytest.fixture
+def broker():
+    broker = LocalBroker()
+    yield broker
+    broker.close()
+
+
+def create_action(size_increment: int = 1) -> ModifySizeRuleByCostAction:
+    return ModifySizeRuleByCostAction(
+        params=ModifySizeRuleByCostActionParamsType(
+            rule=RuleSelector(
+                batching_rule_task_id=TimetableGenerator.FIRST_ACTIVITY, firing_rule_index=(0, 0)
+            ),
+            size_increment=size_increment,
+            duration_fn="1",
+        )
+    )
+
+
+def start_worker_thread(broker: LocalBroker) -> threading.Thread:
+    thread = threading.Thread(target=EvaluationWorker(broker).run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_distributed_evaluation(batching_store: Store, broker: LocalBroker):
+    worker = start_worker_thread(broker)
+    backend = DistributedEvaluationBackend(broker)
+    action = create_action(-1)
+
+    solution = backend.submit(batching_store.solution, action).result(timeout=60)
+    backend.close()
+    broker.stop_workers(1)
+    worker.join()
+
+    expected_solution = Solution.from_parent(batching_store.solution, action)
+    assert solution.id == expected_solution.id
+    assert solution.actions == [action]
+    assert solution.state == expected_solution.state
+    assert solution.is_valid
+
+
+def test_distributed_evaluation_local_workers(batching_store: Store, broker: LocalBroker):
+    backend = DistributedEvaluationBackend(broker)
+    backend.start_local_workers(1)
+    actions = [create_action(-1), create_action(1)]
+
+    futures = [backend.submit(batching_store.solution, action) for action in actions]
+    solutions = [future.result(timeout=60) for future in futures]
+    backend.close()
+
+    assert [solution.last_action for solution in solutions] == actions
+    assert all(solution.is_valid for solution in solutions)
+
+
+def test_distributed_evaluation_retries_and_timeout(batching_store: Store, broker: LocalBroker):
+    # No worker is running, so the job times out
+    backend = DistributedEvaluationBackend(broker)
+    with (
+        mock.patch.object(Settings, "DISTRIBUTED_EVALUATION_TIMEOUT", 0.2),
+        mock.patch.object(Settings, "DISTRIBUTED_EVALUATION_MAX_RETRIES", 1),
+    ):
+        future = backend.submit(batching_store.solution, create_action(-1))
+        with pytest.raises(TimeoutError):
+            future.result(timeout=10)
+    backend.close()
+
+    # The job was submitted twice (initial attempt + 1 retry)
+    jobs = [broker.get_job(), broker.get_job()]
+    assert jobs[0] == jobs[1]
+
+
+def test_evaluation_worker_caches_evaluations(batching_store: Store, broker: LocalBroker):
+    base_state = batching_store.solution.state
+    base_hash = hash(base_state.timetable)
+    broker.put_state(base_hash, base_state)
+    worker = EvaluationWorker(broker)
+    action = create_action(-1)
+
+    with mock.patch.object(State, "evaluate", autospec=True, side_effect=State.evaluate) as evaluate:
+        first_result = worker.evaluate(EvaluationJob("1", base_hash, action))
+        second_result = worker.evaluate(EvaluationJob("2", base_hash, action))
+    assert evaluate.call_count == 1
+    assert second_result.evaluation is first_result.evaluation
+    assert second_result.job_id == "2"
+
+
+def test_optimizer_with_distributed_evaluation(batching_store: Store, broker: LocalBroker):
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    batching_store.settings.max_iterations = 2
+    batching_store.settings.batching_only = True
+    batching_store.settings.throw_on_iteration_errors = True
+    batching_store.settings.never_select_new_base_solution = True
+
+    worker = start_worker_thread(broker)
+    optimizer = Optimizer(batching_store)
+    optimizer.evaluation_backend = DistributedEvaluationBackend(broker)
+    optimizer.solve()
+    broker.stop_workers(1)
+    worker.join()
+
+    assert batching_store.solution_tree.total_solutions > 1
@@ -1,4 +1,6 @@
+import pickle
 
+from o2.models.evaluation import Evaluation
 from o2.models.state import State
 from tests.fixtures.timetable_generator import TimetableGenerator
 
@@ -401,3 +403,117 @@ def test_batch_detection(one_task_state: State):
     # assert snd_batch["real_proc"] == (2 + 16) * 60 * 60
     # # 2h
     # assert snd_batch["ideal_proc"] == 2 * 60 * 60
+
+
+def test_lazy_statistics_from_event_table(one_task_state: State):
+    state = one_task_state.replace_timetable(
+        task_resource_distribution=TimetableGenerator.task_resource_distribution_simple(
+            [TimetableGenerator.FIRST_ACTIVITY], 1 * 60 * 60
+        ),
+        resource_calendars=TimetableGenerator.resource_calendars(
+            9, 18, include_end_hour=False, only_week_days=True
+        ),
+        # One Case every 24h at 9:00
+        arrival_time_distribution=TimetableGenerator.arrival_time_distribution(
+            24 * 60 * 60,
+            24 * 60 * 60,
+        ),
+        arrival_time_calendar=TimetableGenerator.arrival_time_calendar(
+            9, 10, include_end_hour=False, only_week_days=False
+        ),
+        batch_processing=[
+            TimetableGenerator.batching_size_rule(
+                TimetableGenerator.FIRST_ACTIVITY, 4, duration_distribution=0.5
+            )
+        ],
+        total_cases=8,
+    )
+
+    evaluation = state.evaluate()
+
+    # Derived statistics are only computed on first access
+    assert "task_execution_counts" not in evaluation.__dict__
+    assert "task_enablement_weekdays" not in evaluation.__dict__
+    assert evaluation.task_execution_counts == {TimetableGenerator.FIRST_ACTIVITY: 8}
+    assert "task_execution_counts" in evaluation.__dict__
+
+    # Every case is enabled at 9:00, one per day
+    enablements = evaluation.task_enablement_weekdays[TimetableGenerator.FIRST_ACTIVITY]
+    assert sum(count for hours in enablements.values() for count in hours.values()) == 8
+    assert all(list(hours.keys()) == [9] for hours in enablements.values())
+
+    assert evaluation.resource_allocation_ratio_task == {TimetableGenerator.FIRST_ACTIVITY: 1}
+    assert evaluation.avg_batch_size_for_batch_enabled_tasks == 4
+    assert evaluation.avg_batch_size_per_task == {TimetableGenerator.FIRST_ACTIVITY: 4}
+    assert evaluation.total_fixed_cost_by_task == {TimetableGenerator.FIRST_ACTIVITY: 0}
+
+    # The event table survives pickling, so archived evaluations can still compute the statistics
+    restored = pickle.loads(pickle.dumps(evaluation))
+    assert restored.task_started_weekdays == evaluation.task_started_weekdays
+    assert restored.tasks_by_number_of_duplicate_enablement_dates == (
+        evaluation.tasks_by_number_of_duplicate_enablement_dates
+    )
+
+
+def test_empty_evaluation_statistics():
+    evaluation = Evaluation.empty()
+
+    assert evaluation.task_execution_counts == {}
+    assert evaluation.task_enablement_weekdays == {}
+    assert evaluation.batches_by_activity_with_idle == {}
+    assert evaluation.total_batching_waiting_time == 0
+    assert evaluation.avg_fixed_cost_per_case == 0
+    assert evaluation.avg_batch_size_for_batch_enabled_tasks == 0
+
+
+def test_kpi_tables(one_task_state: State):
+    evaluation = one_task_state.evaluate()
+    task_id = TimetableGenerator.FIRST_ACTIVITY
+
+    kpis = evaluation.task_kpi_table.get_columns([task_id, "unknown_task"])
+    assert kpis["waiting_time"][0] == evaluation.task_kpis[task_id].waiting_time.total
+    assert kpis["execution_count"][0] == evaluation.task_execution_counts[task_id]
+    # Ids without KPIs get the defaults
+    assert kpis["waiting_time"][1] == 0
+    assert kpis["avg_batch_size"][1] == 1
+
+    enablements = evaluation.task_enablement_table.get_rows([task_id])
+    assert enablements.shape == (1, 7)
+    assert enablements.sum() == sum(
+        len(hours) for hours in evaluation.task_enablement_weekdays[task_id].values()
+    )
+
+    resource_ids = list(evaluation.resource_kpis)
+    utilizations = evaluation.resource_kpi_table.get_columns(resource_ids)["utilization"]
+    assert utilizations.tolist() == [evaluation.resource_kpis[id].utilization for id in resource_ids]
+
+
+def test_empty_kpi_tables():
+    evaluation = Evaluation.empty()
+
+    assert len(evaluation.task_kpi_table) == 0
+    assert evaluation.task_kpi_table.get_rows(["task"]).shape == (1, len(evaluation.task_kpi_table.columns))
+    assert len(evaluation.resource_kpi_table) == 0
+
+
+def test_sorted_views(two_tasks_state: State):
+    evaluation = two_tasks_state.evaluate()
+
+    waiting_times = {task_id: kpi.waiting_time.avg for task_id, kpi in evaluation.task_kpis.items()}
+    assert evaluation.get_task_names_sorted_by_waiting_time_desc() == sorted(
+        waiting_times, key=lambda task_id: waiting_times[task_id], reverse=True
+    )
+    for task_id in evaluation.task_kpis:
+        assert set(evaluation.get_most_frequent_resources(task_id)) == {
+            resource_id
+            for resource_id, counts in evaluation.task_execution_count_by_resource.items()
+            if task_id in counts
+        }
+    assert evaluation.get_most_frequent_resources("unknown_task") == []
+
+    # The rankings are computed once, the getters return copies
+    tasks = evaluation.get_task_names_sorted_by_waiting_time_desc()
+    tasks.clear()
+    assert evaluation.get_task_names_sorted_by_waiting_time_desc() == sorted(
+        waiting_times, key=lambda task_id: waiting_times[task_id], reverse=True
+    )
@@ -0,0 +1,23 @@
+import os
+
+from o2.util.fingerprint_store import FingerprintStore
+
+
+def test_add_and_get(tmp_path):
+    filename = os.path.join(tmp_path, "fingerprints", "timetable_fingerprints.txt")
+    store = FingerprintStore(filename)
+    store.add("a", 1)
+    store.add_many([("b", -2), ("a", 3)])
+
+    assert store.get("a") == 3
+    assert store.get("b") == -2
+    assert "c" not in store
+
+    # Another reader sees the complete lines only
+    with open(filename, "ab") as f:
+        f.write(b"c 4")
+    reader = FingerprintStore(filename)
+    assert len(reader) == 2
+    assert reader.get("a") == 3
+    assert reader.get("c") is None
+    store.close()
@@ -0,0 +1,158 @@
+import multiprocessing
+import time
+from copy import copy
+from unittest import mock
+
+import pytest
+
+from o2.agents.tabu_agent import TabuAgent
+from o2.island_optimizer import IslandChannel, IslandOptimizer, _run_island
+from o2.models.settings import AgentType, Settings
+from o2.models.solution import Solution
+from o2.optimizer import Optimizer
+from o2.store import Store
+from o2.util.solution_dumper import SolutionDumper
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.test_helpers import replace_constraints, replace_timetable
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+
+@pytest.fixture
+def archive_settings():
+    """Enable solution archiving for a test and restore the settings afterwards."""
+    original = (Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES)
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = True
+    yield
+    Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES = original
+
+
+def create_batching_store(one_task_store: Store) -> Store:
+    store = replace_timetable(
+        one_task_store,
+        batch_processing=[TimetableGenerator.batching_size_rule(TimetableGenerator.FIRST_ACTIVITY, 10, 1)],
+    )
+    store = replace_constraints(
+        store,
+        batching_constraints=ConstraintsGenerator(store.base_state.bpmn_definition)
+        .add_size_constraint(optimal_duration=5, optimal_duration_bonus=0.1, min_size=1)
+        .constraints.batching_constraints,
+    )
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    store.settings.throw_on_iteration_errors = True
+    store.settings.max_iterations = 3
+    store.settings.batching_only = True
+    store.settings.island_migration_interval = 1
+    # Keep the base solution selection (and its random choices) out of the tests
+    store.settings.never_select_new_base_solution = True
+    return store
+
+
+def test_island_channel_exchange(one_task_store: Store):
+    store = create_batching_store(one_task_store)
+    actions = TabuAgent(store).get_valid_actions()
+    immigrants = [Solution.from_parent(store.solution, action) for _, action in actions]
+    assert immigrants
+
+    island_store = Store(store.base_solution, store.constraints)
+    island_store.settings = store.settings
+    island_optimizer = Optimizer(island_store)
+    inbox = multiprocessing.Queue()
+    outbox = multiprocessing.Queue()
+    channel = IslandChannel(1, inbox, outbox)
+
+    inbox.put(immigrants)
+    # Wait for the queue's feeder thread, then put the item back for the channel
+    inbox.put(inbox.get(timeout=10))
+    deadline = time.monotonic() + 10
+    while inbox.empty():
+        assert time.monotonic() < deadline, "The immigrants were not delivered"
+        time.sleep(0.01)
+    channel.exchange(island_optimizer)
+
+    for solution in immigrants:
+        assert solution.id in island_store.solution_tree.solution_lookup
+    # The received solutions are not sent back
+    channel.finish(island_optimizer)
+    migration = outbox.get(timeout=10)
+    assert migration.finished
+    assert not {solution.id for solution in migration.solutions} & {solution.id for solution in immigrants}
+
+
+def test_island_optimizer(one_task_store: Store):
+    store = create_batching_store(one_task_store)
+    islands = []
+    for agent in [AgentType.TABU_SEARCH, AgentType.TABU_SEARCH_RANDOM]:
+        settings = copy(store.settings)
+        settings.agent = agent
+        islands.append(settings)
+
+    pareto_front = IslandOptimizer(store, islands).solve()
+
+    assert pareto_front is store.current_pareto_front
+    assert pareto_front.size > 0
+    assert all(solution.is_valid for solution in pareto_front.solutions)
+    assert any(not solution.is_base_solution for solution in pareto_front.solutions)
+
+
+def test_island_channel_sends_archived_solutions(
+    tmp_path, monkeypatch, archive_settings, one_task_store: Store
+):
+    monkeypatch.chdir(tmp_path)
+    store = create_batching_store(one_task_store)
+    SolutionDumper().update_store_name(store.name)
+    optimizer = Optimizer(store)
+    solutions = [
+        Solution.from_parent(store.solution, action) for _, action in TabuAgent(store).get_valid_actions()
+    ]
+    # E.g. a front solution, that was archived by the island
+    front_solution = next(solution for solution in solutions if solution.is_valid)
+    store.current_pareto_front.add(front_solution)
+    front_solution.archive()
+    assert front_solution._evaluation is None
+    outbox = multiprocessing.Queue()
+    channel = IslandChannel(0, multiprocessing.Queue(), outbox)
+
+    channel.finish(optimizer)
+    migration = outbox.get(timeout=10)
+    assert front_solution.id in {solution.id for solution in migration.solutions}
+    SolutionDumper.instance.close()
+
+    # The coordinator can't (and doesn't need to) read the archive of the island
+    monkeypatch.setattr(SolutionDumper, "instance", None)
+    for solution in migration.solutions:
+        assert solution.evaluation is not None
+        assert solution.state is not None
+
+
+def test_run_island_uses_own_solution_dumper(tmp_path, monkeypatch, archive_settings, one_task_store: Store):
+    monkeypatch.chdir(tmp_path)
+    coordinator_dumper = SolutionDumper()
+    island_dumpers = []
+    channel = mock.MagicMock()
+
+    class IslandOptimizerMock:
+        def __init__(self, store: Store) -> None:
+            island_dumpers.append(SolutionDumper.instance)
+
+        def solve(self) -> None:
+            pass
+
+    with mock.patch("o2.island_optimizer.Optimizer", IslandOptimizerMock):
+        _run_island(channel, one_task_store, 1)
+
+    [island_dumper] = island_dumpers
+    assert island_dumper is not coordinator_dumper
+    assert island_dumper.folder != coordinator_dumper.folder
+    assert island_dumper.current_store_name == one_task_store.name
+    channel.finish.assert_called_once()
+
+
+def test_run_island_raises_errors_of_the_optimizer(one_task_store: Store):
+    channel = mock.MagicMock()
+    with (
+        mock.patch("o2.island_optimizer.Optimizer", side_effect=ValueError("Invalid store")),
+        pytest.raises(ValueError, match="Invalid store"),
+    ):
+        _run_island(channel, one_task_store, 1)
+    channel.finish.assert_not_called()
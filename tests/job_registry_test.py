@@ -0,0 +1,79 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from o2_server.job_registry import JobRegistry
+
+
+def test_import_mapping(tmp_path):
+    registry = JobRegistry(os.path.join(tmp_path, "jobs.sqlite3"))
+    output_path = os.path.join(tmp_path, "output.zip")
+    with open(output_path, "wb") as f:
+        f.write(b"report")
+    mapping_file = os.path.join(tmp_path, "mapping.json")
+    with open(mapping_file, "w") as f:
+        json.dump({"old-job": output_path, "removed-job": os.path.join(tmp_path, "missing.zip")}, f)
+    registry.add("new-job", os.path.join(tmp_path, "new.zip"))
+
+    assert registry.import_mapping(mapping_file) == 2
+    job = registry.get("old-job")
+    assert job is not None
+    assert job.status == "completed"
+    assert job.output_path == output_path
+    assert job.finished_at is not None
+    assert registry.get("removed-job") is not None
+
+    # Importing again doesn't change existing jobs
+    registry.set_status("old-job", "failed")
+    assert registry.import_mapping(mapping_file) == 0
+    assert registry.get("old-job").status == "failed"
+    assert registry.get("new-job").status == "pending"
+
+
+def test_registry_without_request_hash_is_upgraded(tmp_path):
+    path = os.path.join(tmp_path, "jobs.sqlite3")
+    # The schema of registries created before the result cache
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, output_path TEXT NOT NULL, status TEXT NOT NULL, "
+            "config_hash TEXT, created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT)"
+        )
+        connection.execute(
+            "INSERT INTO jobs (id, output_path, status, created_at) "
+            "VALUES ('old-job', 'old.zip', 'running', '')"
+        )
+
+    registry = JobRegistry(path)
+    old_job = registry.get("old-job")
+    assert old_job is not None
+    assert old_job.request_hash is None
+
+    registry.add("new-job", "new.zip", request_hash="hash")
+    registry.set_status("new-job", "completed")
+    assert [job.id for job in registry.get_completed_jobs("hash")] == ["new-job"]
+    # Opening the upgraded registry again keeps the jobs
+    assert JobRegistry(path).get("new-job") == registry.get("new-job")
+
+
+def test_request_cancel(tmp_path):
+    registry = JobRegistry(os.path.join(tmp_path, "jobs.sqlite3"))
+    registry.add("queued-job", "queued.zip")
+    registry.add("running-job", "running.zip")
+    registry.set_status("running-job", "running")
+    registry.add("completed-job", "completed.zip")
+    registry.set_status("completed-job", "completed")
+
+    assert registry.request_cancel("queued-job")
+    assert registry.request_cancel("running-job")
+    assert not registry.request_cancel("completed-job")
+    assert not registry.request_cancel("missing-job")
+    assert registry.is_cancel_requested("running-job")
+    assert not registry.is_cancel_requested("completed-job")
+
+    # A job, that is cancelled while queued, isn't set to running when its process starts
+    registry.set_status("queued-job", "running")
+    assert registry.get("queued-job").status == "cancel_requested"
+    registry.set_status("running-job", "cancelled")
+    assert registry.get("running-job").status == "cancelled"
+    assert registry.get("running-job").finished_at is not None
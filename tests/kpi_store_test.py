@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pytest
+
+from o2.models.settings import Settings
+from o2.models.state import State
+from o2.util.kpi_store import KPI_COLUMNS, KpiStore
+from o2.util.solution_dumper import SolutionDumper
+from tests.fixtures.test_helpers import create_mock_solution
+
+
+@pytest.fixture
+def archive_settings():
+    """Enable solution archiving for a test and restore the settings afterwards."""
+    original = (Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES)
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
+    yield
+    Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES = original
+
+
+def test_append_and_read(tmp_path, one_task_state: State):
+    store = KpiStore(str(tmp_path))
+    assert len(store) == 0
+    assert store.get("missing", "pareto_x") is None
+
+    solution1 = create_mock_solution(one_task_state, 3, 7)
+    solution2 = create_mock_solution(one_task_state, 5, 2)
+    store.append("a", solution1.evaluation)
+    store.append("b", solution2.evaluation)
+
+    assert len(store) == 2
+    assert "a" in store
+    assert store.get("a", "pareto_x") == solution1.evaluation.pareto_x
+    assert store.get("b", "pareto_y") == solution2.evaluation.pareto_y
+    assert store.get("b", "total_cycle_time") == solution2.evaluation.total_cycle_time
+    assert list(store.get_column("pareto_x")) == [solution1.pareto_x, solution2.pareto_x]
+
+    rows = store.get_rows(["b", "missing"], ("pareto_x", "pareto_y"))
+    assert rows.shape == (2, 2)
+    assert list(rows[0]) == [solution2.pareto_x, solution2.pareto_y]
+    assert np.isnan(rows[1]).all()
+
+    # Later rows supersede earlier ones
+    store.append("a", solution2.evaluation)
+    assert store.get("a", "pareto_x") == solution2.pareto_x
+    store.close()
+
+
+def test_reader_picks_up_new_rows(tmp_path, one_task_state: State):
+    writer = KpiStore(str(tmp_path))
+    reader = KpiStore(str(tmp_path))
+
+    solution = create_mock_solution(one_task_state, 3, 7)
+    writer.append("a", solution.evaluation)
+    assert reader.get("a", "pareto_x") == solution.pareto_x
+
+    writer.append("b", solution.evaluation)
+    assert len(reader) == 2
+    writer.close()
+
+
+def test_incomplete_row_is_discarded(tmp_path, one_task_state: State):
+    solution = create_mock_solution(one_task_state, 3, 7)
+    store = KpiStore(str(tmp_path))
+    store.append("a", solution.evaluation)
+    store.close()
+
+    # Simulate a crash while writing the second row
+    with open(os.path.join(tmp_path, f"{KPI_COLUMNS[0]}.f64"), "ab") as f:
+        f.write(np.float64(1).tobytes())
+    assert len(KpiStore(str(tmp_path))) == 1
+
+    store = KpiStore(str(tmp_path))
+    store.append("b", solution.evaluation)
+    assert len(store) == 2
+    assert store.get("b", KPI_COLUMNS[0]) == store.get("a", KPI_COLUMNS[0])
+    store.close()
+
+
+def test_incomplete_index_line_is_discarded(tmp_path, one_task_state: State):
+    solution = create_mock_solution(one_task_state, 3, 7)
+    store = KpiStore(str(tmp_path))
+    store.append("a", solution.evaluation)
+    store.close()
+
+    # Simulate a crash while writing the index line of the second row
+    with open(os.path.join(tmp_path, "index.txt"), "ab") as f:
+        f.write(b"1 ha")
+
+    store = KpiStore(str(tmp_path))
+    store.append("b", solution.evaluation)
+    store.append("c", solution.evaluation)
+    store.close()
+
+    reader = KpiStore(str(tmp_path))
+    assert len(reader) == 3
+    assert "ha" not in reader
+    assert reader.get("c", "pareto_x") == solution.evaluation.pareto_x
+    assert reader._index == {"a": 0, "b": 1, "c": 2}
+
+
+def test_archived_solution_reads_kpis_without_evaluation(
+    tmp_path, monkeypatch, archive_settings, one_task_state: State
+):
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Test Store")
+
+    solution = create_mock_solution(one_task_state, 3, 7)
+    total_cycle_time = solution.evaluation.total_cycle_time
+    solution.archive()
+
+    # Remove the archived evaluation, so loading it would fail
+    for filename in os.listdir(dumper.evaluation_folder):
+        os.remove(os.path.join(dumper.evaluation_folder, filename))
+    del solution.__dict__["pareto_x"]
+
+    assert solution.pareto_x == 3
+    assert solution.get_kpi("total_cycle_time") == total_cycle_time
+    dumper.close()
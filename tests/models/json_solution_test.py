@@ -1,4 +1,4 @@
-from o2.models.json_report import JSONReport
+from o2.models.json_report import IncrementalJSONReport, JSONReport
 from o2.models.settings import Settings
 from o2.optimizer import Optimizer
 from o2.store import Store
@@ -39,3 +39,25 @@ def test_creating_json_solution_with_timetable_id(store: Store):
     json_solution = JSONReport.from_store(store)
     # TODO: Improve Assertions
     assert json_solution is not None
+
+
+def test_assembling_report_from_deltas(store: Store):
+    store = replace_constraints(store, resources=ConstraintsGenerator.resource_constraints())
+
+    store.settings.max_iterations = 3
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    report = IncrementalJSONReport()
+    deltas = [report.get_delta(store).model_dump_json()]
+
+    optimizer = Optimizer(store)
+    for _ in optimizer.get_iteration_generator(yield_on_non_acceptance=True):
+        deltas.append(report.get_delta(store).model_dump_json())
+    deltas.append(report.get_delta(store, is_final=True).model_dump_json())
+
+    # Only the first delta contains the header, and every solution is only written once
+    assert '"header":null' in deltas[1]
+    assert '"solutions":{}' in deltas[-1]
+
+    assembled = JSONReport.from_deltas(deltas)
+    expected = JSONReport.from_store(store, is_final=True)
+    assert assembled.model_dump(exclude={"created_at"}) == expected.model_dump(exclude={"created_at"})
@@ -1,5 +1,17 @@
-from o2.optimizer import Optimizer
+import time
+from concurrent.futures import Future
+from unittest import mock
+
+from o2.actions.batching_actions.modify_size_rule_by_cost_action import (
+    ModifySizeRuleByCostAction,
+    ModifySizeRuleByCostActionParamsType,
+)
+from o2.evaluation_backend import EvaluationBackend
+from o2.models.rule_selector import RuleSelector
 from o2.models.settings import AgentType, Settings
+from o2.models.solution import Solution
+from o2.models.state import State
+from o2.optimizer import Optimizer
 from o2.store import Store
 from tests.fixtures.constraints_generator import ConstraintsGenerator
 from tests.fixtures.test_helpers import replace_constraints, replace_timetable
@@ -80,3 +92,78 @@ def test_optimizer_ppo(one_task_store: Store):
 
     optimizer = Optimizer(store)
     optimizer.solve()
+
+
+class PendingEvaluationBackend(EvaluationBackend):
+    """Evaluates the actions with a positive size increment, the others never finish."""
+
+    def submit(self, parent, action):
+        future = Future()
+        if action.params["size_increment"] > 0:
+            future.set_result(Solution.from_parent(parent, action))
+        return future
+
+
+def create_size_action(size_increment: int) -> ModifySizeRuleByCostAction:
+    return ModifySizeRuleByCostAction(
+        params=ModifySizeRuleByCostActionParamsType(
+            rule=RuleSelector(
+                batching_rule_task_id=TimetableGenerator.FIRST_ACTIVITY, firing_rule_index=(0, 0)
+            ),
+            size_increment=size_increment,
+            duration_fn="1",
+        )
+    )
+
+
+def test_optimizer_cancels_stragglers(one_task_store: Store):
+    store = replace_timetable(
+        one_task_store,
+        batch_processing=[TimetableGenerator.batching_size_rule(TimetableGenerator.FIRST_ACTIVITY, 10, 1)],
+    )
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    optimizer = Optimizer(store)
+    optimizer.evaluation_backend = PendingEvaluationBackend()
+    actions = [create_size_action(1), create_size_action(-1), create_size_action(-2)]
+
+    with (
+        mock.patch.object(Settings, "STRAGGLER_QUORUM", 0.3),
+        mock.patch.object(Settings, "STRAGGLER_GRACE_FACTOR", 0.0),
+    ):
+        solutions = optimizer._execute_actions_parallel(actions)
+
+    assert optimizer.evaluation_stats.evaluated == 3
+    assert optimizer.evaluation_stats.cancelled == 2
+    # The stragglers are dropped, without marking them as invalid in the solution tree
+    assert len(solutions) == 1
+    assert solutions[0].is_valid
+    optimizer.agent.process_many_solutions(solutions)
+    for action in actions[1:]:
+        straggler = Solution.empty_from_parent(store.base_solution, action)
+        assert straggler.id not in store.solution_tree.solution_lookup
+
+
+def test_optimizer_action_evaluation_timeout(one_task_store: Store):
+    store = replace_timetable(
+        one_task_store,
+        batch_processing=[TimetableGenerator.batching_size_rule(TimetableGenerator.FIRST_ACTIVITY, 10, 1)],
+    )
+    Settings.DISABLE_PARALLEL_EVALUATION = True
+    optimizer = Optimizer(store)
+
+    def slow_evaluation(state):
+        time.sleep(5)
+
+    with (
+        mock.patch.object(Settings, "ACTION_EVALUATION_TIMEOUT", 0.1),
+        mock.patch.object(State, "evaluate", slow_evaluation),
+    ):
+        start_time = time.time()
+        solutions = optimizer._execute_actions_parallel([create_size_action(-1)])
+
+    assert time.time() - start_time < 5
+    assert optimizer.evaluation_stats.timed_out == 1
+    assert not solutions[0].is_valid
+    # Unlike a straggler, a timed out action is marked as invalid in the solution tree
+    optimizer.agent.process_many_solutions(solutions)
+    assert store.solution_tree.solution_lookup[solutions[0].id] is None
@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from o2.models.state import State
+from o2.ppo_utils.ppo_env import PPOEnv
+from o2.ppo_utils.ppo_input import ActionValidityCache, PPOInput
+from o2.store import Store
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+COMPLEX_LOOP_BPMN_PATH = "./tests/fixtures/ComplexLoop.bpmn"
+
+
+def create_store():
+    with open(COMPLEX_LOOP_BPMN_PATH) as f:
+        bpmn_content = f.read()
+    state = State(
+        bpmn_definition=bpmn_content,
+        timetable=TimetableGenerator(bpmn_content).generate_simple(include_batching=True),
+        for_testing=True,
+    )
+    return Store.from_state_and_constraints(state, ConstraintsGenerator(bpmn_content).generate())
+
+
+def benchmark_action_masks(store, steps=20, seed=42):
+    """Take random steps, and time the action computation (uncached & cached) for every step."""
+    env = PPOEnv(store)
+    env.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    cache = ActionValidityCache()
+    uncached_time = 0.0
+    cached_time = 0.0
+    for _ in range(steps):
+        start_time = time.time()
+        uncached_actions = PPOInput.get_actions_from_store(env.store)
+        uncached_time += time.time() - start_time
+
+        start_time = time.time()
+        cached_actions = PPOInput.get_actions_from_store(env.store, cache)
+        cached_time += time.time() - start_time
+
+        assert uncached_actions == cached_actions
+        env.step(rng.choice(np.flatnonzero(env.action_masks())))
+    print(f"Tasks: {len(env.store.current_timetable.get_task_ids())}, actions: {len(env.actions)}")
+    print(f"Uncached: {uncached_time / steps * 1000:_.1f} ms/step")
+    print(f"Cached  : {cached_time / steps * 1000:_.1f} ms/step")
+
+
+if __name__ == "__main__":
+    benchmark_action_masks(create_store())
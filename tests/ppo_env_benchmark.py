@@ -0,0 +1,46 @@
+import os
+import time
+
+import numpy as np
+
+from o2.models.state import State
+from o2.ppo_utils.ppo_env import PPOEnv
+from o2.store import Store
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+SIMPLE_LOOP_BPMN_PATH = "./tests/fixtures/SimpleLoop.bpmn"
+
+
+def create_store():
+    with open(SIMPLE_LOOP_BPMN_PATH) as f:
+        bpmn_content = f.read()
+    state = State(
+        bpmn_definition=bpmn_content,
+        timetable=TimetableGenerator(bpmn_content).generate_simple(include_batching=True),
+        for_testing=True,
+    )
+    return Store.from_state_and_constraints(state, ConstraintsGenerator(bpmn_content).generate())
+
+
+def benchmark_rollouts(store, n_envs, duration=20.0, max_steps=50, seed=42):
+    """Step n environments in parallel with random (valid) actions, returns the steps per second."""
+    env = PPOEnv.make_vec_env(store, n_envs, max_steps=max_steps, seed=seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    steps = 0
+    start_time = time.time()
+    while time.time() - start_time < duration:
+        masks = env.env_method("action_masks")
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+        env.step(actions)
+        steps += n_envs
+    elapsed = time.time() - start_time
+    env.close()
+    return steps / elapsed
+
+
+if __name__ == "__main__":
+    store = create_store()
+    for n_envs in sorted({1, 2, 4, os.cpu_count() or 1}):
+        print(f"{n_envs:>3} environments: {benchmark_rollouts(store, n_envs):_.2f} steps/s")
@@ -0,0 +1,56 @@
+import numpy as np
+
+from o2.ppo_utils.ppo_env import PPOEnv
+from o2.ppo_utils.ppo_input import PPOInput
+from o2.store import Store
+
+
+def _rollout(store: Store, seed: int, steps: int) -> list[tuple[float, list]]:
+    env = PPOEnv.make_vec_env(store, 1, max_steps=steps, seed=seed)
+    env.reset()
+    results = []
+    for _ in range(steps):
+        [mask] = env.env_method("action_masks")
+        action = np.random.choice(np.flatnonzero(mask))
+        obs, rewards, _, _ = env.step(np.array([action]))
+        results.append((rewards[0], [value.tolist() for value in obs.values()]))
+    env.close()
+    return results
+
+
+def test_step(one_task_store: Store):
+    env = PPOEnv(one_task_store, max_steps=1)
+    mask = env.action_masks()
+    assert mask.shape == (env.action_space.n,)  # type: ignore
+
+    state, reward, _, truncated, _ = env.step(np.int64(np.flatnonzero(mask)[0]))
+    assert reward in (-1, 1, 10)
+    assert truncated
+    assert state.keys() == env.observation_space.keys()  # type: ignore
+    assert env.store.solution_tree.total_solutions == 2
+
+
+def test_step_continues_from_new_solution(store: Store):
+    env = PPOEnv(store)
+    base_solution_id = env.store.solution.id
+    action = np.flatnonzero(env.action_masks())[0]
+    selected_action = env.actions[action]
+
+    state, _, _, _, _ = env.step(np.int64(action))
+    assert env.store.solution.id != base_solution_id
+    assert env.store.solution.last_action == selected_action
+    expected_state = PPOInput.get_state_from_store(env.store)
+    assert all(np.array_equal(state[key], expected_state[key]) for key in expected_state)
+    assert env.actions == PPOInput.get_actions_from_store(env.store)
+
+
+def test_seeded_rollouts_are_reproducible(one_task_store: Store):
+    assert _rollout(one_task_store, seed=42, steps=3) == _rollout(one_task_store, seed=42, steps=3)
+
+
+def test_validity_cache_matches_uncached_actions(two_tasks_store: Store):
+    env = PPOEnv(two_tasks_store)
+    for _ in range(3):
+        assert env.actions == PPOInput.get_actions_from_store(env.store)
+        env.step(np.int64(np.flatnonzero(env.action_masks())[0]))
+    assert env.actions == PPOInput.get_actions_from_store(env.store)
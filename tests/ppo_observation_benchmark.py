@@ -0,0 +1,59 @@
+import time
+
+from o2.models.state import State
+from o2.ppo_utils.ppo_input import PPOInput
+from o2.store import Store
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+
+def create_sequential_bpmn(number_of_tasks):
+    """Create a bpmn model, with the given number of tasks in sequence."""
+    task_ids = [f"TASK_{i}" for i in range(number_of_tasks)]
+    nodes = ["START_EVENT", *task_ids, "END_EVENT"]
+    flows = [(f"FLOW_{i}", source, target) for i, (source, target) in enumerate(zip(nodes, nodes[1:]))]
+    elements = ['<bpmn:startEvent id="START_EVENT"><bpmn:outgoing>FLOW_0</bpmn:outgoing></bpmn:startEvent>']
+    for i, task_id in enumerate(task_ids):
+        elements.append(
+            f'<bpmn:task id="{task_id}" name="{task_id}">'
+            f"<bpmn:incoming>FLOW_{i}</bpmn:incoming><bpmn:outgoing>FLOW_{i + 1}</bpmn:outgoing>"
+            "</bpmn:task>"
+        )
+    elements.append(
+        f'<bpmn:endEvent id="END_EVENT"><bpmn:incoming>FLOW_{number_of_tasks}</bpmn:incoming></bpmn:endEvent>'
+    )
+    elements += [
+        f'<bpmn:sequenceFlow id="{id}" sourceRef="{source}" targetRef="{target}" />'
+        for id, source, target in flows
+    ]
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" id="Definitions">'
+        f'<bpmn:process id="SEQUENTIAL_PROCESS" isExecutable="false">{"".join(elements)}</bpmn:process>'
+        "</bpmn:definitions>"
+    )
+
+
+def create_store(number_of_tasks):
+    bpmn_content = create_sequential_bpmn(number_of_tasks)
+    state = State(
+        bpmn_definition=bpmn_content,
+        timetable=TimetableGenerator(bpmn_content).generate_simple(include_batching=True),
+        for_testing=True,
+    )
+    return Store.from_state_and_constraints(state, ConstraintsGenerator(bpmn_content).generate())
+
+
+def benchmark_observation(store, repetitions=200):
+    """Build the observation repeatedly, returns the ms per observation."""
+    PPOInput.get_state_from_store(store)  # Build the KPI tables of the evaluation once
+    start_time = time.time()
+    for _ in range(repetitions):
+        PPOInput.get_state_from_store(store)
+    return (time.time() - start_time) / repetitions * 1000
+
+
+if __name__ == "__main__":
+    for number_of_tasks in [5, 50, 200]:
+        store = create_store(number_of_tasks)
+        print(f"{number_of_tasks:>4} tasks: {benchmark_observation(store):_.3f} ms/observation")
@@ -0,0 +1,59 @@
+import asyncio
+import queue
+import time
+
+from o2_server.progress import ProgressBroker
+from o2_server.server_types import ProgressEvent
+
+
+def create_event(id: str, iteration: int, is_final: bool = False) -> ProgressEvent:
+    return ProgressEvent(
+        id=id,
+        iteration=iteration,
+        iteration_time=0,
+        elapsed_time=0,
+        solutions_explored=0,
+        solutions_discarded=0,
+        number_of_fronts=1,
+        pareto_front=[],
+        new_solutions=[],
+        is_final=is_final,
+    )
+
+
+async def wait_for(condition) -> None:
+    deadline = time.time() + 10
+    while not condition():
+        assert time.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_last_events_are_dropped_for_finished_jobs():
+    events_queue = queue.Queue()
+    broker = ProgressBroker(events_queue)
+
+    async def run() -> list[ProgressEvent]:
+        received = []
+
+        async def subscribe() -> None:
+            async for event in broker.subscribe("job"):
+                assert event is not None
+                received.append(event)
+
+        subscriber = asyncio.create_task(subscribe())
+        await wait_for(lambda: "job" in broker._subscribers)
+        events_queue.put(create_event("job", 0))
+        events_queue.put(create_event("crashed-job", 0))
+        await wait_for(lambda: "job" in broker._last_events and "crashed-job" in broker._last_events)
+
+        events_queue.put(create_event("job", 1, is_final=True))
+        await asyncio.wait_for(subscriber, timeout=10)
+        assert "job" not in broker._last_events
+
+        broker.prune(lambda id: id != "crashed-job")
+        assert broker._last_events == {}
+        events_queue.put(None)
+        return received
+
+    received = asyncio.run(run())
+    assert [event["iteration"] for event in received] == [0, 1]
@@ -1,5 +1,6 @@
+import numpy as np
 
-
+from o2.agents.ppo_agent import PPOAgent
 from o2.models.settings import AgentType
 from o2.optimizer import Optimizer
 from o2.store import Store
@@ -13,3 +14,53 @@ def test_proximal_policy_optimization(one_task_store: Store):
 
     optimizer = Optimizer(store)
     optimizer.solve()
+
+
+def test_proximal_policy_optimization_with_multiple_actions_per_step(one_task_store: Store):
+    store = one_task_store
+    store.settings.max_iterations = 1
+    store.settings.ppo_steps_per_iteration = 50
+    store.settings.ppo_actions_per_step = 3
+
+    store.settings.agent = AgentType.PROXIMAL_POLICY_OPTIMIZATION
+
+    optimizer = Optimizer(store)
+    actions = optimizer.agent.select_actions()
+    assert actions is not None
+    assert 1 < len(actions) <= 3
+    assert len({repr(action) for action in actions}) == len(actions)
+
+    optimizer.solve()
+    # Every evaluated action was added as a transition
+    agent = optimizer.agent
+    assert isinstance(agent, PPOAgent)
+    rollout_buffer = agent.model.rollout_buffer
+    assert rollout_buffer.pos > 1
+
+    # Each transition's return is its own reward plus the value of the next observation
+    agent.compute_returns_and_advantage()
+    assert len(agent.buffer_steps) == 1
+    start, end, next_value, done = agent.buffer_steps[0]
+    assert (start, end) == (0, rollout_buffer.pos)
+    expected_returns = rollout_buffer.rewards[start:end, 0] + (0 if done else next_value)
+    assert np.allclose(rollout_buffer.returns[start:end, 0], expected_returns)
+
+
+def test_ppo_returns_of_multiple_actions_per_step(one_task_store: Store):
+    store = one_task_store
+    store.settings.ppo_steps_per_iteration = 50
+    store.settings.agent = AgentType.PROXIMAL_POLICY_OPTIMIZATION
+    agent = PPOAgent(store)
+    rollout_buffer = agent.model.rollout_buffer
+    rollout_buffer.gae_lambda = 0.5
+
+    # A step with 3 transitions, followed by a (final) step with 2 transitions
+    rollout_buffer.rewards[:5, 0] = [1, 2, 3, 4, 6]
+    rollout_buffer.values[:5, 0] = [0.5, 0.5, 0.5, 2, 2]
+    agent.buffer_steps = [(0, 3, 2.0, False), (3, 5, 5.0, True)]
+    agent.compute_returns_and_advantage()
+
+    # Final step: advantage = reward - value (mean 3)
+    # First step: advantage = reward + next value - value + gae_lambda * 3 (gamma is 1)
+    assert np.allclose(rollout_buffer.advantages[:5, 0], [4, 5, 6, 2, 4])
+    assert np.allclose(rollout_buffer.returns[:5, 0], [4.5, 5.5, 6.5, 4, 6])
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+from o2.models.json_report import JSONReport
+from o2.models.solution import Solution
+from o2.models.state import State
+from o2.store import Store
+from o2_server import server
+from tests.fixtures.constraints_generator import ConstraintsGenerator
+from tests.fixtures.test_helpers import replace_constraints
+from tests.fixtures.timetable_generator import TimetableGenerator
+
+SIMPLE_LOOP_BPMN_PATH = "./tests/fixtures/SimpleLoop.bpmn"
+
+
+def create_report_zip(filename, number_of_fronts=100, solutions_per_front=20):
+    """Create a (large) report zip, by repeating the base solution of a simple store."""
+    with open(SIMPLE_LOOP_BPMN_PATH) as f:
+        bpmn_content = f.read()
+    state = State(
+        bpmn_definition=bpmn_content,
+        timetable=TimetableGenerator(bpmn_content).generate_simple(),
+        for_testing=True,
+    )
+    solution = Solution(evaluation=state.evaluate(), state=state, actions=[])
+    store = Store(solution=solution, constraints=ConstraintsGenerator(bpmn_content).generate())
+    store = replace_constraints(store, resources=ConstraintsGenerator.resource_constraints())
+
+    report = json.loads(JSONReport.from_store(store, is_final=True).model_dump_json())
+    report["pareto_fronts"] = [
+        {"solutions": [report["base_solution"]] * solutions_per_front} for _ in range(number_of_fronts)
+    ]
+    with zipfile.ZipFile(filename, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr("result.json", json.dumps(report))
+
+
+def uncached_get_report(zip):
+    """The previous implementation: Unzip, validate & serialize the report on every request."""
+    with zipfile.ZipFile(zip) as z, z.open(z.namelist()[0]) as f:
+        return JSONReport.model_validate_json(f.read()).model_dump_json()
+
+
+def benchmark(name, fn, duration=5.0):
+    requests = 0
+    start_time = time.time()
+    while time.time() - start_time < duration:
+        fn()
+        requests += 1
+    elapsed = time.time() - start_time
+    print(f"{name:<28}: {requests / elapsed:_.1f} requests/s")
+
+
+with tempfile.TemporaryDirectory() as folder:
+    zip = os.path.join(folder, "report.zip")
+    create_report_zip(zip)
+    with zipfile.ZipFile(zip) as z:
+        print(f"Report size: {z.infolist()[0].file_size / 1024 / 1024:_.2f} MB")
+
+    server.get_output_path = lambda id: zip
+    etag = server.ReportCache.get_etag(zip)
+
+    benchmark("Uncached (validate)", lambda: uncached_get_report(zip))
+    benchmark("Cached", lambda: asyncio.run(server.get_report_file("benchmark", None)))
+    benchmark("Conditional GET (304)", lambda: asyncio.run(server.get_report_file("benchmark", etag)))
@@ -0,0 +1,134 @@
+import datetime
+import os
+import sqlite3
+from contextlib import closing
+from typing import cast
+
+import pytest
+
+from o2.store import Store
+from o2_server.job_registry import JobRegistry
+from o2_server.optimos_service import OptimosService
+from o2_server.result_cache import ResultCache, hash_request, normalize_bpmn
+from o2_server.server_types import ProcessingRequest
+
+BPMN = '<definitions>\n  <process id="p">\n    <task id="t"/>\n  </process>\n</definitions>\n'
+
+
+def create_request(store: Store, bpmn_model: str = BPMN, **config: object) -> ProcessingRequest:
+    return cast(
+        ProcessingRequest,
+        {
+            "bpmn_model": bpmn_model,
+            "timetable": store.base_timetable,
+            "constraints": store.constraints,
+            "config": {"scenario_name": "test", "num_cases": 100, **config},
+        },
+    )
+
+
+@pytest.fixture
+def registry(tmp_path) -> JobRegistry:
+    return JobRegistry(os.path.join(tmp_path, "jobs.sqlite3"))
+
+
+def add_finished_job(
+    registry: JobRegistry, tmp_path, id: str, finished_days_ago: float, size: int = 10
+) -> str:
+    output_path = os.path.join(tmp_path, f"{id}.zip")
+    with open(output_path, "wb") as f:
+        f.write(b"x" * size)
+    registry.add(id, output_path, request_hash=id)
+    registry.set_status(id, "completed")
+    finished_at = (datetime.datetime.now() - datetime.timedelta(days=finished_days_ago)).isoformat()
+    with closing(sqlite3.connect(registry.path)) as connection, connection:
+        connection.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (finished_at, id))
+    return output_path
+
+
+def test_normalize_bpmn():
+    assert normalize_bpmn(BPMN) == normalize_bpmn(BPMN.replace("\n", "\r\n"))
+    assert normalize_bpmn(BPMN) == normalize_bpmn(BPMN.replace("  ", "\t"))
+    assert normalize_bpmn(BPMN) == '<definitions><process id="p"><task id="t"/></process></definitions>'
+
+
+def test_hash_request_is_stable(one_task_store: Store):
+    request_hash = hash_request(create_request(one_task_store, num_cases=100, max_iterations=10))
+    assert hash_request(create_request(one_task_store, max_iterations=10, num_cases=100)) == request_hash
+    assert hash_request(create_request(one_task_store, BPMN.replace("\n", "\r\n"), max_iterations=10)) == (
+        request_hash
+    )
+    assert hash_request(create_request(one_task_store, "  " + BPMN + "\n\n", max_iterations=10)) == (
+        request_hash
+    )
+
+
+def test_hash_request_differs_for_different_config(one_task_store: Store):
+    request_hash = hash_request(create_request(one_task_store, max_iterations=10))
+    assert hash_request(create_request(one_task_store, max_iterations=11)) != request_hash
+    assert hash_request(create_request(one_task_store, BPMN.replace('id="t"', 'id="u"'))) != (
+        hash_request(create_request(one_task_store))
+    )
+
+
+def test_get_skips_missing_and_empty_outputs(tmp_path, registry: JobRegistry):
+    cache = ResultCache(registry, datetime.timedelta(days=30), 1024)
+    assert cache.get("hash") is None
+
+    for id, content in [("valid", b"report"), ("empty", b""), ("missing", None)]:
+        output_path = os.path.join(tmp_path, f"{id}.zip")
+        if content is not None:
+            with open(output_path, "wb") as f:
+                f.write(content)
+        registry.add(id, output_path, request_hash="hash")
+        registry.set_status(id, "completed")
+    # Pending jobs are not served
+    registry.add("pending", os.path.join(tmp_path, "valid.zip"), request_hash="hash")
+
+    job = cache.get("hash")
+    assert job is not None
+    assert job.id == "valid"
+
+
+def test_prune_removes_expired_results(tmp_path, registry: JobRegistry):
+    cache = ResultCache(registry, datetime.timedelta(days=30), 1024)
+    expired_path = add_finished_job(registry, tmp_path, "expired", 40)
+    with open(OptimosService.get_delta_path(expired_path), "w") as f:
+        f.write("{}\n")
+    kept_path = add_finished_job(registry, tmp_path, "kept", 1)
+
+    cache.prune()
+
+    # The job is kept, so it can be told apart from an unknown one
+    assert registry.get("expired").status == "expired"
+    assert not os.path.exists(expired_path)
+    assert not os.path.exists(OptimosService.get_delta_path(expired_path))
+    assert registry.get("kept") is not None
+    assert os.path.exists(kept_path)
+
+
+def test_prune_removes_oldest_results_above_max_bytes(tmp_path, registry: JobRegistry):
+    cache = ResultCache(registry, datetime.timedelta(days=30), 25)
+    # Added out of order, the finish time decides
+    paths = {
+        "second": add_finished_job(registry, tmp_path, "second", 2),
+        "newest": add_finished_job(registry, tmp_path, "newest", 1),
+        "oldest": add_finished_job(registry, tmp_path, "oldest", 3),
+    }
+    registry.add("running", os.path.join(tmp_path, "running.zip"))
+
+    cache.prune()
+
+    assert registry.get("oldest").status == "expired"
+    assert not os.path.exists(paths["oldest"])
+    for id in ["second", "newest"]:
+        assert registry.get(id).status == "completed"
+        assert os.path.exists(paths[id])
+    assert registry.get("running").status == "pending"
+
+    cache.max_bytes = 10
+    cache.prune()
+    assert registry.get("second").status == "expired"
+    assert registry.get("newest").status == "completed"
+    # Expired jobs aren't pruned again
+    assert [job.id for job in registry.get_finished_jobs()] == ["newest"]
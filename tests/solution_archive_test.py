@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from o2.models.settings import CostType, Settings
+from o2.models.solution import Solution
+from o2.models.state import State
+from o2.util.solution_archive import SolutionArchive
+from o2.util.solution_dumper import SolutionDumper
+from tests.fixtures.mock_action import MockAction, MockActionParamsType
+from tests.fixtures.test_helpers import create_mock_solution
+
+
+@pytest.fixture
+def sqlite_archive_settings():
+    """Enable archiving to sqlite for a test and restore the settings afterwards."""
+    original = (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.ARCHIVE_SOLUTIONS_TO_SQLITE,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+    )
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.ARCHIVE_SOLUTIONS_TO_SQLITE = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
+    yield
+    (
+        Settings.ARCHIVE_SOLUTIONS,
+        Settings.ARCHIVE_SOLUTIONS_TO_SQLITE,
+        Settings.DELETE_LOADED_SOLUTION_ARCHIVES,
+    ) = original
+
+
+@pytest.fixture
+def total_cost_type():
+    """Use CostType.TOTAL_COST, so that the mock solutions are valid."""
+    original_cost_type = Settings.COST_TYPE
+    Settings.COST_TYPE = CostType.TOTAL_COST
+    yield
+    Settings.COST_TYPE = original_cost_type
+
+
+def test_add_and_get(tmp_path, one_task_state: State):
+    archive = SolutionArchive(os.path.join(tmp_path, "solutions.sqlite"))
+    parent = create_mock_solution(one_task_state, 3, 7)
+    solution = Solution.from_parent(parent, MockAction(MockActionParamsType(random_string="child")))
+
+    archive.add_evaluation("store_a", "Store", solution)
+    archive.add_state("store_a", "Store", solution)
+
+    assert "store_a" in archive
+    assert len(archive) == 1
+    assert archive.get_evaluation("store_a").pareto_x == solution.pareto_x
+    assert archive.get_state("store_a") == solution.state
+
+    parent_id, action = archive.connection.execute(
+        "SELECT parent_id, action FROM solutions WHERE key = 'store_a'"
+    ).fetchone()
+    assert parent_id == parent.id
+    assert json.loads(action) == {"type": "MockAction", "params": {"random_string": "child"}}
+
+    # Loading with delete removes the blob, but keeps the row
+    archive.get_state("store_a", delete=True)
+    assert not archive.has_column("store_a", "state")
+    with pytest.raises(KeyError):
+        archive.get_state("store_a")
+    archive.close()
+
+
+def test_ids_near_points(tmp_path, total_cost_type, one_task_state: State):
+    archive = SolutionArchive(os.path.join(tmp_path, "solutions.sqlite"))
+    near = create_mock_solution(one_task_state, 10, 10)
+    far = create_mock_solution(one_task_state, 100, 100)
+    invalid = create_mock_solution(one_task_state, 0, 10)
+    for solution in [near, far, invalid]:
+        archive.add_evaluation(solution.id, "Store", solution)
+
+    point = (near.pareto_x + 1, near.pareto_y)
+    assert archive.get_ids_near_points([point], max_distance=5) == [(near.id, 1.0)]
+    assert [solution_id for solution_id, _ in archive.get_ids_near_points([point])] == [near.id, far.id]
+    assert archive.get_ids_near_points([point], store_name="Other") == []
+
+    # The archive can be read from a different connection (e.g. another process)
+    assert len(SolutionArchive(archive.filename)) == 3
+    archive.close()
+
+
+def test_solution_dumper_archives_to_sqlite(
+    tmp_path, monkeypatch, sqlite_archive_settings, one_task_state: State
+):
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name("Test Store")
+
+    solution = create_mock_solution(one_task_state, 3, 7)
+    state = solution.state
+    dumper.dump_solution(solution)
+
+    assert os.listdir(dumper.evaluation_folder) == []
+    assert os.listdir(dumper.state_folder) == []
+    assert solution.__dict__["_evaluation"] is None
+
+    assert solution.evaluation.pareto_x == 3
+    assert solution.state == state
+    [reloaded] = list(dumper.archive.iter_solutions("Test Store"))  # type: ignore
+    assert reloaded.id == solution.id
+    dumper.close()
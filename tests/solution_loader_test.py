@@ -0,0 +1,51 @@
+import pytest
+
+from o2.models.settings import CostType, Settings
+from o2.store import Store
+from o2.util.solution_dumper import SolutionDumper
+from o2.util.solution_loader import load_store_summaries, stream_solution_records
+from o2_evaluation.data_analyzer import create_front_from_solutions
+from tests.fixtures.test_helpers import create_mock_solution
+
+
+@pytest.fixture
+def archive_settings():
+    """Enable solution archiving (with valid mock solutions) & restore the settings afterwards."""
+    original = (Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES, Settings.COST_TYPE)
+    Settings.ARCHIVE_SOLUTIONS = True
+    Settings.DELETE_LOADED_SOLUTION_ARCHIVES = False
+    Settings.COST_TYPE = CostType.TOTAL_COST
+    yield
+    (Settings.ARCHIVE_SOLUTIONS, Settings.DELETE_LOADED_SOLUTION_ARCHIVES, Settings.COST_TYPE) = original
+
+
+def test_stream_solution_records(tmp_path, monkeypatch, archive_settings, one_task_store: Store):
+    monkeypatch.chdir(tmp_path)
+    dumper = SolutionDumper()
+    dumper.update_store_name(one_task_store.name)
+
+    solutions = [create_mock_solution(one_task_store.base_state, x, 10 - x) for x in range(1, 6)]
+    for solution in solutions:
+        dumper.dump_solution(solution)
+    dumper.dump_store(one_task_store)
+    dumper.writer.flush()
+
+    records = list(stream_solution_records([dumper.solutions_filename], max_workers=2))
+    assert [record.id for record in records] == [solution.id for solution in solutions]
+    assert [record.point for record in records] == [(s.pareto_x, s.pareto_y) for s in solutions]
+    assert all(record.store_name == one_task_store.name for record in records)
+
+    # The full objects are loaded lazily
+    assert records[2].load_solution().id == solutions[2].id
+    assert records[2].load_evaluation().pareto_x == solutions[2].pareto_x
+
+    # Records can be used like solutions
+    assert len(create_front_from_solutions(records + records)) == 5
+
+    [summary] = load_store_summaries([dumper.store_filename], max_workers=2)
+    assert summary.name == one_task_store.name
+    assert summary.base_solution is not None
+    assert summary.base_solution.id == one_task_store.base_solution.id
+    assert list(summary.solution_lookup) == list(one_task_store.solution_tree.solution_lookup)
+    assert summary.base_solution.load_solution().id == one_task_store.base_solution.id
+    dumper.close()
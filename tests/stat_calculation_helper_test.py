@@ -1,3 +1,9 @@
+import random
+
+import numpy as np
+import pytest
+
+from o2.models.settings import Settings
 from o2.models.state import State
 from o2.util.stat_calculation_helper import (
     calculate_averaged_hausdorff_distance,
@@ -6,6 +12,7 @@ from o2.util.stat_calculation_helper import (
     calculate_purity,
     distance,
     generational_distance_p2,
+    get_non_dominated_mask,
 )
 from tests.fixtures.test_helpers import create_mock_solution
 
@@ -130,3 +137,53 @@ def test_calculate_purity(simple_state: State):
     # Expected purity: 2/3 = 0.666...
     expected_purity = 2 / 3
     assert abs(purity - expected_purity) < 1e-10
+
+
+@pytest.mark.parametrize("equal_domination_allowed", [False, True])
+def test_get_non_dominated_mask(equal_domination_allowed: bool):
+    original = Settings.EQUAL_DOMINATION_ALLOWED
+    Settings.EQUAL_DOMINATION_ALLOWED = equal_domination_allowed
+    rng = np.random.default_rng(42)
+    # Small integer grid, so that there are many ties & duplicates
+    points = rng.integers(0, 15, size=(300, 2)).astype(float)
+
+    def is_dominated(p, q):
+        if equal_domination_allowed:
+            return q[0] < p[0] and q[1] < p[1]
+        return q[0] <= p[0] and q[1] <= p[1] and tuple(q) != tuple(p)
+
+    expected = [not any(is_dominated(p, q) for q in points) for p in points]
+    try:
+        assert get_non_dominated_mask(points).tolist() == expected
+        assert get_non_dominated_mask(np.empty((0, 2))).tolist() == []
+    finally:
+        Settings.EQUAL_DOMINATION_ALLOWED = original
+
+
+def test_metrics_match_pairwise_implementation(simple_state: State):
+    rng = random.Random(42)
+    front = [create_mock_solution(simple_state, rng.randint(1, 50), rng.randint(1, 50)) for _ in range(20)]
+    reference = [
+        create_mock_solution(simple_state, rng.randint(1, 50), rng.randint(1, 50)) for _ in range(30)
+    ]
+
+    def gd_2(a, b):
+        return (sum(min(distance(p.point, q.point) for q in b) ** 2 for p in a) / len(a)) ** 0.5
+
+    assert generational_distance_p2(front, reference) == pytest.approx(gd_2(front, reference))
+    assert calculate_averaged_hausdorff_distance(front, reference) == pytest.approx(
+        (gd_2(front, reference) + gd_2(reference, front)) / 2
+    )
+    assert generational_distance_p2(front, []) == float("inf")
+
+    sorted_front = sorted(front, key=lambda s: s.pareto_x)
+    gaps = [distance(a.point, b.point) for a, b in zip(sorted_front, sorted_front[1:])]
+    d_bar = sum(gaps) / len(gaps)
+    d_f = distance(sorted_front[0].point, min(reference, key=lambda s: s.pareto_x).point)
+    d_l = distance(min(front, key=lambda s: s.pareto_y).point, min(reference, key=lambda s: s.pareto_y).point)
+    expected_delta = (d_f + d_l + sum(abs(gap - d_bar) for gap in gaps)) / (d_f + d_l + len(gaps) * d_bar)
+    assert calculate_delta_metric(front, reference) == pytest.approx(expected_delta)
+
+    front_points = {s.point for s in front}
+    reference_points = {s.point for s in reference}
+    assert calculate_purity(front, reference) == len(front_points & reference_points) / len(reference_points)